@@ -18,6 +18,6 @@ __version__          = "6.0.2"
 
 from .vector_tools import Rect, Box
 from .transform import Transform
-from .block import Block
+from .block import Block, FrozenBlock
 from .world_slice import WorldSlice
 from .editor import Editor
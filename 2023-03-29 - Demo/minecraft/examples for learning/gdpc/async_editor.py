@@ -0,0 +1,244 @@
+"""Provides the AsyncEditor class, an asyncio wrapper around the Editor"""
+
+
+from typing import Any, Callable, List, Optional, Sequence, Union, Iterable, Tuple
+from numbers import Integral
+
+from glm import ivec3
+
+from .vector_tools import Vec3iLike, Rect, Box
+from .transform import Transform, TransformLike, toTransform
+from .block import Block, transformedBlockOrPalette
+from .editor import Editor
+from . import interface
+from .async_interface import RequestLimiter, DEFAULT_CONCURRENCY
+
+
+class AsyncEditor:
+    """Provides high-level functions to interact with the Minecraft world through the GDMC HTTP
+    interface, from within an asyncio event loop.
+
+    An AsyncEditor wraps an Editor (see .editor) with buffering and multithreaded buffer flushing
+    enabled, and runs its methods on a dedicated thread, one call at a time and in the order in
+    which they were awaited. Block placement, retrieval and caching therefore behave exactly as
+    with an Editor, including settings like Editor.caching, Editor.fillCommands and
+    Editor.skipUnchangedBlocks, which can be changed on .editor.
+
+    Buffer flushes are sent by <flushLanes> worker threads (see Editor.multithreading), so they
+    overlap with other calls. Biome and build area retrieval, commands that are not synchronized
+    with the buffer and world slices that are not cached run on a thread pool instead, with at most
+    <concurrency> of them in flight at the same time.
+
+    Stores a transform that defines a local coordinate system, like Editor.
+    """
+
+    def __init__(
+        self,
+        transformLike: Optional[TransformLike] = None,
+        dimension: Optional[str] = None,
+        bufferLimit = 1024,
+        flushLanes  = 4,
+        concurrency = DEFAULT_CONCURRENCY,
+        retries     = 4,
+        timeout     = None,
+        host        = interface.DEFAULT_HOST,
+        poolSize    = interface.DEFAULT_POOL_SIZE,
+        compression: Optional[str] = None,
+        compressionThreshold = interface.DEFAULT_COMPRESSION_THRESHOLD,
+        compressResponses    = True,
+    ):
+        """Constructs an AsyncEditor instance with the specified transform and settings"""
+        self._editor = Editor(
+            dimension=dimension,
+            buffering=True,
+            bufferLimit=bufferLimit,
+            multithreading=True,
+            multithreadingWorkers=flushLanes,
+            retries=retries,
+            timeout=timeout,
+            host=host,
+            poolSize=poolSize,
+            compression=compression,
+            compressionThreshold=compressionThreshold,
+            compressResponses=compressResponses,
+        )
+
+        self._transform = Transform() if transformLike is None else toTransform(transformLike)
+
+        # The Editor is not thread-safe, so all calls that use its state go through one thread.
+        self._editorThread = RequestLimiter(1)
+        self._limiter      = RequestLimiter(concurrency)
+
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.close()
+        return False
+
+
+    @property
+    def editor(self):
+        """The wrapped Editor\n
+        Its settings can be changed, but its methods must not be called while this AsyncEditor is
+        in use."""
+        return self._editor
+
+    @property
+    def transform(self):
+        """This editor's local coordinate transform (used for block placement and retrieval)"""
+        return self._transform
+
+    @transform.setter
+    def transform(self, value: Union[Transform, ivec3]):
+        self._transform = toTransform(value)
+
+    @property
+    def dimension(self):
+        """The dimension this editor interacts with"""
+        return self._editor.dimension
+
+    @property
+    def host(self):
+        """The address (hostname+port) of the GDMC HTTP interface to use"""
+        return self._editor.host
+
+    @property
+    def flushLanes(self):
+        """The amount of threads that buffer flushes are sent by"""
+        return self._editor.multithreadingWorkers
+
+    @property
+    def concurrency(self):
+        """The maximum amount of calls that run on the thread pool at once"""
+        return self._limiter.concurrency
+
+    @property
+    def worldSlice(self):
+        """The cached WorldSlice"""
+        return self._editor.worldSlice
+
+
+    async def _call(self, function: Callable[..., Any], *args, **kwargs):
+        """Runs <function>(*<args>, **<kwargs>) on the editor thread and returns its result."""
+        return await self._editorThread.run(function, *args, **kwargs)
+
+
+    async def runCommand(self, command: str, position: Optional[Vec3iLike]=None, syncWithBuffer=False):
+        """Executes one or multiple Minecraft commands (separated by newlines).\n
+        The leading "/" must be omitted.\n
+        If <syncWithBuffer>=True, the command is deferred until after the next buffer flush.\n
+        If <position> is provided, the command's execution position is set to <position>, where
+        <position> is interpreted as local to self.transform (see Editor.runCommand())."""
+        if position is not None:
+            position = self.transform * position
+        await self.runCommandGlobal(command, position, syncWithBuffer)
+
+
+    async def runCommandGlobal(self, command: str, position: Optional[Vec3iLike]=None, syncWithBuffer=False):
+        """Executes one or multiple Minecraft commands (separated by newlines), ignoring self.transform.\n
+        The leading "/" must be omitted.\n
+        If <syncWithBuffer>=True, the command is deferred until after the next buffer flush.\n
+        If <position> is provided, the command's execution position is set to <position>, ignoring
+        self.transform."""
+        if syncWithBuffer:
+            await self._call(self._editor.runCommandGlobal, command, position, syncWithBuffer=True)
+        else:
+            await self._limiter.run(self._editor.runCommandGlobal, command, position)
+
+
+    async def getBuildArea(self) -> Box:
+        """Returns the build area that was specified by /setbuildarea in-game."""
+        return await self._limiter.run(self._editor.getBuildArea)
+
+
+    async def getBlock(self, position: Vec3iLike):
+        """Returns the block at [position].\n
+        <position> is interpreted as local to the coordinate system defined by self.transform.
+        The returned block's orientation is also from the perspective of self.transform.\n
+        If the given coordinates are invalid, returns Block("minecraft:void_air")."""
+        block = await self.getBlockGlobal(self.transform * position)
+        invTransform = ~self.transform
+        block.transform(invTransform.rotation, invTransform.flip)
+        return block
+
+
+    async def getBlockGlobal(self, position: Vec3iLike):
+        """Returns the block at [position], ignoring self.transform.\n
+        If the given coordinates are invalid, returns Block("minecraft:void_air")."""
+        return await self._call(self._editor.getBlockGlobal, position)
+
+
+    async def getBiome(self, position: Vec3iLike):
+        """Returns the biome at <position>.\n
+        <position> is interpreted as local to the coordinate system defined by self.transform.\n
+        If the given coordinates are invalid, returns an empty string."""
+        return await self.getBiomeGlobal(self.transform * position)
+
+
+    async def getBiomeGlobal(self, position: Vec3iLike):
+        """Returns the biome at <position>, ignoring self.transform.\n
+        If the given coordinates are invalid, returns an empty string."""
+        return await self._limiter.run(self._editor.getBiomeGlobal, position)
+
+
+    async def placeBlock(
+        self,
+        position:       Union[Vec3iLike, Iterable[Vec3iLike]],
+        block:          Union[Block, Sequence[Block]],
+        replace:        Optional[Union[str, List[str]]] = None
+    ):
+        """Places <block> at <position>.\n
+        <position> is interpreted as local to the coordinate system defined by self.transform.\n
+        If <position> is iterable (e.g. a list), <block> is placed at all positions.\n
+        If <block> is a sequence (e.g. a list), blocks are sampled randomly.\n
+        Returns whether the placement succeeded fully."""
+        globalPosition = self.transform * position if hasattr(position, "__len__") and len(position) == 3 and isinstance(position[0], Integral) else [self.transform * pos for pos in position]
+        globalBlock = transformedBlockOrPalette(block, self.transform.rotation, self.transform.flip)
+        return await self.placeBlockGlobal(globalPosition, globalBlock, replace)
+
+
+    async def placeBlockGlobal(
+        self,
+        position:       Union[Vec3iLike, Iterable[Vec3iLike]],
+        block:          Union[Block, Sequence[Block]],
+        replace:        Optional[Union[str, Iterable[str]]] = None
+    ):
+        """Places <block> at <position>, ignoring self.transform.\n
+        If <position> is iterable (e.g. a list), <block> is placed at all positions.\n
+        If <block> is a sequence (e.g. a list), blocks are sampled randomly.\n
+        Returns whether the placement succeeded fully."""
+        return await self._call(self._editor.placeBlockGlobal, position, block, replace)
+
+
+    async def flushBuffer(self):
+        """Starts flushing the block placement buffer.\n
+        The blocks are sent in the background; await .awaitBufferFlushes() to wait for them."""
+        await self._call(self._editor.flushBuffer)
+
+
+    async def awaitBufferFlushes(self):
+        """Awaits all pending buffer flushes."""
+        await self._call(self._editor.awaitBufferFlushes)
+
+
+    async def loadWorldSlice(self, rect: Optional[Rect]=None, heightmapTypes: Optional[Iterable[str]] = None, cache=False, lazy=False, yRange: Optional[Tuple[int, int]] = None, surfaceBand: Optional[Tuple[int, int]] = None):
+        """Loads the world slice for the given XZ-rectangle (see Editor.loadWorldSlice()).\n
+        If <cache>=True, the world slice is loaded on the editor thread, so later calls wait until
+        it has been cached. Otherwise, it is loaded on the thread pool, while other calls continue.
+        Pending buffer flushes continue in both cases; await .awaitBufferFlushes() first if the
+        world slice needs to reflect them."""
+        if cache or self._editor.chunkCache is not None:
+            # With a chunk cache, loading flushes the buffer.
+            return await self._call(self._editor.loadWorldSlice, rect, heightmapTypes, cache=cache, lazy=lazy, yRange=yRange, surfaceBand=surfaceBand)
+        return await self._limiter.run(self._editor.loadWorldSlice, rect, heightmapTypes, lazy=lazy, yRange=yRange, surfaceBand=surfaceBand)
+
+
+    async def close(self):
+        """Flushes the buffer, awaits all pending flushes and closes the connections of this editor."""
+        await self.flushBuffer()
+        await self.awaitBufferFlushes()
+        await self._call(self._editor.closeConnections)
+        self._editorThread.close()
+        self._limiter.close()
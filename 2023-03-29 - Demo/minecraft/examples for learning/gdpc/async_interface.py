@@ -0,0 +1,109 @@
+"""Provides asyncio wrappers for the endpoints of the GDMC HTTP interface.
+
+The wrappers run the functions of `gdpc.interface` on a thread pool, so they build the same request
+bodies and have the same retry behaviour. A `RequestLimiter` bounds the amount of requests that are
+in flight at the same time; requests beyond that wait for a free slot without blocking the event
+loop.
+
+Every wrapper accepts an optional <sessionPool>. If given, each request is sent through the session
+of the thread that runs it (see `interface.SessionPool`), reusing its kept-alive connections.
+
+It is recommended to use the higher-level `async_editor.AsyncEditor` class instead.
+"""
+
+
+from typing import Any, Callable, Optional, Sequence, Tuple
+from concurrent import futures
+from functools import partial
+import asyncio
+
+from .vector_tools import Vec2iLike, Vec3iLike
+from .block import Block
+from . import interface
+from .interface import DEFAULT_HOST, SessionPool
+
+
+DEFAULT_CONCURRENCY = 32
+
+
+class RequestLimiter:
+    """Runs blocking request functions on a thread pool, with at most <concurrency> of them running
+    at the same time."""
+
+    def __init__(self, concurrency: int = DEFAULT_CONCURRENCY):
+        self._concurrency = concurrency
+        self._executor    = futures.ThreadPoolExecutor(concurrency)
+        # The semaphore is created in the event loop that first uses this limiter. (Before Python
+        # 3.10, a semaphore is bound to the event loop that is current when it is created.)
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._loop:      Optional[asyncio.AbstractEventLoop] = None
+
+    @property
+    def concurrency(self):
+        """The maximum amount of requests that run at the same time"""
+        return self._concurrency
+
+    async def run(self, function: Callable[..., Any], *args, **kwargs):
+        """Runs <function>(*<args>, **<kwargs>) on the thread pool and returns its result."""
+        loop = asyncio.get_running_loop()
+        if self._semaphore is None or self._loop is not loop:
+            self._semaphore = asyncio.Semaphore(self._concurrency)
+            self._loop      = loop
+        async with self._semaphore:
+            return await loop.run_in_executor(self._executor, partial(function, *args, **kwargs))
+
+    def close(self):
+        """Shuts down the thread pool, after the running requests have finished."""
+        self._executor.shutdown(wait=True)
+
+
+_defaultLimiter: Optional[RequestLimiter] = None
+
+
+def _getDefaultLimiter():
+    global _defaultLimiter # pylint: disable=global-statement
+    if _defaultLimiter is None:
+        _defaultLimiter = RequestLimiter()
+    return _defaultLimiter
+
+
+async def _run(limiter: Optional[RequestLimiter], sessionPool: Optional[SessionPool], function: Callable[..., Any], *args, **kwargs):
+    def call():
+        # The session must be retrieved on the thread that uses it.
+        return function(*args, session=None if sessionPool is None else sessionPool.session, **kwargs)
+    return await (_getDefaultLimiter() if limiter is None else limiter).run(call)
+
+
+async def getBlocks(position: Vec3iLike, size: Optional[Vec3iLike] = None, dimension: Optional[str] = None, includeState=True, includeData=True, compressResponses=True, retries=0, timeout=None, host=DEFAULT_HOST, sessionPool: Optional[SessionPool] = None, limiter: Optional[RequestLimiter] = None):
+    """Async variant of interface.getBlocks()."""
+    return await _run(limiter, sessionPool, interface.getBlocks, position, size, dimension=dimension, includeState=includeState, includeData=includeData, compressResponses=compressResponses, retries=retries, timeout=timeout, host=host)
+
+
+async def getBiomes(position: Vec3iLike, size: Optional[Vec3iLike] = None, dimension: Optional[str] = None, compressResponses=True, retries=0, timeout=None, host=DEFAULT_HOST, sessionPool: Optional[SessionPool] = None, limiter: Optional[RequestLimiter] = None):
+    """Async variant of interface.getBiomes()."""
+    return await _run(limiter, sessionPool, interface.getBiomes, position, size, dimension=dimension, compressResponses=compressResponses, retries=retries, timeout=timeout, host=host)
+
+
+async def placeBlocks(blocks: Sequence[Tuple[Vec3iLike, Block]], dimension: Optional[str] = None, doBlockUpdates=True, spawnDrops=False, customFlags: str = "", compression: Optional[str] = None, compressionThreshold=interface.DEFAULT_COMPRESSION_THRESHOLD, retries=0, timeout=None, host=DEFAULT_HOST, sessionPool: Optional[SessionPool] = None, limiter: Optional[RequestLimiter] = None):
+    """Async variant of interface.placeBlocks()."""
+    return await _run(limiter, sessionPool, interface.placeBlocks, list(blocks), dimension=dimension, doBlockUpdates=doBlockUpdates, spawnDrops=spawnDrops, customFlags=customFlags, compression=compression, compressionThreshold=compressionThreshold, retries=retries, timeout=timeout, host=host)
+
+
+async def runCommand(command: str, dimension: Optional[str] = None, retries=0, timeout=None, host=DEFAULT_HOST, sessionPool: Optional[SessionPool] = None, limiter: Optional[RequestLimiter] = None):
+    """Async variant of interface.runCommand()."""
+    return await _run(limiter, sessionPool, interface.runCommand, command, dimension=dimension, retries=retries, timeout=timeout, host=host)
+
+
+async def getBuildArea(retries=0, timeout=None, host=DEFAULT_HOST, sessionPool: Optional[SessionPool] = None, limiter: Optional[RequestLimiter] = None):
+    """Async variant of interface.getBuildArea()."""
+    return await _run(limiter, sessionPool, interface.getBuildArea, retries=retries, timeout=timeout, host=host)
+
+
+async def getChunks(position: Vec2iLike, size: Optional[Vec2iLike] = None, dimension: Optional[str] = None, asBytes=False, compressResponses=True, retries=0, timeout=None, host=DEFAULT_HOST, sessionPool: Optional[SessionPool] = None, limiter: Optional[RequestLimiter] = None):
+    """Async variant of interface.getChunks()."""
+    return await _run(limiter, sessionPool, interface.getChunks, position, size, dimension=dimension, asBytes=asBytes, compressResponses=compressResponses, retries=retries, timeout=timeout, host=host)
+
+
+async def getVersion(retries=0, timeout=None, host=DEFAULT_HOST, sessionPool: Optional[SessionPool] = None, limiter: Optional[RequestLimiter] = None):
+    """Async variant of interface.getVersion()."""
+    return await _run(limiter, sessionPool, interface.getVersion, retries=retries, timeout=timeout, host=host)
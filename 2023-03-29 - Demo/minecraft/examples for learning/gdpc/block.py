@@ -1,10 +1,13 @@
 """Provides the Block class"""
 
 
-from typing import Any, Union, Optional, Dict, Sequence
-from dataclasses import dataclass, field
+from typing import Any, Union, Optional, Dict, Sequence, Tuple
+from dataclasses import dataclass, field, FrozenInstanceError
 from copy import copy, deepcopy
+from functools import partial, lru_cache
+from types import MappingProxyType
 import random
+import json
 
 from glm import bvec3
 from nbt import nbt
@@ -14,6 +17,64 @@ from .nbt_tools import nbtToSnbt
 from .block_state_tools import transformAxis, transformFacing, transformRotation
 
 
+# The amount of distinct block strings whose parse results are remembered.
+BLOCK_STRING_CACHE_SIZE = 4096
+
+
+@lru_cache(maxsize=BLOCK_STRING_CACHE_SIZE)
+def _parseBlockString(blockString: str) -> Tuple[str, Tuple[Tuple[str, str], ...], Optional[str]]:
+    """Splits <blockString> (e.g. "oak_stairs[facing=north,half=top]") into its id, its block
+    states and its SNBT data.\n
+    The id is returned with the "minecraft:" namespace added if it has none, and the states are
+    returned as (name, value) pairs, sorted by name. Raises a ValueError if <blockString> is
+    malformed."""
+    idEnd = len(blockString)
+    for delimiter in "[{":
+        index = blockString.find(delimiter)
+        if index != -1:
+            idEnd = min(idEnd, index)
+
+    blockId = blockString[:idEnd].strip()
+    if blockId and ":" not in blockId:
+        blockId = f"minecraft:{blockId}"
+
+    stateItems = []
+    rest = blockString[idEnd:]
+    if rest.startswith("["):
+        statesEnd = rest.find("]")
+        if statesEnd == -1:
+            raise ValueError(f'Malformed block string "{blockString}": missing "]"')
+        for stateString in rest[1:statesEnd].split(","):
+            if not stateString.strip():
+                continue
+            name, separator, value = stateString.partition("=")
+            if not separator:
+                raise ValueError(f'Malformed block string "{blockString}": block state "{stateString}" has no value')
+            stateItems.append((name.strip(), value.strip()))
+        rest = rest[statesEnd + 1:]
+
+    data = rest.strip() or None
+    if data is not None and not data.startswith("{"):
+        raise ValueError(f'Malformed block string "{blockString}": unexpected "{data}"')
+
+    return blockId, tuple(sorted(stateItems)), data
+
+
+def _canonicalBlockKey(id: Optional[str], states: Optional[Dict[str, str]], data: Optional[str]) -> Tuple[Any, ...]: # pylint: disable=redefined-builtin
+    """Returns the (id, sorted state items, data) tuple that identifies the block with the given
+    fields in its canonical form (see FrozenBlock).\n
+    Raises a ValueError if <id> is a malformed block string."""
+    if id:
+        id, parsedStateItems, parsedData = _parseBlockString(id)
+        if parsedStateItems:
+            states = {**dict(parsedStateItems), **states} if states else dict(parsedStateItems)
+        if data is None:
+            data = parsedData
+    else:
+        id = None # Both "" and None represent "nothing".
+    return (id, tuple(sorted(states.items())) if states else (), data)
+
+
 @dataclass
 class Block:
     """A Minecraft block.
@@ -42,6 +103,31 @@ class Block:
     states: Dict[str, str] = field(default_factory=dict)
     data:   Optional[str]  = None
 
+    # The cached result of .jsonFragment(), along with the (id, states, data) it was created from.
+    _jsonFragmentCache: Optional[Tuple[Optional[str], Dict[str, str], Optional[str], str]] = field(default=None, init=False, repr=False, compare=False)
+    # The result of .freeze(), along with the (id, states, data) it was created from.
+    _frozenCache: Optional[Tuple[Optional[str], Dict[str, str], Optional[str], "FrozenBlock"]] = field(default=None, init=False, repr=False, compare=False)
+
+
+    def __eq__(self, other):
+        # Blocks are compared in their canonical form (see FrozenBlock), so e.g. Block("air") and
+        # Block("minecraft:air") are equal. Comparing does not intern anything.
+        if not isinstance(other, Block):
+            return NotImplemented
+        try:
+            return self._canonicalKey() == other._canonicalKey()
+        except ValueError:
+            # A malformed block string has no canonical form.
+            return (self.id, self.states, self.data) == (other.id, other.states, other.data)
+
+
+    def _canonicalKey(self):
+        """Returns the key of the FrozenBlock that is equal to this block, without creating it."""
+        cache = self._frozenCache
+        if cache is not None and cache[0] == self.id and cache[2] == self.data and cache[1] == self.states:
+            return cache[3].key
+        return _canonicalBlockKey(self.id, self.states, self.data)
+
 
     def transform(self, rotation: int = 0, flip: Vec3bLike = bvec3()):
         """Transforms this block.\n
@@ -57,11 +143,38 @@ class Block:
     def transformed(self, rotation: int = 0, flip: Vec3bLike = bvec3()):
         """Returns a transformed copy of this block.\n
         Flips first, rotates second."""
-        block = deepcopy(self)
+        block = Block(self.id, dict(self.states), self.data)
         block.transform(rotation, flip)
         return block
 
 
+    def freeze(self) -> "FrozenBlock":
+        """Returns the FrozenBlock that is equal to this block.\n
+        The result is cached, and is only looked up again when the block has been changed."""
+        cache = self._frozenCache
+        if cache is not None and cache[0] == self.id and cache[2] == self.data and cache[1] == self.states:
+            return cache[3]
+        frozen = FrozenBlock(self.id, self.states, self.data)
+        self._frozenCache = (self.id, dict(self.states), self.data, frozen)
+        return frozen
+
+
+    def jsonFragment(self):
+        """Returns the "id", "state" and "data" members of the JSON representation of this block
+        that is used by the GDMC HTTP interface, without the enclosing braces.\n
+        The fragment is cached, and is only rebuilt when the block has been changed."""
+        cache = self._jsonFragmentCache
+        if cache is not None and cache[0] == self.id and cache[2] == self.data and cache[1] == self.states:
+            return cache[3]
+        fragment = (
+            f'"id":"{self.id}"' +
+            (f',"state":{json.dumps(self.states, separators=(",",":"))}' if self.states else '') +
+            (f',"data":{repr(self.data)}' if self.data is not None else '')
+        )
+        self._jsonFragmentCache = (self.id, dict(self.states), self.data, fragment)
+        return fragment
+
+
     def stateString(self):
         """Returns a string containing the block states of this block, including the outer brackets."""
         stateString = ",".join([f"{key}={value}" for key, value in self.states.items()])
@@ -86,6 +199,19 @@ class Block:
         )
 
 
+    @classmethod
+    def fromString(cls, blockString: str):
+        """Parses a block string, as used in Minecraft commands, into a block.\n
+        For example, "oak_stairs[half=top,facing=north]" becomes
+        Block("minecraft:oak_stairs", {"facing": "north", "half": "top"}). A trailing SNBT compound
+        is parsed into .data. The id gets the "minecraft:" namespace if it has none, and the
+        states are sorted by name. Parse results are cached, so parsing the same string repeatedly
+        is cheap.\n
+        Raises a ValueError if <blockString> is malformed."""
+        blockId, stateItems, data = _parseBlockString(blockString)
+        return cls(blockId, dict(stateItems), data)
+
+
     @staticmethod
     def fromBlockStateTag(blockStateTag: nbt.TAG_Compound, blockEntityTag: Optional[nbt.TAG_Compound] = None):
         """Parses a block state compound tag (as found in chunk palettes) into a Block.\n
@@ -108,9 +234,152 @@ class Block:
         return block
 
 
+_ORIENTATION_STATES = ("axis", "facing", "rotation")
+
+
+class FrozenBlock(Block):
+    """An immutable, interned Block.
+
+    Constructing a FrozenBlock returns the existing instance if an equal one has been constructed
+    before, so equal frozen blocks without .data are the same object. The id is stored with its namespace
+    ("stone" becomes "minecraft:stone"), and .states is a read-only mapping, sorted by name. An id
+    that is a full block string (e.g. "oak_stairs[facing=north]") is split up like
+    Block.fromString() does, so all equal blocks share one canonical form.
+
+    Frozen blocks are hashable, and copying one returns the block itself. Transformed variants are
+    computed once per (rotation, flip) and remembered. Changing a frozen block raises a
+    dataclasses.FrozenInstanceError; use .thaw() to get a mutable copy.
+
+    The Editor stores the blocks it places as frozen blocks, so the same block can be placed many
+    times without being copied.
+    """
+
+    # Blocks with block entity data are not interned, since their variety is unbounded.
+    _internTable: Dict[Tuple[Any, ...], "FrozenBlock"] = {}
+
+
+    def __new__(cls, id: Optional[str] = "minecraft:stone", states: Optional[Dict[str, str]] = None, data: Optional[str] = None): # pylint: disable=redefined-builtin
+        key = _canonicalBlockKey(id, states, data)
+        block = cls._internTable.get(key)
+        if block is not None:
+            return block
+        block = object.__new__(cls)
+        setAttribute = partial(object.__setattr__, block)
+        setAttribute("id",          key[0])
+        setAttribute("states",      MappingProxyType(dict(key[1])))
+        setAttribute("data",        key[2])
+        setAttribute("_key",        key)
+        setAttribute("_hash",       hash(key))
+        setAttribute("_oriented",   any(name in block.states for name in _ORIENTATION_STATES))
+        setAttribute("_string",     None)
+        setAttribute("_fragment",   None)
+        setAttribute("_transforms", {})
+        if key[2] is not None:
+            return block
+        # If another thread interned an equal block in the meantime, that one is used.
+        return cls._internTable.setdefault(key, block)
+
+
+    def __init__(self, id: Optional[str] = "minecraft:stone", states: Optional[Dict[str, str]] = None, data: Optional[str] = None): # pylint: disable=redefined-builtin,super-init-not-called
+        # Everything is set up by __new__(), which may return an existing instance.
+        pass
+
+
+    def __setattr__(self, name, value):
+        raise FrozenInstanceError(f"cannot assign to field '{name}' of a FrozenBlock")
+
+
+    def __delattr__(self, name):
+        raise FrozenInstanceError(f"cannot delete field '{name}' of a FrozenBlock")
+
+
+    def __hash__(self):
+        return self._hash
+
+
+    def __copy__(self):
+        return self
+
+
+    def __deepcopy__(self, memo):
+        return self
+
+
+    def __repr__(self):
+        return repr(self.thaw())
+
+
+    def __reduce__(self):
+        return (FrozenBlock, (self.id, dict(self.states), self.data))
+
+
+    @property
+    def key(self):
+        """The (id, sorted state items, data) tuple that identifies this block"""
+        return self._key
+
+
+    def _canonicalKey(self):
+        return self._key
+
+
+    def transform(self, rotation: int = 0, flip: Vec3bLike = bvec3()):
+        """Frozen blocks cannot be transformed in place: raises a FrozenInstanceError.\n
+        Use .transformed() instead."""
+        raise FrozenInstanceError("cannot transform a FrozenBlock in place; use .transformed()")
+
+
+    def transformed(self, rotation: int = 0, flip: Vec3bLike = bvec3()):
+        """Returns the frozen transformed variant of this block.\n
+        Flips first, rotates second. If the transformation does not change the block (e.g. because
+        it has no orientation-related states), the block itself is returned."""
+        if not self._oriented:
+            return self
+        transformKey = (rotation, bool(flip[0]), bool(flip[1]), bool(flip[2]))
+        if transformKey == (0, False, False, False):
+            return self
+        block = self._transforms.get(transformKey)
+        if block is None:
+            mutableBlock = self.thaw()
+            mutableBlock.transform(rotation, flip)
+            block = mutableBlock.freeze()
+            self._transforms[transformKey] = block
+        return block
+
+
+    def freeze(self):
+        """Returns this block."""
+        return self
+
+
+    def thaw(self):
+        """Returns a mutable Block that is equal to this block."""
+        return Block(self.id, dict(self.states), self.data)
+
+
+    def jsonFragment(self):
+        """Returns the "id", "state" and "data" members of the JSON representation of this block
+        that is used by the GDMC HTTP interface, without the enclosing braces."""
+        fragment = self._fragment
+        if fragment is None:
+            fragment = self.thaw().jsonFragment()
+            object.__setattr__(self, "_fragment", fragment)
+        return fragment
+
+
+    def __str__(self):
+        string = self._string
+        if string is None:
+            string = Block.__str__(self)
+            object.__setattr__(self, "_string", string)
+        return string
+
+
 def transformedBlockOrPalette(block: Union[Block, Sequence[Block]], rotation: int, flip: Vec3bLike):
-    """Convenience function that transforms a block or a palette of blocks."""
+    """Convenience function that transforms a block or a palette of blocks.\n
+    The results are FrozenBlocks (see FrozenBlock), so a block can be transformed repeatedly
+    without being copied each time."""
     if isinstance(block, Block):
-        return block.transformed(rotation, flip)
+        return block.freeze().transformed(rotation, flip)
     else:
-        return [b.transformed(rotation, flip) for b in block]
+        return [b.freeze().transformed(rotation, flip) for b in block]
@@ -0,0 +1,295 @@
+"""Provides the DenseBlockCache class, an array-backed block cache for a known region"""
+
+
+from typing import Iterator, List, Optional, Tuple
+from copy import copy
+
+import numpy as np
+import glm
+from glm import ivec3
+
+from .vector_tools import Vec3iLike, Box
+from .block import Block
+from .utils import OrderedByLookupDict
+from . import block_registry
+from .block_registry import STATE_ID_DTYPE
+
+
+def _blockKey(block: Block):
+    return block.freeze().key
+
+
+class DenseBlockCache:
+    """Block cache that stores the blocks in <region> as a dense array of state ids (see
+    `gdpc.block_registry`).\n
+    Every distinct block is stored once, in the block state registry. A valid-bit mask tracks which
+    positions of <region> are cached. Lookups inside <region> do not allocate anything, and
+    storing a block does not create a dict entry. Blocks outside of <region>, blocks with block
+    entity data and blocks beyond block_registry.MAX_STATE_IDS distinct blocks are stored in a least-recently-looked-up dict of at most
+    <fallbackLimit> entries, like the regular Editor cache.\n
+    The registry consists of FrozenBlocks, which are returned as they are for positions inside
+    <region>. Blocks of the fallback dict are returned as copies.\n
+    The interface is dict-like, so it can be used as the cache of an Editor (see
+    Editor.cacheRegion)."""
+
+    def __init__(self, region: Box, fallbackLimit: int = 8192):
+        self._region   = Box(region.offset, region.size)
+        self._ids      = np.zeros(tuple(self._region.size), dtype=STATE_ID_DTYPE)
+        self._valid    = np.zeros(tuple(self._region.size), dtype=bool)
+        self._fallback = OrderedByLookupDict[ivec3, Block](fallbackLimit)
+        self._count    = 0 # The amount of valid positions in the region
+
+    def __repr__(self):
+        return f"DenseBlockCache({repr(self._region)})"
+
+    @property
+    def region(self):
+        """The box whose blocks are stored densely"""
+        return self._region
+
+    @property
+    def palette(self):
+        """The blocks that the ids in .ids refer to: the registered blocks of
+        `gdpc.block_registry`"""
+        return block_registry.registeredBlocks()
+
+    @property
+    def ids(self):
+        """The state id of every position of .region, indexed with [x, y, z] relative to
+        .region.offset. Only meaningful where .valid is True. The array is read-only."""
+        view: np.ndarray = self._ids.view()
+        view.flags.writeable = False
+        return view
+
+    @property
+    def valid(self):
+        """Whether each position of .region is cached. The array is read-only."""
+        view: np.ndarray = self._valid.view()
+        view.flags.writeable = False
+        return view
+
+    @property
+    def fallback(self):
+        """The dict that stores the blocks outside of .region"""
+        return self._fallback
+
+    @property
+    def maxSize(self):
+        """The maximum amount of blocks outside of .region (0 for unlimited)"""
+        return self._fallback.maxSize
+
+    @maxSize.setter
+    def maxSize(self, value: int):
+        self._fallback.maxSize = value
+
+
+    def _index(self, position: Vec3iLike) -> Optional[Tuple[int, int, int]]:
+        offset = self._region.offset
+        size   = self._region.size
+        x = position[0] - offset.x
+        y = position[1] - offset.y
+        z = position[2] - offset.z
+        if 0 <= x < size.x and 0 <= y < size.y and 0 <= z < size.z:
+            return (x, y, z)
+        return None
+
+
+    def intern(self, block: Block) -> Optional[int]:
+        """Returns the state id of <block>, registering it if needed.\n
+        Returns None if <block> has block entity data or if the block state registry is full. Such
+        blocks are stored in the fallback dict."""
+        return block_registry.stateId(block)
+
+
+    def get(self, position: Vec3iLike, default=None):
+        """Returns the cached block at <position>, or <default> if it is not cached."""
+        index = self._index(position)
+        if index is not None and self._valid[index]:
+            return block_registry.blockOf(self._ids[index])
+        block = self._fallback.get(position)
+        return default if block is None else copy(block)
+
+    def peek(self, position: Vec3iLike, default=None):
+        """Like .get(), but does not count as a lookup for the fallback dict."""
+        index = self._index(position)
+        if index is not None and self._valid[index]:
+            return block_registry.blockOf(self._ids[index])
+        return self._fallback.peek(position, default)
+
+    def __contains__(self, position: Vec3iLike):
+        index = self._index(position)
+        if index is not None and self._valid[index]:
+            return True
+        return position in self._fallback
+
+    def __getitem__(self, position: Vec3iLike):
+        block = self.get(position)
+        if block is None:
+            raise KeyError(position)
+        return block
+
+    def __setitem__(self, position: Vec3iLike, block: Block):
+        index = self._index(position)
+        if index is not None:
+            stateId = self.intern(block)
+            if stateId is not None:
+                self._count += not self._valid[index]
+                self._ids[index]   = stateId
+                self._valid[index] = True
+                return
+            if self._valid[index]:
+                self._valid[index] = False
+                self._count -= 1
+        self._fallback[ivec3(*position)] = block
+
+    def __delitem__(self, position: Vec3iLike):
+        index = self._index(position)
+        if index is not None and self._valid[index]:
+            self._valid[index] = False
+            self._count -= 1
+            return
+        del self._fallback[ivec3(*position)]
+
+    def __len__(self):
+        return self._count + len(self._fallback)
+
+    def __iter__(self) -> Iterator[ivec3]:
+        return iter(self.keys())
+
+    def keys(self):
+        """Returns a list of all cached positions."""
+        return [position for position, _ in self.items()]
+
+    def items(self):
+        """Returns a list of (position, block) pairs of all cached positions."""
+        offset = self._region.offset
+        blocks = block_registry.registeredBlocks()
+        items = [(offset + ivec3(*index), blocks[self._ids[tuple(index)]]) for index in np.argwhere(self._valid)]
+        items.extend(self._fallback.items())
+        return items
+
+    def clear(self):
+        """Removes all cached blocks."""
+        self._valid[:] = False
+        self._count = 0
+        self._fallback.clear()
+
+
+    def _overlap(self, box: Box):
+        """Returns the slices of the region array and of a <box>-shaped array that cover the
+        overlap of <box> and the region, or None if they do not overlap."""
+        begin = glm.max(box.begin, self._region.begin)
+        end   = glm.min(box.end,   self._region.end)
+        if glm.any(glm.greaterThanEqual(begin, end)):
+            return None
+        regionBegin, regionEnd = begin - self._region.offset, end - self._region.offset
+        boxBegin,    boxEnd    = begin - box.offset,          end - box.offset
+        return (
+            np.s_[regionBegin.x:regionEnd.x, regionBegin.y:regionEnd.y, regionBegin.z:regionEnd.z],
+            np.s_[boxBegin.x:boxEnd.x,       boxBegin.y:boxEnd.y,       boxBegin.z:boxEnd.z]
+        )
+
+    def _fallbackPositions(self, box: Box):
+        return [position for position in self._fallback.keys() if box.contains(position)]
+
+
+    def getRegion(self, box: Box) -> Tuple[np.ndarray, np.ndarray]:
+        """Returns the cached blocks in <box> as (ids, valid) arrays of shape <box>.size, indexed
+        with [x, y, z] relative to <box>.offset. <ids> are state ids, and are only meaningful
+        where <valid> is True.\n
+        Only covers the part of <box> inside .region; see .fallback for the rest."""
+        ids   = np.zeros(tuple(box.size), dtype=STATE_ID_DTYPE)
+        valid = np.zeros(tuple(box.size), dtype=bool)
+        overlap = self._overlap(box)
+        if overlap is not None:
+            regionSlice, boxSlice = overlap
+            ids[boxSlice]   = self._ids[regionSlice]
+            valid[boxSlice] = self._valid[regionSlice]
+        return ids, valid
+
+    def setRegion(self, box: Box, palette: List[Block], ids: np.ndarray, mask: Optional[np.ndarray] = None):
+        """Stores the blocks <palette>[<ids>] in <box>, where <ids> is an array of shape <box>.size
+        indexed with [x, y, z] relative to <box>.offset.\n
+        If <mask> is given, only the positions where it is True are stored."""
+        if mask is None:
+            mask = np.ones(tuple(box.size), dtype=bool)
+        toStateId  = np.zeros(max(len(palette), 1), dtype=STATE_ID_DTYPE)
+        registered = np.zeros(max(len(palette), 1), dtype=bool)
+        for i in np.unique(ids[mask]):
+            stateId = self.intern(palette[i])
+            if stateId is not None:
+                toStateId[i]  = stateId
+                registered[i] = True
+        store = mask & registered[ids]
+        self.setStateIds(box, toStateId[ids], store)
+        # Blocks with block entity data, and blocks that do not fit in the registry anymore, go to the
+        # fallback dict.
+        for index in np.argwhere(mask & ~store):
+            self[box.offset + ivec3(*index)] = palette[ids[tuple(index)]]
+
+    def setStateIds(self, box: Box, stateIds: np.ndarray, mask: Optional[np.ndarray] = None):
+        """Stores the blocks with the state ids <stateIds> (an array of shape <box>.size indexed
+        with [x, y, z] relative to <box>.offset) in <box>.\n
+        If <mask> is given, only the positions where it is True are stored. For the part of <box>
+        inside .region, this is a plain array copy."""
+        mask = np.ones(tuple(box.size), dtype=bool) if mask is None else mask.copy()
+
+        overlap = self._overlap(box)
+        if overlap is not None:
+            regionSlice, boxSlice = overlap
+            store       = mask[boxSlice]
+            regionIds   = self._ids[regionSlice]
+            regionValid = self._valid[regionSlice]
+            self._count += int(np.count_nonzero(store & ~regionValid))
+            regionIds[store]   = stateIds[boxSlice][store]
+            regionValid[store] = True
+            mask[boxSlice] = False
+
+        # The rest goes to the fallback dict.
+        blocks = block_registry.registeredBlocks()
+        for index in np.argwhere(mask):
+            self._fallback[box.offset + ivec3(*index)] = blocks[stateIds[tuple(index)]]
+
+    def setStateIdsAt(self, positions: np.ndarray, stateIds: np.ndarray):
+        """Stores the blocks with the state ids <stateIds> at <positions>, an (N, 3) integer array of
+        positions. The positions inside .region are stored with array operations."""
+        local  = positions - np.array(self._region.offset)
+        inside = np.all((local >= 0) & (local < np.array(self._region.size)), axis=1)
+        flatIndices = np.ravel_multi_index(tuple(local[inside].T), self._valid.shape)
+        uniqueIndices = np.unique(flatIndices)
+        validFlat = self._valid.ravel()
+        self._count += int(np.count_nonzero(~validFlat[uniqueIndices]))
+        self._ids.ravel()[flatIndices] = stateIds[inside]
+        validFlat[uniqueIndices] = True
+
+        blocks = block_registry.registeredBlocks()
+        outside = ~inside
+        for position, stateId in zip(positions[outside].tolist(), stateIds[outside].tolist()):
+            self._fallback[ivec3(*position)] = blocks[stateId]
+
+    def fillBox(self, box: Box, block: Block):
+        """Stores <block> at every position of <box> inside .region, and updates the positions of
+        <box> that are cached in the fallback dict."""
+        overlap = self._overlap(box)
+        if overlap is not None:
+            regionSlice, _ = overlap
+            stateId = self.intern(block)
+            if stateId is None:
+                self._count -= int(np.count_nonzero(self._valid[regionSlice]))
+                self._valid[regionSlice] = False
+            else:
+                self._count += int(np.count_nonzero(~self._valid[regionSlice]))
+                self._ids[regionSlice]   = stateId
+                self._valid[regionSlice] = True
+        for position in self._fallbackPositions(box):
+            self._fallback[position] = block
+
+    def deleteBox(self, box: Box):
+        """Removes all cached blocks in <box>."""
+        overlap = self._overlap(box)
+        if overlap is not None:
+            regionSlice, _ = overlap
+            self._count -= int(np.count_nonzero(self._valid[regionSlice]))
+            self._valid[regionSlice] = False
+        for position in self._fallbackPositions(box):
+            del self._fallback[position]
@@ -0,0 +1,159 @@
+"""Provides the process-wide block state registry, which maps blocks to compact integer ids
+
+Every distinct block (in its canonical form, see `block.FrozenBlock`) that is registered gets a
+state id. Blocks with block entity data are never registered, since their variety is unbounded;
+they have to be stored separately. Ids are assigned in order of registration, are never reused, and fit in a uint16 array
+(see STATE_ID_DTYPE). Id 0 is the "nothing"-block (see `block.Block`).
+
+Since the ids are the same everywhere in a process, arrays of state ids from a WorldSlice, a Model
+or a DenseBlockCache can be combined with plain array operations, without converting blocks.
+
+Each id also has a set of BlockCategory flags, derived from `gdpc.lookup`. Use categories() to
+classify whole arrays of state ids at once.
+"""
+
+
+from typing import List, Optional, Sequence
+from enum import IntFlag
+import threading
+
+import numpy as np
+
+from .block import Block, FrozenBlock
+from . import lookup
+
+
+MAX_STATE_IDS  = 65536
+STATE_ID_DTYPE = np.uint16
+
+NOTHING_STATE_ID = 0
+
+
+class BlockCategory(IntFlag):
+    """Categories of blocks, as bit flags. Based on the block id sets in `gdpc.lookup`."""
+    NONE        = 0
+    AIR         = 1 << 0
+    WATER       = 1 << 1
+    LAVA        = 1 << 2
+    LIQUID      = 1 << 3
+    SOIL        = 1 << 4
+    STONE       = 1 << 5
+    SNOW        = 1 << 6
+    ICE         = 1 << 7
+    PLANT       = 1 << 8
+    TREE        = 1 << 9
+    LOG         = 1 << 10
+    LEAVES      = 1 << 11
+    INVISIBLE   = 1 << 12
+    FILTERING   = 1 << 13
+    UNOBTRUSIVE = 1 << 14
+    OBTRUSIVE   = 1 << 15
+    TRANSPARENT = 1 << 16
+
+
+_CATEGORY_IDS = (
+    (BlockCategory.AIR,         lookup.AIRS),
+    (BlockCategory.WATER,       lookup.WATERS),
+    (BlockCategory.LAVA,        lookup.LAVAS),
+    (BlockCategory.LIQUID,      lookup.LIQUIDS),
+    (BlockCategory.SOIL,        lookup.SOILS),
+    (BlockCategory.STONE,       lookup.STONES),
+    (BlockCategory.SNOW,        lookup.SNOWS),
+    (BlockCategory.ICE,         lookup.ICE_BLOCKS),
+    (BlockCategory.PLANT,       lookup.PLANTS),
+    (BlockCategory.TREE,        lookup.TREES),
+    (BlockCategory.LOG,         lookup.LOGS),
+    (BlockCategory.LEAVES,      lookup.LEAVES),
+    (BlockCategory.INVISIBLE,   lookup.INVISIBLE),
+    (BlockCategory.FILTERING,   lookup.FILTERING),
+    (BlockCategory.UNOBTRUSIVE, lookup.UNOBTRUSIVE),
+    (BlockCategory.OBTRUSIVE,   lookup.OBTRUSIVE),
+    (BlockCategory.TRANSPARENT, lookup.TRANSPARENT),
+)
+
+
+def _categoriesOfId(blockId: Optional[str]):
+    categories = BlockCategory.NONE
+    for category, blockIds in _CATEGORY_IDS:
+        if blockId in blockIds:
+            categories |= category
+    return categories
+
+
+_lock = threading.Lock()
+_blocks: List[FrozenBlock] = [FrozenBlock(None)]
+_stateIds = {_blocks[0]: NOTHING_STATE_ID}
+_categories = np.zeros(256, dtype=np.uint32)
+
+
+def stateId(block: Block) -> Optional[int]:
+    """Returns the state id of <block>, registering it if needed.\n
+    Returns None if <block> has block entity data (.data), or if the registry is full (see
+    MAX_STATE_IDS)."""
+    if block.data is not None:
+        return None
+    frozen = block.freeze()
+    i = _stateIds.get(frozen)
+    if i is not None:
+        return i
+    with _lock:
+        i = _stateIds.get(frozen)
+        if i is not None:
+            return i
+        i = len(_blocks)
+        if i >= MAX_STATE_IDS:
+            return None
+        global _categories # pylint: disable=global-statement
+        if i >= len(_categories):
+            _categories = np.concatenate([_categories, np.zeros_like(_categories)])
+        _categories[i] = _categoriesOfId(frozen.id)
+        _blocks.append(frozen)
+        _stateIds[frozen] = i
+    return i
+
+
+def stateIds(blocks: Sequence[Optional[Block]]) -> np.ndarray:
+    """Returns the state ids of <blocks> as an array, registering them if needed.\n
+    None entries get NOTHING_STATE_ID. Raises a ValueError if a block has block entity data, or if
+    the registry is full."""
+    ids = np.empty(len(blocks), dtype=STATE_ID_DTYPE)
+    for index, block in enumerate(blocks):
+        i = NOTHING_STATE_ID if block is None else stateId(block)
+        if i is None:
+            if block.data is not None:
+                raise ValueError(f"Cannot register {block}: blocks with block entity data have no state id")
+            raise ValueError(f"Cannot register {block}: the block state registry is full")
+        ids[index] = i
+    return ids
+
+
+def blockOf(i: int) -> FrozenBlock:
+    """Returns the block with state id <i>."""
+    return _blocks[i]
+
+
+def registeredBlocks() -> Sequence[FrozenBlock]:
+    """Returns the registered blocks, indexed by state id.\n
+    The returned sequence grows when more blocks are registered. Do not modify it."""
+    return _blocks
+
+
+def jsonFragment(i: int) -> str:
+    """Returns the JSON fragment of the block with state id <i> (see Block.jsonFragment())."""
+    return _blocks[i].jsonFragment()
+
+
+def categories(ids) -> np.ndarray:
+    """Returns the BlockCategory flags of the state id or array of state ids <ids>."""
+    return _categories[ids]
+
+
+def hasCategory(ids, category: BlockCategory) -> np.ndarray:
+    """Returns whether the blocks with the state id or array of state ids <ids> are in any of the
+    categories in <category>."""
+    return (_categories[ids] & category) != 0
+
+
+def stateCount():
+    """Returns the amount of registered block states, including the "nothing"-block."""
+    return len(_blocks)
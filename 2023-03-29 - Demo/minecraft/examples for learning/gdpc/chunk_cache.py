@@ -0,0 +1,157 @@
+"""Provides the ChunkCache class, an on-disk cache for raw chunk data"""
+
+
+from typing import Callable, Iterable, List, Optional
+import os
+import struct
+import logging
+
+from glm import ivec2
+
+from .vector_tools import Rect
+from .nbt_tools import NbtView, TAG_END, TAG_COMPOUND, TAG_LIST
+
+
+logger = logging.getLogger(__name__)
+
+
+def splitChunks(chunkBytes: bytes) -> List[bytes]:
+    """Splits the binary NBT response of the /chunks endpoint into the compound payloads of the
+    individual chunks, in the order in which they appear in the response."""
+    view = NbtView(chunkBytes)
+    rootType, _ = view.readTagHeader()
+    if rootType != TAG_COMPOUND:
+        raise ValueError("Invalid chunk data: the root tag is not a compound")
+    chunks = []
+    for tagType, name in view.iterCompound():
+        if name != "Chunks":
+            view.skipPayload(tagType)
+            continue
+        for elementType in view.iterList():
+            begin = view.pos
+            view.skipPayload(elementType)
+            chunks.append(bytes(view.buffer[begin:view.pos]))
+    return chunks
+
+
+def joinChunks(chunkPayloads: Iterable[bytes]) -> bytes:
+    """Joins chunk compound payloads into binary NBT in the format of a /chunks response.\n
+    This is the inverse of splitChunks()."""
+    chunkPayloads = list(chunkPayloads)
+    name = b"Chunks"
+    return b"".join([
+        struct.pack(">BH", TAG_COMPOUND, 0),
+        struct.pack(">BH", TAG_LIST, len(name)), name,
+        struct.pack(">Bi", TAG_COMPOUND, len(chunkPayloads)),
+        *chunkPayloads,
+        struct.pack(">B", TAG_END),
+    ])
+
+
+class ChunkCache:
+    """Stores raw chunk data on disk, so that world slices of the same area can be loaded without
+    requesting the chunks from the GDMC HTTP interface again.\n
+    Chunks are keyed by Minecraft version, dimension and chunk coordinates. The cache does not know
+    which world it belongs to: use a separate directory for each world.\n
+    The cache cannot see changes to the world that are made by other means than the Editor it is
+    attached to (the Editor invalidates the chunks it places blocks in). Call .clear() or
+    .invalidate() after changing the world in other ways."""
+
+    def __init__(self, directory: str):
+        self._directory = directory
+        # Chunks that have been invalidated since they were last stored. Avoids touching the disk
+        # again for every block placed in the same chunk.
+        self._invalidated = set()
+
+    def __repr__(self):
+        return f"ChunkCache({repr(self._directory)})"
+
+    @property
+    def directory(self):
+        """The directory this cache stores its files in"""
+        return self._directory
+
+
+    def _path(self, version: str, dimension: Optional[str], chunkPosition: ivec2):
+        return os.path.join(
+            self._directory, version, dimension or "overworld", f"{chunkPosition.x}.{chunkPosition.y}.nbt"
+        )
+
+
+    def load(self, version: str, dimension: Optional[str], chunkPosition: ivec2) -> Optional[bytes]:
+        """Returns the cached compound payload of the chunk at <chunkPosition>, or None if it is not
+        cached."""
+        try:
+            with open(self._path(version, dimension, chunkPosition), "rb") as file:
+                return file.read()
+        except FileNotFoundError:
+            return None
+
+
+    def store(self, version: str, dimension: Optional[str], chunkPosition: ivec2, chunkPayload: bytes):
+        """Stores the compound payload of the chunk at <chunkPosition>."""
+        path = self._path(version, dimension, chunkPosition)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Write to a temporary file first, so that a concurrent reader never sees a partial file.
+        temporaryPath = f"{path}.{os.getpid()}.tmp"
+        with open(temporaryPath, "wb") as file:
+            file.write(chunkPayload)
+        os.replace(temporaryPath, path)
+        self._invalidated.discard((version, dimension, chunkPosition.x, chunkPosition.y))
+
+
+    def invalidate(self, version: str, dimension: Optional[str], chunkPosition: ivec2):
+        """Removes the chunk at <chunkPosition> from the cache, if it is cached."""
+        key = (version, dimension, chunkPosition.x, chunkPosition.y)
+        if key in self._invalidated:
+            return
+        try:
+            os.remove(self._path(version, dimension, chunkPosition))
+        except FileNotFoundError:
+            pass
+        self._invalidated.add(key)
+
+
+    def clear(self):
+        """Removes all cached chunks."""
+        for root, _, fileNames in os.walk(self._directory):
+            for fileName in fileNames:
+                if fileName.endswith(".nbt"):
+                    os.remove(os.path.join(root, fileName))
+        self._invalidated.clear()
+
+
+    def getChunks(
+        self,
+        version:   str,
+        dimension: Optional[str],
+        chunkRect: Rect,
+        fetch:     Callable[[Rect], bytes]
+    ) -> bytes:
+        """Returns the chunks in <chunkRect> as binary NBT in the format of a /chunks response.\n
+        If all chunks are cached, they are read from disk. Otherwise, the whole <chunkRect> is
+        retrieved with <fetch> (a function that takes a chunk Rect and returns /chunks response
+        bytes), and the retrieved chunks are stored."""
+        # The /chunks endpoint lists chunks in ZX order (x varies fastest).
+        chunkPositions = [
+            chunkRect.offset + ivec2(x, z) for z in range(chunkRect.size.y) for x in range(chunkRect.size.x)
+        ]
+
+        chunkPayloads = []
+        for chunkPosition in chunkPositions:
+            chunkPayload = self.load(version, dimension, chunkPosition)
+            if chunkPayload is None:
+                break
+            chunkPayloads.append(chunkPayload)
+        else:
+            logger.debug("Loaded %i chunks from the chunk cache", len(chunkPayloads))
+            return joinChunks(chunkPayloads)
+
+        chunkBytes = fetch(chunkRect)
+        fetchedPayloads = splitChunks(chunkBytes)
+        if len(fetchedPayloads) != len(chunkPositions):
+            logger.warning("Unexpected amount of chunks received; not caching them.")
+            return chunkBytes
+        for chunkPosition, chunkPayload in zip(chunkPositions, fetchedPayloads):
+            self.store(version, dimension, chunkPosition, chunkPayload)
+        return chunkBytes
@@ -2,28 +2,96 @@
 world through the GDMC HTTP interface"""
 
 
-from typing import Dict, Sequence, Union, Optional, List, Iterable
+from typing import Dict, Sequence, Union, Optional, List, Iterable, Tuple
 from numbers import Integral
 from contextlib import contextmanager
-from copy import copy, deepcopy
+from copy import deepcopy
 import random
 from concurrent import futures
+import threading
 import logging
 
 import numpy as np
+import glm
 from glm import ivec3
 
 from .utils import eagerAll, OrderedByLookupDict
-from .vector_tools import Vec3iLike, Rect, Box, addY, dropY
+from .vector_tools import Vec3iLike, Rect, Box, addY, dropY, loop2D, loop3D, splitBox, partitionIntoBoxes, partitionMaskIntoBoxes, rotate3D, flipToScale3D
 from .transform import Transform, TransformLike, toTransform
-from .block import Block, transformedBlockOrPalette
+from .block import Block, FrozenBlock, transformedBlockOrPalette
+from . import block_registry
 from . import interface
 from .world_slice import WorldSlice
+from .chunk_cache import ChunkCache
+from .block_cache import DenseBlockCache, _blockKey
 
 
 logger = logging.getLogger(__name__)
 
 
+# The maximum amount of blocks that a single `fill` command may change.
+MAX_FILL_VOLUME = 32768
+# Boxes of identical blocks smaller than this are placed block by block instead of with `fill`.
+MIN_FILL_VOLUME = 2
+# Coalesced block reads fetch whole chunk sections of this size, widened along the direction of
+# sequential misses by up to READ_AHEAD_MAX_SECTIONS sections.
+READ_SECTION_SIZE = 16
+READ_AHEAD_MAX_SECTIONS = 8
+
+
+def _chunkHash(chunkX: int, chunkZ: int):
+    """Spreads chunk coordinates evenly over hash values. (Python's tuple hash clusters badly for
+    small integers.)"""
+    return (chunkX * 73856093) ^ (chunkZ * 19349663)
+
+
+def _transformAxes(transform: Transform):
+    """Returns (axes, flippedAxes), where <axes>[i] is the global axis that local axis i is mapped
+    to by <transform>, and <flippedAxes> lists the local axes that are reversed."""
+    axes:        List[int] = []
+    flippedAxes: List[int] = []
+    for axis in range(3):
+        unit = ivec3(0, 0, 0)
+        unit[axis] = 1
+        direction = rotate3D(unit * flipToScale3D(transform.flip), transform.rotation)
+        globalAxis = [i for i in range(3) if direction[i] != 0][0]
+        axes.append(globalAxis)
+        if direction[globalAxis] < 0:
+            flippedAxes.append(axis)
+    return axes, flippedAxes
+
+
+def _fillCommand(box: Box, block: Union[Block, str], mode: str = ""):
+    """Returns the `fill` command that fills <box> with <block>, in fill mode <mode>."""
+    return f"fill {' '.join(str(c) for c in box.begin)} {' '.join(str(c) for c in box.last)} {block}{mode}"
+
+
+def _keysInBoxes(mapping, boxes: List[Box]) -> List[ivec3]:
+    """Returns the keys of <mapping> that lie in any of <boxes>.\n
+    Iterates over the points of the boxes or over the keys, whichever is cheaper."""
+    if sum(box.volume for box in boxes) <= len(mapping):
+        return [position for position in dict.fromkeys(p for box in boxes for p in box.inner) if position in mapping]
+    bounds = Box.bounding([corner for box in boxes for corner in (box.begin, box.last)])
+    return [p for p in mapping.keys() if bounds.contains(p) and any(box.contains(p) for box in boxes)]
+
+
+# The error that `fill` reports if every block in its box already is the fill block.
+_UNCHANGED_FILL_MESSAGE = "no blocks were filled"
+
+
+def _logCommandErrors(response: List[Tuple[bool, str]], description: str):
+    """Logs the failed entries of the interface.runCommand() <response>.\n
+    `fill` commands that did not change any block are not actual failures; they are only logged at
+    debug level."""
+    for entry in response:
+        if entry[0]:
+            continue
+        if _UNCHANGED_FILL_MESSAGE in str(entry[1]).lower():
+            logger.debug("Fill command did not change any blocks:\n  %s", entry[1])
+        else:
+            logger.error("Server returned error upon running %s:\n  %s", description, entry[1])
+
+
 class Editor:
     """Provides a high-level functions to interact with the Minecraft world through the GDMC HTTP
     interface.
@@ -42,15 +110,29 @@ class Editor:
         cacheLimit            = 8192,
         multithreading        = False,
         multithreadingWorkers = 1,
+        multithreadingQueueLimit = 4,
         retries               = 4,
         timeout               = None,
         host                  = interface.DEFAULT_HOST,
+        poolSize              = interface.DEFAULT_POOL_SIZE,
+        chunkCache: Optional[ChunkCache] = None,
+        fillCommands          = False,
+        bufferFillCommands    = False,
+        skipUnchangedBlocks   = False,
+        compression: Optional[str] = None,
+        compressionThreshold  = interface.DEFAULT_COMPRESSION_THRESHOLD,
+        compressResponses     = True,
+        readCoalescing        = False,
+        cacheRegion: Optional[Box] = None,
     ):
         """Constructs an Editor instance with the specified transform and settings"""
         self._retries = retries
         self._timeout = timeout
         self._host    = host
 
+        # Pooled keep-alive HTTP sessions, shared by this editor and its buffer flush threads.
+        self._sessionPool = interface.SessionPool(poolSize)
+
         self._transform = Transform() if transformLike is None else toTransform(transformLike)
 
         self._dimension = dimension
@@ -59,12 +141,16 @@ class Editor:
         self._bufferLimit = bufferLimit
         self._buffer: Dict[ivec3,Block] = {}
         self._commandBuffer: List[str] = []
+        self._fillCommandBuffer: List[str] = [] # Sent before the buffered blocks (see .fillBoxesGlobal())
 
         self._caching = caching
-        self._cache = OrderedByLookupDict[ivec3,Block](cacheLimit)
+        self._cache: Union[OrderedByLookupDict[ivec3,Block], DenseBlockCache] = OrderedByLookupDict[ivec3,Block](cacheLimit)
+        if cacheRegion is not None:
+            self.cacheRegion = cacheRegion # The property setter replaces the cache.
 
         self._multithreading = False
         self._multithreadingWorkers = multithreadingWorkers
+        self._multithreadingQueueLimit = multithreadingQueueLimit
         self.multithreading = multithreading # The property setter initializes the multithreading system.
         self._bufferFlushFutures: List[futures.Future] = []
 
@@ -76,6 +162,33 @@ class Editor:
         self._worldSlice: Optional[WorldSlice] = None
         self._worldSliceDecay: Optional[np.ndarray] = None
 
+        self._chunkCache = chunkCache
+        self._minecraftVersion: Optional[str] = None # Retrieved when first needed
+
+        self._fillCommands       = fillCommands
+        self._bufferFillCommands = bufferFillCommands
+
+        self._skipUnchangedBlocks = skipUnchangedBlocks
+        self._skippedBlocks       = 0
+
+        self._flushedBlocks = 0
+        self._bufferFlushes = 0
+
+        self.compression           = compression # The property setter validates the method.
+        self._compressionThreshold = compressionThreshold
+        self._compressResponses    = compressResponses
+
+        self._readCoalescing = readCoalescing
+        # Coalesced reads that are in progress, as (box, future) pairs. Other threads that miss
+        # inside such a box wait for its future instead of sending their own request.
+        self._pendingReads: List[Tuple[Box, futures.Future]] = []
+        self._pendingReadsLock = threading.Lock()
+        # The chunk section of the last coalesced miss, the section step that led to it and the
+        # current read-ahead length (in sections).
+        self._readAheadSection: Optional[ivec3] = None
+        self._readAheadStep:    Optional[ivec3] = None
+        self._readAheadLength = 1
+
 
     def __del__(self):
         """Cleans up this Editor instance"""
@@ -87,6 +200,7 @@ class Editor:
         # "RuntimeError: cannot schedule new futures after shutdown" even if the executor has not
         # actually shut down yet. For safety, the last buffer flush must be done on the main thread.
         self.flushBuffer()
+        self._sessionPool.close()
 
 
     @property
@@ -156,35 +270,76 @@ class Editor:
     def cacheLimit(self, value: int):
         self._cache.maxSize = value
 
+    @property
+    def cacheRegion(self) -> Optional[Box]:
+        """The region whose blocks are cached densely, or None\n
+        If set, the block cache stores the blocks in this box (usually the build area) as an array
+        of palette ids with an interned palette, instead of as one dict entry per block (see
+        DenseBlockCache). Blocks outside of it are cached as usual, up to .cacheLimit blocks.\n
+        Cache hits inside the region do not create a dict entry or a new cached block.\n
+        Changing the region drops the blocks that were cached in the previous region."""
+        return self._cache.region if isinstance(self._cache, DenseBlockCache) else None
+
+    @cacheRegion.setter
+    def cacheRegion(self, value: Optional[Box]):
+        oldCache = self._cache
+        if value is None:
+            self._cache = OrderedByLookupDict[ivec3,Block](self.cacheLimit)
+        else:
+            self._cache = DenseBlockCache(value, self.cacheLimit)
+        # Keep the blocks that were not cached densely.
+        oldEntries = oldCache.fallback if isinstance(oldCache, DenseBlockCache) else oldCache
+        for position, block in oldEntries.items():
+            self._cache[position] = block
+
+    @property
+    def readCoalescing(self):
+        """Whether block retrievals that miss the cache, the buffer and the cached world slice
+        retrieve a whole region at once\n
+        A miss then retrieves the chunk section (16x16x16 blocks) that contains the block with a
+        single request, and stores its blocks in the cache. Misses that advance section by section
+        along an axis (like a walk down a column, or along a row) are detected, and the read-ahead
+        is widened in that direction, up to READ_AHEAD_MAX_SECTIONS sections. Threads that miss
+        inside a region that is already being retrieved wait for it instead of sending their own
+        request.\n
+        Only has an effect if caching is enabled. The retrieved regions are limited to .cacheLimit
+        blocks, so raise it to benefit from longer read-aheads. See also .prefetch()."""
+        return self._readCoalescing
+
+    @readCoalescing.setter
+    def readCoalescing(self, value: bool):
+        self._readCoalescing = value
+
     @property
     def multithreading(self):
-        """Whether multithreaded buffer flushing is enabled"""
+        """Whether multithreaded buffer flushing is enabled\n
+        Buffer flushes are then sent by .multithreadingWorkers background threads. The buffered blocks
+        are partitioned by chunk, and all blocks of a chunk are always sent by the same thread, in
+        the order in which they were flushed. Different chunks are sent in parallel. Buffered
+        commands (see .runCommand() and .fillBoxesGlobal()) act as a barrier: the flush that contains
+        them waits until all blocks flushed before them have been placed, and then runs them on the
+        calling thread. The final state of the world is therefore the same as with a single thread.\n
+        At most .multithreadingQueueLimit flush tasks per thread can be pending. When that limit is
+        reached, .flushBuffer() blocks until one of them has finished."""
         return self._multithreading
 
     @multithreading.setter
     def multithreading(self, value: bool):
         if not self._multithreading and value:
-            self._bufferFlushExecutor = futures.ThreadPoolExecutor(self._multithreadingWorkers)
-            if self._multithreadingWorkers > 1:
-                logger.warning(
-                    "Multithreading with more than one worker thread.\n"
-                    "An editor has been set to use multithreaded buffer flushing with more than one\n"
-                    "worker thread.\n"
-                    "The editor can no longer guarantee that blocks will be placed in the same order\n"
-                    "as they were sent. If buffering or caching is used, this can also cause the\n"
-                    "caches to become inconsistent with the actual world.\n"
-                    "Multithreading with more than one worker thread can speed up block placement on\n"
-                    "some machines, which can be nice during development, but it is NOT RECOMMENDED\n"
-                    "for production code."
-                )
+            # One single-threaded executor per worker: each executor runs its flush tasks in order.
+            self._bufferFlushExecutors = [
+                futures.ThreadPoolExecutor(1) for _ in range(self._multithreadingWorkers)
+            ]
         elif self._multithreading and not value:
-            self._bufferFlushExecutor.shutdown(wait=True)
-            del self._bufferFlushExecutor
+            for executor in self._bufferFlushExecutors:
+                executor.shutdown(wait=True)
+            del self._bufferFlushExecutors
         self._multithreading = value
 
     @property
     def multithreadingWorkers(self):
-        """The amount of buffer flush worker threads."""
+        """The amount of buffer flush worker threads.\n
+        Each thread uses its own connection to the GDMC HTTP interface."""
         return self._multithreadingWorkers
 
     @multithreadingWorkers.setter
@@ -195,6 +350,16 @@ class Editor:
             self.multithreading = False
             self.multithreading = True
 
+    @property
+    def multithreadingQueueLimit(self):
+        """The maximum amount of pending buffer flush tasks per worker thread\n
+        Each flush is split into one task per worker thread that it has blocks for."""
+        return self._multithreadingQueueLimit
+
+    @multithreadingQueueLimit.setter
+    def multithreadingQueueLimit(self, value: int):
+        self._multithreadingQueueLimit = value
+
     @property
     def doBlockUpdates(self):
         """Whether placed blocks should receive a block update"""
@@ -250,8 +415,139 @@ class Editor:
             self._cache.clear()
             self._worldSlice      = None
             self._worldSliceDecay = None
+            self._minecraftVersion = None
+            self.closeConnections()
         self._host = value
 
+    @property
+    def poolSize(self):
+        """The maximum amount of kept-alive HTTP connections to the GDMC HTTP interface, per thread\n
+        Changing the pool size closes all current connections."""
+        return self._sessionPool.poolSize
+
+    @poolSize.setter
+    def poolSize(self, value: int):
+        self._sessionPool.poolSize = value
+
+    @property
+    def chunkCache(self):
+        """The on-disk ChunkCache consulted by .loadWorldSlice(), or None\n
+        Placing blocks through this editor invalidates the cached chunks they are placed in."""
+        return self._chunkCache
+
+    @chunkCache.setter
+    def chunkCache(self, value: Optional[ChunkCache]):
+        self._chunkCache = value
+
+    @property
+    def fillCommands(self):
+        """Whether the shape functions of gdpc.geometry place axis-aligned boxes of identical blocks
+        with `fill` commands\n
+        Only the points that do not form such boxes are then placed block by block. See
+        .fillBoxesGlobal() for how `fill` commands differ from regular block placement."""
+        return self._fillCommands
+
+    @fillCommands.setter
+    def fillCommands(self, value: bool):
+        self._fillCommands = value
+
+    @property
+    def bufferFillCommands(self):
+        """Whether buffer flushes send boxes of identical buffered blocks as `fill` commands\n
+        At flush time, the buffered blocks are searched for maximal boxes of identical blocks
+        (greedy meshing). These boxes are sent as `fill` commands, and only the remaining blocks are
+        sent individually. This reduces the size of flushes of hand-written loops of block
+        placements without any changes to the code that places the blocks. The `fill` commands are
+        sent before the remaining blocks of the flush, so that blocks that need support (such as
+        torches or doors) are placed after the walls and floors they are attached to.\n
+        Since `fill` commands always cause block updates, flushes are not combined while
+        .doBlockUpdates is disabled."""
+        return self._bufferFillCommands
+
+    @bufferFillCommands.setter
+    def bufferFillCommands(self, value: bool):
+        self._bufferFillCommands = value
+
+    @property
+    def skipUnchangedBlocks(self):
+        """Whether to skip placing blocks that are already in the world\n
+        A placement is skipped if the cached world slice covers its position, the world slice has not
+        decayed there (see .worldSliceDecay), and the block in the world slice has the same id and
+        exactly the same block states as the placed block. For example, Block("oak_log") is not
+        skipped over an oak_log with axis=x. Blocks with .data are never skipped.\n
+        Skipped placements are counted in .skippedBlocks."""
+        return self._skipUnchangedBlocks
+
+    @skipUnchangedBlocks.setter
+    def skipUnchangedBlocks(self, value: bool):
+        self._skipUnchangedBlocks = value
+
+    @property
+    def skippedBlocks(self):
+        """The amount of block placements skipped because of .skipUnchangedBlocks\n
+        Can be set (e.g. to 0) to reset the count."""
+        return self._skippedBlocks
+
+    @skippedBlocks.setter
+    def skippedBlocks(self, value: int):
+        self._skippedBlocks = value
+
+    @property
+    def flushedBlocks(self):
+        """The amount of blocks sent by buffer flushes\n
+        Can be set (e.g. to 0) to reset the count."""
+        return self._flushedBlocks
+
+    @flushedBlocks.setter
+    def flushedBlocks(self, value: int):
+        self._flushedBlocks = value
+
+    @property
+    def bufferFlushes(self):
+        """The amount of buffer flushes that sent blocks or commands\n
+        Can be set (e.g. to 0) to reset the count."""
+        return self._bufferFlushes
+
+    @bufferFlushes.setter
+    def bufferFlushes(self, value: int):
+        self._bufferFlushes = value
+
+    @property
+    def compression(self):
+        """The method ("gzip" or "deflate") with which block placement request bodies are
+        compressed, or None to not compress them\n
+        Only bodies of at least .compressionThreshold bytes are compressed. If the GDMC HTTP
+        interface does not accept compressed bodies, they are sent uncompressed instead (see
+        interface.placeBlocks())."""
+        return self._compression
+
+    @compression.setter
+    def compression(self, value: Optional[str]):
+        if value is not None and value not in interface.COMPRESSION_METHODS:
+            raise ValueError(f'Unknown compression method "{value}"')
+        self._compression = value
+
+    @property
+    def compressionThreshold(self):
+        """The minimum size in bytes of block placement request bodies that are compressed (see
+        .compression)"""
+        return self._compressionThreshold
+
+    @compressionThreshold.setter
+    def compressionThreshold(self, value: int):
+        self._compressionThreshold = value
+
+    @property
+    def compressResponses(self):
+        """Whether the GDMC HTTP interface may send compressed block, biome and chunk data\n
+        Compression reduces the transferred data considerably, but costs some time on both ends. If
+        the interface runs on the same machine, disabling it may be faster."""
+        return self._compressResponses
+
+    @compressResponses.setter
+    def compressResponses(self, value: bool):
+        self._compressResponses = value
+
     @property
     def worldSlice(self):
         """The cached WorldSlice"""
@@ -304,7 +600,7 @@ class Editor:
         if self.buffering and syncWithBuffer:
             self._commandBuffer.append(command)
             return
-        result = interface.runCommand(command, dimension=self.dimension, retries=self.retries, timeout=self.timeout, host=self.host)
+        result = interface.runCommand(command, dimension=self.dimension, retries=self.retries, timeout=self.timeout, host=self.host, session=self._sessionPool.session)
         if not result[0][0]:
             logger.error("Server returned error upon running command:\n  %s", result[0][1])
 
@@ -312,7 +608,7 @@ class Editor:
     def getBuildArea(self) -> Box:
         """Returns the build area that was specified by /setbuildarea in-game.\n
         The build area is always in **global coordinates**; self.transform is ignored."""
-        return interface.getBuildArea(retries=self.retries, timeout=self.timeout, host=self.host)
+        return interface.getBuildArea(retries=self.retries, timeout=self.timeout, host=self.host, session=self._sessionPool.session)
 
 
     def setBuildArea(self, buildArea: Box):
@@ -327,26 +623,33 @@ class Editor:
         <position> is interpreted as local to the coordinate system defined by self.transform.
         The returned block's orientation is also from the perspective of self.transform.\n
         If the given coordinates are invalid, returns Block("minecraft:void_air")."""
-        block = self.getBlockGlobal(self.transform * position)
+        block = self._getFrozenBlockGlobal(self.transform * position)
         invTransform = ~self.transform
-        block.transform(invTransform.rotation, invTransform.flip)
-        return block
+        if invTransform.rotation != 0 or any(invTransform.flip):
+            block = block.transformed(invTransform.rotation, invTransform.flip)
+        return block.thaw()
 
 
     def getBlockGlobal(self, position: Vec3iLike):
         """Returns the block at [position], ignoring self.transform.\n
         If the given coordinates are invalid, returns Block("minecraft:void_air")."""
+        return self._getFrozenBlockGlobal(position).thaw()
+
+
+    def _getFrozenBlockGlobal(self, position: Vec3iLike) -> FrozenBlock:
+        """Returns the block at [position] as a FrozenBlock, ignoring self.transform.\n
+        Cache and buffer hits return the stored block itself, without allocating anything."""
         _position = ivec3(*position)
 
         if self.caching:
             block = self._cache.get(_position)
             if block is not None:
-                return copy(block)
+                return block
 
         if self.buffering:
             block = self._buffer.get(_position)
             if block is not None:
-                return copy(block)
+                return block
 
         if (
             self._worldSlice is not None and
@@ -354,15 +657,203 @@ class Editor:
             not self._worldSliceDecay[tuple(_position - self._worldSlice.box.offset)]
         ):
             block = self._worldSlice.getBlockGlobal(_position)
+        elif self._readCoalescing and self.caching:
+            block = self._getBlockCoalescedGlobal(_position)
         else:
-            block = interface.getBlocks(_position, dimension=self.dimension, includeState=True, includeData=True, retries=self.retries, timeout=self.timeout, host=self.host)[0][1]
+            block = interface.getBlocks(_position, dimension=self.dimension, includeState=True, includeData=True, compressResponses=self._compressResponses, retries=self.retries, timeout=self.timeout, host=self.host, session=self._sessionPool.session)[0][1]
 
+        block = block.freeze()
         if self.caching:
-            self._cache[_position] = copy(block)
+            self._cache[_position] = block
 
         return block
 
 
+    def _readAheadBox(self, position: ivec3):
+        """Returns the box that a coalesced read of <position> retrieves, and updates the sequential
+        access detection."""
+        section = position // READ_SECTION_SIZE
+        step = None if self._readAheadSection is None else section - self._readAheadSection
+        if step is not None and step == self._readAheadStep and sum(abs(c) for c in step) == 1:
+            self._readAheadLength = min(2 * self._readAheadLength, READ_AHEAD_MAX_SECTIONS)
+        else:
+            self._readAheadLength = 1
+        self._readAheadSection = section
+        self._readAheadStep    = step
+
+        # Stay within the cache, so that the retrieved blocks do not evict each other.
+        sectionVolume = READ_SECTION_SIZE**3
+        length = max(1, min(self._readAheadLength, self.cacheLimit // sectionVolume))
+
+        # Extend the read ahead of the misses, in the direction in which they advance.
+        ahead = section if length == 1 else section + step * (length - 1)
+        begin = glm.min(section, ahead) * READ_SECTION_SIZE
+        end   = (glm.max(section, ahead) + 1) * READ_SECTION_SIZE
+        return Box(begin, end - begin)
+
+
+    def _getBlockCoalescedGlobal(self, position: ivec3):
+        """Retrieves the block at <position> together with the region around it (see
+        .readCoalescing)."""
+        owner = False
+        with self._pendingReadsLock:
+            for box, future in self._pendingReads:
+                if box.contains(position):
+                    break
+            else:
+                # A read that covered <position> may have finished since the cache was checked.
+                block = self._cache.peek(position)
+                if block is not None:
+                    return block
+                box = self._readAheadBox(position)
+                future = futures.Future()
+                self._pendingReads.append((box, future))
+                owner = True
+
+        if owner:
+            try:
+                future.set_result(self.getBlocksRegionGlobal(box))
+            except BaseException as e:
+                future.set_exception(e)
+                raise
+            finally:
+                with self._pendingReadsLock:
+                    self._pendingReads.remove((box, future))
+
+        palette, ids = future.result()
+        return palette[ids[tuple(position - box.offset)]].freeze()
+
+
+    def prefetch(self, box: Box):
+        """Retrieves the blocks in [box] with a single request and stores them in the cache, so
+        that later block retrievals in [box] do not need a request each.\n
+        <box> is interpreted as local to the coordinate system defined by self.transform.\n
+        See .prefetchGlobal()."""
+        self.prefetchGlobal(Box.between(self.transform * box.begin, self.transform * box.last))
+
+
+    def prefetchGlobal(self, box: Box):
+        """Retrieves the blocks in [box] with a single request and stores them in the cache, so
+        that later block retrievals in [box] do not need a request each. Ignores self.transform.\n
+        Positions that are covered by the buffer or the cached world slice are not requested.
+        Since the blocks are stored in the cache, this requires caching to be enabled, and at most
+        .cacheLimit blocks stay cached."""
+        if not self.caching:
+            logger.warning("Editor.prefetch() has no effect if caching is disabled.")
+            return
+        if box.volume > self.cacheLimit:
+            logger.warning("Prefetching %i blocks, but the cache only holds %i. Consider raising .cacheLimit.", box.volume, self.cacheLimit)
+        self.getBlocksRegionGlobal(box)
+
+
+    def getBlocksRegion(self, box: Box) -> Tuple[List[Block], np.ndarray]:
+        """Returns the blocks in [box] as a (palette, ids) pair.\n
+        <box> is interpreted as local to the coordinate system defined by self.transform.
+        <ids> is a uint16 array of shape <box>.size, indexed with [x, y, z] relative to
+        <box>.offset, whose values index into the list of blocks <palette>. The orientation of the
+        palette blocks is from the perspective of self.transform.\n
+        See .getBlocksRegionGlobal() for how the blocks are retrieved."""
+        transform = self.transform
+        globalBox = Box.between(transform * box.begin, transform * box.last)
+        palette, globalIds = self.getBlocksRegionGlobal(globalBox)
+
+        axes, flippedAxes = _transformAxes(transform)
+        ids = np.flip(np.transpose(globalIds, axes), flippedAxes) if flippedAxes else np.transpose(globalIds, axes)
+
+        invTransform = ~transform
+        return [block.transformed(invTransform.rotation, invTransform.flip) for block in palette], np.ascontiguousarray(ids)
+
+
+    def getBlocksRegionGlobal(self, box: Box) -> Tuple[List[Block], np.ndarray]:
+        """Returns the blocks in [box], ignoring self.transform, as a (palette, ids) pair.\n
+        <ids> is a uint16 array of shape <box>.size, indexed with [x, y, z] relative to
+        <box>.offset, whose values index into the list of blocks <palette>.\n
+        Blocks are taken from the cache, the buffer and the cached world slice (where it has not
+        decayed) where possible. All other blocks are retrieved with a single request, for the
+        bounding box of the positions that are still missing. If caching is enabled, the retrieved
+        blocks are added to the cache.\n
+        Invalid coordinates read as Block("minecraft:void_air")."""
+        ids   = np.zeros(tuple(box.size), dtype=np.uint16)
+        known = np.zeros(tuple(box.size), dtype=bool)
+        palette: List[Block] = []
+        paletteIndex: Dict[tuple, int] = {}
+
+        def paletteId(block: Block):
+            key = _blockKey(block)
+            i = paletteIndex.get(key)
+            if i is None:
+                i = len(palette)
+                paletteIndex[key] = i
+                palette.append(Block(block.id, dict(block.states), block.data))
+            return i
+
+        if self._worldSlice is not None:
+            sliceBox = self._worldSlice.box
+            begin = glm.max(box.begin, sliceBox.begin)
+            end   = glm.min(box.end,   sliceBox.end)
+            if glm.all(glm.lessThan(begin, end)):
+                overlap = Box(begin, end - begin)
+                sliceIds = self._worldSlice.getBlockIdsGlobal(overlap)
+                sliceToRegionId = np.zeros(len(self._worldSlice.blockPalette), dtype=np.uint16)
+                for sliceId in np.unique(sliceIds):
+                    sliceToRegionId[sliceId] = paletteId(self._worldSlice.blockPalette[sliceId])
+                regionBegin, regionEnd = begin - box.offset, end - box.offset
+                decayBegin,  decayEnd  = begin - sliceBox.offset, end - sliceBox.offset
+                region = np.s_[regionBegin.x:regionEnd.x, regionBegin.y:regionEnd.y, regionBegin.z:regionEnd.z]
+                ids[region]   = sliceToRegionId[sliceIds]
+                known[region] = ~self._worldSliceDecay[decayBegin.x:decayEnd.x, decayBegin.y:decayEnd.y, decayBegin.z:decayEnd.z]
+                # The slice palette does not contain block entity data.
+                for position in self._worldSlice.getBlockEntityPositionsGlobal(overlap):
+                    ids[tuple(position - box.offset)] = paletteId(self._worldSlice.getBlockGlobal(position))
+
+        # Cached blocks take precedence over the world slice, and blocks that are still buffered take
+        # precedence over both. Later layers overwrite earlier ones.
+        def applyOverlay(overlay):
+            if len(overlay) <= box.volume:
+                items = [(position, block) for position, block in overlay.items() if box.contains(position)]
+            else:
+                # dict.get() does not count as a lookup for the cache's eviction order.
+                items = [(position, dict.get(overlay, position)) for position in loop3D(box.begin, box.end)]
+            for position, block in items:
+                if block is not None:
+                    index = tuple(position - box.offset)
+                    ids[index]   = paletteId(block)
+                    known[index] = True
+
+        denseCache = self._cache if self.caching and isinstance(self._cache, DenseBlockCache) else None
+        if denseCache is not None:
+            # Like DenseBlockCache.get(), the region array takes precedence over the fallback dict.
+            applyOverlay(denseCache.fallback)
+            cacheIds, cacheValid = denseCache.getRegion(box)
+            if cacheValid.any():
+                cacheToRegionId = np.zeros(len(denseCache.palette), dtype=np.uint16)
+                for cacheId in np.unique(cacheIds[cacheValid]):
+                    cacheToRegionId[cacheId] = paletteId(denseCache.palette[cacheId])
+                ids[cacheValid]   = cacheToRegionId[cacheIds[cacheValid]]
+                known[cacheValid] = True
+        elif self.caching:
+            applyOverlay(self._cache)
+        if self.buffering:
+            applyOverlay(self._buffer)
+
+        unknownIndices = np.argwhere(~known)
+        if len(unknownIndices) > 0:
+            requestBox = Box.between(box.offset + ivec3(*unknownIndices.min(axis=0)), box.offset + ivec3(*unknownIndices.max(axis=0)))
+            blocks = interface.getBlocks(requestBox.offset, requestBox.size, dimension=self.dimension, includeState=True, includeData=True, compressResponses=self._compressResponses, retries=self.retries, timeout=self.timeout, host=self.host, session=self._sessionPool.session)
+            fetched = np.zeros(tuple(box.size), dtype=bool)
+            for position, block in blocks:
+                index = tuple(position - box.offset)
+                if not known[index]:
+                    ids[index]     = paletteId(block)
+                    fetched[index] = True
+                    if self.caching and denseCache is None:
+                        self._cache[position] = block.freeze()
+            if denseCache is not None:
+                denseCache.setRegion(box, palette, ids, fetched)
+
+        return palette, ids
+
+
     def getBiome(self, position: Vec3iLike):
         """Returns the biome at <position>.\n
         <position> is interpreted as local to the coordinate system defined by self.transform.\n
@@ -380,7 +871,7 @@ class Editor:
         ):
             return self._worldSlice.getBiomeGlobal(position)
 
-        return interface.getBiomes(position, dimension=self.dimension, retries=self.retries, timeout=self.timeout, host=self.host)[0][1]
+        return interface.getBiomes(position, dimension=self.dimension, compressResponses=self._compressResponses, retries=self.retries, timeout=self.timeout, host=self.host, session=self._sessionPool.session)[0][1]
 
 
     def placeBlock(
@@ -423,6 +914,273 @@ class Editor:
         return success
 
 
+    def placeBlocksArray(
+        self,
+        positions:      np.ndarray,
+        blockIds:       Optional[np.ndarray],
+        palette:        Sequence[Union[Block, Sequence[Block]]],
+        replace:        Optional[Union[str, List[str]]] = None,
+        rng:            Optional[np.random.Generator] = None
+    ):
+        """Places <palette>[<blockIds>[i]] at <positions>[i] for every i.\n
+        <positions> is an (N, 3) integer array, interpreted as local to the coordinate system
+        defined by self.transform.\n
+        See .placeBlocksArrayGlobal() for the other parameters.\n
+        All positions are transformed at once, and every palette block is transformed only once.\n
+        Returns whether the placement succeeded fully."""
+        globalPositions = self.transform.applyArray(np.asarray(positions).reshape(-1, 3))
+        globalPalette = [transformedBlockOrPalette(entry, self.transform.rotation, self.transform.flip) for entry in palette]
+        return self.placeBlocksArrayGlobal(globalPositions, blockIds, globalPalette, replace, rng)
+
+
+    def placeBlocksArrayGlobal(
+        self,
+        positions:      np.ndarray,
+        blockIds:       Optional[np.ndarray],
+        palette:        Sequence[Union[Block, Sequence[Block]]],
+        replace:        Optional[Union[str, Iterable[str]]] = None,
+        rng:            Optional[np.random.Generator] = None
+    ):
+        """Places <palette>[<blockIds>[i]] at <positions>[i] for every i, ignoring self.transform.\n
+        <positions> is an (N, 3) integer array, and <blockIds> an (N,) integer array of palette
+        indices. If <blockIds> is None, the palette entry of each position is chosen randomly.\n
+        Palette entries that are sequences of blocks are sampled randomly for every position, like
+        .placeBlock() does. Random choices are made with <rng>, a numpy Generator; pass a seeded one
+        (e.g. np.random.default_rng(seed)) for reproducible results.\n
+        Buffering is temporarily enabled. Without <replace> and .skipUnchangedBlocks, the blocks are
+        added to the buffer and the caches in bulk, instead of one by one.\n
+        Returns whether the placement succeeded fully."""
+        positions = np.asarray(positions).reshape(-1, 3)
+        if rng is None:
+            rng = np.random.default_rng()
+
+        # Flatten the palette: entry i can be any of choices[starts[i]:starts[i]+counts[i]].
+        choices: List[FrozenBlock] = []
+        starts = np.empty(len(palette), dtype=np.int64)
+        counts = np.empty(len(palette), dtype=np.int64)
+        for i, entry in enumerate(palette):
+            entryBlocks = [entry] if isinstance(entry, Block) else list(entry)
+            if not entryBlocks:
+                raise ValueError(f"Palette entry {i} is an empty sequence")
+            starts[i] = len(choices)
+            counts[i] = len(entryBlocks)
+            choices.extend(block.freeze() for block in entryBlocks)
+
+        if blockIds is None:
+            blockIds = rng.integers(len(palette), size=len(positions))
+        blockIds = np.asarray(blockIds).reshape(-1)
+        if len(blockIds) != len(positions):
+            raise ValueError(f"Got {len(positions)} positions, but {len(blockIds)} block ids")
+        choiceIds = starts[blockIds]
+        sampled = counts[blockIds] > 1
+        if sampled.any():
+            choiceIds[sampled] += rng.integers(counts[blockIds][sampled])
+
+        # Nothing-blocks are not placed.
+        placeable = np.array([bool(block.id) for block in choices], dtype=bool)
+        keep = placeable[choiceIds]
+        positions = positions[keep]
+        choiceIds = choiceIds[keep]
+
+        oldBuffering = self.buffering
+        self.buffering = True
+        try:
+            if replace is not None or self._skipUnchangedBlocks:
+                return eagerAll(
+                    self._placeSingleBlockGlobal(ivec3(*position), choices[i], replace)
+                    for position, i in zip(positions.tolist(), choiceIds.tolist())
+                )
+            self._placeBlocksArrayGlobalBuffered(positions, choiceIds, choices)
+            return True
+        finally:
+            self.buffering = oldBuffering
+
+
+    def placeVolume(
+        self,
+        offset:         Vec3iLike,
+        idArray:        np.ndarray,
+        palette:        Sequence[Union[Block, Sequence[Block]]],
+        skipId:         Optional[int] = None,
+        replace:        Optional[Union[str, List[str]]] = None,
+        rng:            Optional[np.random.Generator] = None
+    ):
+        """Places the 3D array of palette indices <idArray> at <offset>.\n
+        <idArray> is indexed with [x, y, z] relative to <offset>, which is interpreted as local to
+        the coordinate system defined by self.transform.\n
+        Instead of transforming every position, the whole array is rotated and flipped to global
+        orientation at once, and every palette block is transformed only once.\n
+        See .placeVolumeGlobal() for the other parameters.\n
+        Returns whether the placement succeeded fully."""
+        idArray = np.asarray(idArray)
+        if idArray.size == 0:
+            return True
+        transform = self.transform
+        localBox = Box(offset, idArray.shape)
+        globalBox = Box.between(transform * localBox.begin, transform * localBox.last)
+
+        # Inverse of the mapping in .getBlocksRegion().
+        axes, flippedAxes = _transformAxes(transform)
+        globalIds = np.transpose(np.flip(idArray, flippedAxes) if flippedAxes else idArray, np.argsort(axes))
+
+        globalPalette = [transformedBlockOrPalette(entry, transform.rotation, transform.flip) for entry in palette]
+        return self.placeVolumeGlobal(globalBox.offset, globalIds, globalPalette, skipId, replace, rng)
+
+
+    def placeVolumeGlobal(
+        self,
+        offset:         Vec3iLike,
+        idArray:        np.ndarray,
+        palette:        Sequence[Union[Block, Sequence[Block]]],
+        skipId:         Optional[int] = None,
+        replace:        Optional[Union[str, Iterable[str]]] = None,
+        rng:            Optional[np.random.Generator] = None
+    ):
+        """Places the 3D array of palette indices <idArray> at <offset>, ignoring self.transform.\n
+        <idArray> is indexed with [x, y, z] relative to <offset>. Positions whose index is <skipId>
+        are left untouched.\n
+        If .fillCommands is enabled, the axis-aligned boxes of identical single-block palette
+        entries are placed with `fill` commands (see .fillBoxesGlobal()). All other positions are
+        placed in bulk with .placeBlocksArrayGlobal(), which also describes <replace> and <rng>.\n
+        Buffering is temporarily enabled, so the `fill` commands and the blocks are sent together in
+        one buffer flush (or with the next flush, if buffering was already enabled).\n
+        Returns whether the placement succeeded fully."""
+        idArray = np.asarray(idArray)
+        if idArray.ndim != 3:
+            raise ValueError(f"idArray must be 3-dimensional, but has shape {idArray.shape}")
+        offset = ivec3(*offset)
+        mask = np.ones(idArray.shape, dtype=bool) if skipId is None else idArray != skipId
+
+        # The boxes of the different palette entries, as (block, boxes) pairs.
+        fills: List[Tuple[Block, List[Box]]] = []
+        fillReplace = None
+        if self.fillCommands and (replace is None or isinstance(replace, str) or len(replace) == 1):
+            fillReplace = replace if replace is None or isinstance(replace, str) else replace[0]
+            for i in np.unique(idArray[mask]).tolist():
+                entry = palette[i]
+                if not isinstance(entry, Block) or not entry.id:
+                    continue
+                entryMask = mask & (idArray == i)
+                if np.count_nonzero(entryMask) < MIN_FILL_VOLUME:
+                    continue
+                boxes, remainder = partitionMaskIntoBoxes(entryMask, MIN_FILL_VOLUME)
+                if boxes:
+                    fills.append((entry, [Box(offset + box.offset, box.size) for box in boxes]))
+                    mask &= ~entryMask | remainder
+
+        oldBuffering = self.buffering
+        self.buffering = True
+        try:
+            for block, boxes in fills:
+                self.fillBoxesGlobal(boxes, block, fillReplace)
+            positions = np.argwhere(mask) + np.array(offset)
+            return self.placeBlocksArrayGlobal(positions, idArray[mask], palette, replace, rng)
+        finally:
+            self.buffering = oldBuffering
+
+
+    def _placeBlocksArrayGlobalBuffered(self, positions: np.ndarray, choiceIds: np.ndarray, choices: List[FrozenBlock]):
+        """Adds <choices>[<choiceIds>[i]] at <positions>[i] to the buffer in bulk, and updates the
+        caches like ._placeSingleBlockGlobal() does."""
+        keys   = [ivec3(x, y, z) for x, y, z in positions.tolist()]
+        blocks = [choices[i] for i in choiceIds.tolist()]
+        begin = 0
+        while begin < len(keys):
+            if len(self._buffer) >= self.bufferLimit:
+                self.flushBuffer()
+            end = min(len(keys), begin + self.bufferLimit - len(self._buffer))
+            self._buffer.update(zip(keys[begin:end], blocks[begin:end]))
+            begin = end
+
+        if self.caching:
+            stateIds = [block_registry.stateId(block) for block in choices] if isinstance(self._cache, DenseBlockCache) else None
+            if stateIds is not None and None not in stateIds:
+                self._cache.setStateIdsAt(positions, np.array(stateIds, dtype=block_registry.STATE_ID_DTYPE)[choiceIds])
+            else:
+                for key, block in zip(keys, blocks):
+                    self._cache[key] = block
+
+        if self._worldSlice is not None:
+            sliceBox = self._worldSlice.box
+            local  = positions - np.array(sliceBox.offset)
+            inside = np.all((local >= 0) & (local < np.array(sliceBox.size)), axis=1)
+            self._worldSliceDecay[tuple(local[inside].T)] = True
+
+        if self._chunkCache is not None:
+            for chunkX, chunkZ in np.unique(positions[:, [0, 2]] >> 4, axis=0).tolist():
+                self._chunkCache.invalidate(self.getMinecraftVersion(), self.dimension, glm.ivec2(chunkX, chunkZ))
+
+
+    def fillBoxesGlobal(self, boxes: Iterable[Box], block: Block, replace: Optional[str] = None):
+        """Fills <boxes> with <block> using `fill` commands, ignoring self.transform.\n
+        Boxes with a volume larger than MAX_FILL_VOLUME are split up. If <replace> is given, only
+        blocks with that id are replaced.\n
+        If buffering is enabled, the commands are sent at the start of the next buffer flush, before
+        the buffered blocks. Buffered blocks inside the boxes are dropped, since the fill overwrites
+        them anyway. (If <replace> is given, the buffer is flushed first instead, so that the fill
+        sees them.)\n
+        Unlike blocks placed with .placeBlock(), filled blocks are not affected by .doBlockUpdates.
+        If .spawnDrops is enabled and <replace> is not given, the replaced blocks drop items as if
+        they were mined."""
+        if not block.id:
+            return
+        block = block.freeze()
+        boxes = [part for box in boxes if box.volume > 0 for part in splitBox(box, MAX_FILL_VOLUME)]
+        if not boxes:
+            return
+
+        if replace is not None:
+            mode = f" replace {replace}"
+        elif self.spawnDrops:
+            mode = " destroy"
+        else:
+            mode = ""
+        commands = [_fillCommand(box, block, mode) for box in boxes]
+
+        if self.buffering:
+            # Deferred commands that were buffered before the fill must still run before it.
+            if self._commandBuffer:
+                self.flushBuffer()
+            overwritten = _keysInBoxes(self._buffer, boxes)
+            if overwritten and replace is not None:
+                self.flushBuffer()
+            else:
+                for position in overwritten:
+                    del self._buffer[position]
+            self._fillCommandBuffer.extend(commands)
+        else:
+            response = interface.runCommand("\n".join(commands), dimension=self.dimension, retries=self.retries, timeout=self.timeout, host=self.host, session=self._sessionPool.session)
+            _logCommandErrors(response, "fill command")
+
+        # Update the caches like _placeSingleBlockGlobal() does. With <replace>, it is not known
+        # which of the cached blocks were changed, so they are dropped instead.
+        if isinstance(self._cache, DenseBlockCache):
+            for box in boxes:
+                if replace is None and self.caching:
+                    self._cache.fillBox(box, block)
+                else:
+                    self._cache.deleteBox(box)
+        elif self._cache:
+            for position in _keysInBoxes(self._cache, boxes):
+                if replace is None:
+                    self._cache[position] = block
+                else:
+                    del self._cache[position]
+
+        if self._worldSlice is not None:
+            sliceBox = self._worldSlice.box
+            for box in boxes:
+                begin = glm.max(box.begin, sliceBox.begin) - sliceBox.offset
+                end   = glm.min(box.end,   sliceBox.end)   - sliceBox.offset
+                if glm.all(glm.lessThan(begin, end)):
+                    self._worldSliceDecay[begin.x:end.x, begin.y:end.y, begin.z:end.z] = True
+
+        if self._chunkCache is not None:
+            for box in boxes:
+                for chunkPosition in loop2D(dropY(box.begin) >> 4, (dropY(box.last) >> 4) + 1):
+                    self._chunkCache.invalidate(self.getMinecraftVersion(), self.dimension, chunkPosition)
+
+
     def _placeSingleBlockGlobal(
         self,
         position:       ivec3,
@@ -437,7 +1195,7 @@ class Editor:
         if replace is not None:
             if isinstance(replace, str):
                 replace = [replace]
-            if self.getBlockGlobal(position).id not in replace:
+            if self._getFrozenBlockGlobal(position).id not in replace:
                 return True
 
         # Select block from palette
@@ -445,6 +1203,12 @@ class Editor:
             block = random.choice(block)
         if not block.id:
             return True
+        # The buffer and the cache only hold FrozenBlocks, so they never share state with the caller.
+        block = block.freeze()
+
+        if self._skipUnchangedBlocks and self._isUnchangedGlobal(position, block):
+            self._skippedBlocks += 1
+            return True
 
         if self._buffering:
             success = self._placeSingleBlockGlobalBuffered(position, block)
@@ -457,16 +1221,33 @@ class Editor:
         if self.caching:
             self._cache[position] = block
 
-        if self._worldSlice is not None and self._worldSlice.rect.contains(dropY(position)):
+        if self._worldSlice is not None and self._worldSlice.box.contains(position):
             self._worldSliceDecay[tuple(position - self._worldSlice.box.offset)] = True
 
+        if self._chunkCache is not None:
+            self._chunkCache.invalidate(self.getMinecraftVersion(), self.dimension, dropY(position) >> 4)
+
         return True
 
 
+    def _isUnchangedGlobal(self, position: ivec3, block: Block):
+        """Returns whether the cached world slice shows that placing <block> at <position> would not
+        change the world (see .skipUnchangedBlocks)."""
+        if block.data or self._worldSlice is None or not self._worldSlice.box.contains(position):
+            return False
+        if self._worldSliceDecay[tuple(position - self._worldSlice.box.offset)]:
+            return False
+        existingBlock = self._worldSlice.getBlockGlobal(position)
+        # <block> is frozen, so its id is namespaced and its states are split off.
+        return existingBlock.id == block.id and existingBlock.states == {
+            key: str(value) for key, value in block.states.items()
+        }
+
+
     def _placeSingleBlockGlobalDirect(self, position: ivec3, block: Block):
         """Place a single block in the world directly.\n
         Returns whether the placement succeeded."""
-        result = interface.placeBlocks([(position, block)], dimension=self.dimension, doBlockUpdates=self.doBlockUpdates, spawnDrops=self.spawnDrops, retries=self.retries, timeout=self.timeout, host=self.host)
+        result = interface.placeBlocks([(position, block)], dimension=self.dimension, doBlockUpdates=self.doBlockUpdates, spawnDrops=self.spawnDrops, compression=self._compression, compressionThreshold=self._compressionThreshold, retries=self.retries, timeout=self.timeout, host=self.host, session=self._sessionPool.session)
         if not result[0][0]:
             logger.error("Server returned error upon placing block:\n  %s", result[0][1])
             return False
@@ -482,15 +1263,52 @@ class Editor:
         return True
 
 
+    def _extractFillCommands(self, blockBuffer: Dict[ivec3, Block]):
+        """Finds boxes of identical blocks in <blockBuffer>, removes them from it and returns the
+        `fill` commands that place them."""
+        positionsByBlock: Dict[str, List[ivec3]] = {}
+        for position, block in blockBuffer.items():
+            positionsByBlock.setdefault(str(block), []).append(position)
+
+        mode = " destroy" if self.spawnDrops else ""
+        commands: List[str] = []
+        for blockString, positions in positionsByBlock.items():
+            if len(positions) < MIN_FILL_VOLUME:
+                continue
+            boxes, _ = partitionIntoBoxes(positions, MIN_FILL_VOLUME)
+            for box in boxes:
+                commands.extend(_fillCommand(part, blockString, mode) for part in splitBox(box, MAX_FILL_VOLUME))
+                for position in box.inner:
+                    del blockBuffer[position]
+        return commands
+
+
     def flushBuffer(self):
         """Flushes the block placement buffer.\n
         If multithreaded buffer flushing is enabled, the worker threads can be awaited with
         awaitBufferFlushes()."""
 
-        def flush(blockBuffer: Dict[ivec3, Block], commandBuffer: List[str]):
+        if self._buffer or self._commandBuffer or self._fillCommandBuffer:
+            self._flushedBlocks += len(self._buffer)
+            self._bufferFlushes += 1
+
+        combine = self._bufferFillCommands and self._bufferDoBlockUpdates
+
+        def flush(fillCommandBuffer: List[str], blockBuffer: Dict[ivec3, Block], commandBuffer: List[str]):
+            # Fill commands are sent before the blocks, which may be attached to the filled blocks
+            # (e.g. torches or doors on walls). Boxes of identical buffered blocks are combined into
+            # more fill commands.
+            fillCommands = list(fillCommandBuffer)
+            fillCommandBuffer.clear()
+            if combine and blockBuffer:
+                fillCommands += self._extractFillCommands(blockBuffer)
+            if fillCommands:
+                response = interface.runCommand("\n".join(fillCommands), dimension=self.dimension, retries=self.retries, timeout=self.timeout, host=self.host, session=self._sessionPool.session)
+                _logCommandErrors(response, "fill command")
+
             # Flush block buffer
             if blockBuffer:
-                response = interface.placeBlocks(blockBuffer.items(), dimension=self.dimension, doBlockUpdates=self._bufferDoBlockUpdates, spawnDrops=self.spawnDrops, retries=self.retries, timeout=self.timeout, host=self.host)
+                response = interface.placeBlocks(blockBuffer.items(), dimension=self.dimension, doBlockUpdates=self._bufferDoBlockUpdates, spawnDrops=self.spawnDrops, compression=self._compression, compressionThreshold=self._compressionThreshold, retries=self.retries, timeout=self.timeout, host=self.host, session=self._sessionPool.session)
                 blockBuffer.clear()
 
                 for entry in response:
@@ -499,35 +1317,50 @@ class Editor:
 
             # Flush command buffer
             if commandBuffer:
-                response = interface.runCommand("\n".join(commandBuffer), dimension=self.dimension, retries=self.retries, timeout=self.timeout, host=self.host)
+                response = interface.runCommand("\n".join(commandBuffer), dimension=self.dimension, retries=self.retries, timeout=self.timeout, host=self.host, session=self._sessionPool.session)
                 commandBuffer.clear()
+                _logCommandErrors(response, "buffered command")
 
-                for entry in response:
-                    if not entry[0]:
-                        logger.error("Server returned error upon running buffered command:\n  %s", entry[1])
-
-        if self._multithreading:
-            # Clean up finished buffer flush futures
-            self._bufferFlushFutures = [
-                future for future in self._bufferFlushFutures if not future.done()
-            ]
-
-            # Shallow copies are good enough here
-            blockBufferCopy   = self._buffer
-            commandBufferCopy = self._commandBuffer
-            def task():
-                flush(blockBufferCopy, commandBufferCopy)
-
-            # Submit the task
-            future = self._bufferFlushExecutor.submit(task)
-            self._bufferFlushFutures.append(future)
-
-            # Empty the buffers (the thread has copies of the references)
-            self._buffer = {}
-            self._commandBuffer = []
+        if not self._multithreading:
+            flush(self._fillCommandBuffer, self._buffer, self._commandBuffer)
+            return
 
-        else: # No multithreading
-            flush(self._buffer, self._commandBuffer)
+        fillCommandBuffer = self._fillCommandBuffer
+        blockBuffer       = self._buffer
+        commandBuffer     = self._commandBuffer
+        self._fillCommandBuffer = []
+        self._buffer            = {}
+        self._commandBuffer     = []
+
+        def submit(executor: futures.ThreadPoolExecutor, blockBuffer: Dict[ivec3, Block]):
+            # Apply backpressure: wait until there is room in the queue.
+            self._bufferFlushFutures = [future for future in self._bufferFlushFutures if not future.done()]
+            while len(self._bufferFlushFutures) >= self._multithreadingQueueLimit * len(self._bufferFlushExecutors):
+                self._bufferFlushFutures = list(futures.wait(self._bufferFlushFutures, return_when=futures.FIRST_COMPLETED).not_done)
+            self._bufferFlushFutures.append(executor.submit(flush, [], blockBuffer, []))
+
+        # Fill commands can affect any chunk, so they wait for all pending blocks. The blocks of this
+        # flush are only submitted after they have run.
+        if fillCommandBuffer:
+            self.awaitBufferFlushes()
+            flush(fillCommandBuffer, {}, [])
+
+        # Partition the blocks by chunk. A chunk is always sent by the same worker, so placements in
+        # the same chunk keep their order across flushes.
+        partitions: List[Dict[ivec3, Block]] = [{} for _ in self._bufferFlushExecutors]
+        for position, block in blockBuffer.items():
+            partitions[_chunkHash(position.x >> 4, position.z >> 4) % len(partitions)][position] = block
+
+        for executor, partition in zip(self._bufferFlushExecutors, partitions):
+            if partition:
+                submit(executor, partition)
+
+        # Commands can affect any chunk, so they wait for all pending blocks, including those of
+        # earlier flushes that are still queued on other workers. They are run on this thread, so
+        # no worker is kept waiting and later flushes are only submitted after they have run.
+        if commandBuffer:
+            self.awaitBufferFlushes()
+            flush([], {}, commandBuffer)
 
 
     def awaitBufferFlushes(self, timeout: Optional[float] = None):
@@ -538,7 +1371,7 @@ class Editor:
         self._bufferFlushFutures = futures.wait(self._bufferFlushFutures, timeout).not_done
 
 
-    def loadWorldSlice(self, rect: Optional[Rect]=None, heightmapTypes: Optional[Iterable[str]] = None, cache=False):
+    def loadWorldSlice(self, rect: Optional[Rect]=None, heightmapTypes: Optional[Iterable[str]] = None, cache=False, lazy=False, yRange: Optional[Tuple[int, int]] = None, surfaceBand: Optional[Tuple[int, int]] = None):
         """Loads the world slice for the given XZ-rectangle.\n
         The rectangle must be given in **global coordinates**; self.transform is ignored.\n
         If <rect> is None, the world slice of the current build area is loaded.\n
@@ -548,10 +1381,20 @@ class Editor:
         The cached world slice is used for faster block and biome retrieval. Note that the editor
         assumes that nothing besides itself changes the given area of the world. If the given world
         area is changed other than through this editor, call .updateWorldSlice() to update the
-        cached world slice."""
+        cached world slice.\n
+        If <lazy>=True, the world slice decodes its chunk sections on first access instead of all at
+        once (see WorldSlice).\n
+        <yRange> or <surfaceBand> restrict the world slice to a vertical band (see WorldSlice). The
+        cached world slice (and its decay array) then only covers that band; blocks outside of it are
+        retrieved from the GDMC HTTP interface as usual.\n
+        If .chunkCache is set, the chunks are loaded from it when possible."""
         if rect is None:
             rect = self.getBuildArea().toRect()
-        worldSlice = WorldSlice(rect, dimension=self.dimension, heightmapTypes=heightmapTypes, retries=self.retries, timeout=self.timeout, host=self.host)
+        if self._chunkCache is not None:
+            # Chunks with pending block placements must not end up in the on-disk cache.
+            self.flushBuffer()
+            self.awaitBufferFlushes()
+        worldSlice = WorldSlice(rect, dimension=self.dimension, heightmapTypes=heightmapTypes, retries=self.retries, timeout=self.timeout, host=self.host, session=self._sessionPool.session, lazy=lazy, yRange=yRange, surfaceBand=surfaceBand, chunkCache=self._chunkCache, minecraftVersion=None if self._chunkCache is None else self.getMinecraftVersion(), sessionPool=self._sessionPool, compressResponses=self._compressResponses)
         if cache:
             self._worldSlice      = worldSlice
             self._worldSliceDecay = np.zeros(self._worldSlice.box.size, dtype=bool)
@@ -562,18 +1405,28 @@ class Editor:
         """Updates the cached world slice."""
         if self._worldSlice is None:
             raise RuntimeError("No world slice is cached. Call .loadWorldSlice() with cache=True first.")
-        return self.loadWorldSlice(self._worldSlice.rect, self._worldSlice.heightmaps.keys(), cache=True)
+        return self.loadWorldSlice(self._worldSlice.rect, self._worldSlice.heightmaps.keys(), cache=True, yRange=(self._worldSlice.yBegin, self._worldSlice.yEnd))
 
 
     def getMinecraftVersion(self):
-        """Returns the Minecraft version as a string."""
-        return interface.getVersion(retries=self.retries, timeout=self.timeout, host=self.host)
+        """Returns the Minecraft version as a string.\n
+        The version is only retrieved once per host."""
+        if self._minecraftVersion is None:
+            self._minecraftVersion = interface.getVersion(retries=self.retries, timeout=self.timeout, host=self.host, session=self._sessionPool.session)
+        return self._minecraftVersion
+
+
+    def closeConnections(self):
+        """Closes all kept-alive HTTP connections of this editor and its buffer flush threads.\n
+        New connections are opened on the next request. This is done automatically when .host is
+        changed."""
+        self._sessionPool.close()
 
 
     def checkConnection(self):
         """Raises an InterfaceConnectionError if the GDMC HTTP interface cannot be reached.\n
         Does not perform any retries."""
-        interface.getVersion(retries=0, timeout=self.timeout, host=self.host)
+        interface.getVersion(retries=0, timeout=self.timeout, host=self.host, session=self._sessionPool.session)
 
 
     @contextmanager
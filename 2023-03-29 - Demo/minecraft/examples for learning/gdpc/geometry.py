@@ -3,9 +3,44 @@
 
 from typing import Optional, Sequence, Union, List, Iterable
 
-from .vector_tools import Vec2iLike, Vec3iLike, Rect, Box, cylinder, fittingCylinder, line3D, lineSequence3D
+from .vector_tools import Vec2iLike, Vec3iLike, Rect, Box, cylinder, fittingCylinder, line3D, lineSequence3D, partitionIntoBoxes
 from .block import Block, transformedBlockOrPalette
-from .editor import Editor
+from .editor import Editor, MIN_FILL_VOLUME
+
+
+def _fillableReplace(editor: Editor, block: Union[Block, Sequence[Block]], replace: Optional[Union[str, List[str]]]):
+    """Returns whether [block] can be placed with `fill` commands, and the [replace] filter to use
+    for them."""
+    if not editor.fillCommands or not isinstance(block, Block) or not block.id:
+        return False, None
+    if replace is None or isinstance(replace, str):
+        return True, replace
+    if len(replace) == 1:
+        return True, replace[0]
+    return False, None
+
+
+def _placeBlockGlobal(editor: Editor, points: Iterable[Vec3iLike], block: Union[Block, Sequence[Block]], replace: Optional[Union[str, List[str]]] = None):
+    """Places [block] at the global [points].\n
+    If editor.fillCommands is enabled, the axis-aligned boxes within [points] are placed with `fill`
+    commands, and only the remaining points are placed block by block."""
+    fillable, fillReplace = _fillableReplace(editor, block, replace)
+    if not fillable:
+        editor.placeBlockGlobal(points, block, replace)
+        return
+    boxes, remainder = partitionIntoBoxes(points, minVolume=MIN_FILL_VOLUME)
+    editor.fillBoxesGlobal(boxes, block, fillReplace)
+    editor.placeBlockGlobal(remainder, block, replace)
+
+
+def _placeBlock(editor: Editor, points: Iterable[Vec3iLike], block: Union[Block, Sequence[Block]], replace: Optional[Union[str, List[str]]] = None):
+    """Like _placeBlockGlobal(), but for [points] and [block] in editor.transform."""
+    if not _fillableReplace(editor, block, replace)[0]:
+        editor.placeBlock(points, block, replace)
+        return
+    globalPoints = (editor.transform * point for point in points)
+    globalBlock  = transformedBlockOrPalette(block, editor.transform.rotation, editor.transform.flip)
+    _placeBlockGlobal(editor, globalPoints, globalBlock, replace)
 
 
 def placeCuboid(editor: Editor, first: Vec3iLike, last: Vec3iLike, block: Union[Block, Sequence[Block]], replace: Optional[Union[str, List[str]]] = None):
@@ -14,6 +49,10 @@ def placeCuboid(editor: Editor, first: Vec3iLike, last: Vec3iLike, block: Union[
     first = editor.transform * first
     last = editor.transform * last
     block = transformedBlockOrPalette(block, editor.transform.rotation, editor.transform.flip)
+    fillable, fillReplace = _fillableReplace(editor, block, replace)
+    if fillable:
+        editor.fillBoxesGlobal([Box.between(first, last)], block, fillReplace)
+        return
     editor.placeBlockGlobal(Box.between(first, last).inner, block, replace)
 
 
@@ -23,7 +62,7 @@ def placeCuboidHollow(editor: Editor, first: Vec3iLike, last: Vec3iLike, block:
     first = editor.transform * first
     last = editor.transform * last
     block = transformedBlockOrPalette(block, editor.transform.rotation, editor.transform.flip)
-    editor.placeBlockGlobal(Box.between(first, last).shell, block, replace)
+    _placeBlockGlobal(editor, Box.between(first, last).shell, block, replace)
 
 
 def placeCuboidWireframe(editor: Editor, first: Vec3iLike, last: Vec3iLike, block: Union[Block, Sequence[Block]], replace: Optional[Union[str, List[str]]] = None):
@@ -32,7 +71,7 @@ def placeCuboidWireframe(editor: Editor, first: Vec3iLike, last: Vec3iLike, bloc
     first = editor.transform * first
     last = editor.transform * last
     block = transformedBlockOrPalette(block, editor.transform.rotation, editor.transform.flip)
-    editor.placeBlockGlobal(Box.between(first, last).wireframe, block, replace)
+    _placeBlockGlobal(editor, Box.between(first, last).wireframe, block, replace)
 
 
 def placeBox(editor: Editor, box: Box, block: Union[Block, Sequence[Block]], replace: Optional[Union[str, List[str]]] = None):
@@ -95,12 +134,12 @@ def placeLine(editor: Editor, first: Vec3iLike, last: Vec3iLike, block: Union[Bl
     first = editor.transform * first
     last = editor.transform * last
     block = transformedBlockOrPalette(block, editor.transform.rotation, editor.transform.flip)
-    editor.placeBlockGlobal(line3D(first, last, width), block, replace)
+    _placeBlockGlobal(editor, line3D(first, last, width), block, replace)
 
 
 def placeLineSequence(editor: Editor, points: Iterable[Vec3iLike], block: Union[Block, Sequence[Block]], closed=False, replace: Optional[Union[str, List[str]]] = None):
     """Place lines that run from point to point."""
-    editor.placeBlock(lineSequence3D(points, closed=closed), block, replace)
+    _placeBlock(editor, lineSequence3D(points, closed=closed), block, replace)
 
 
 def placeCylinder(
@@ -111,7 +150,7 @@ def placeCylinder(
     replace: Optional[Union[str, List[str]]] = None
 ):
     """Place a cylindric shape centered on xyz with height and radius."""
-    editor.placeBlock(cylinder(baseCenter, diameters, length, axis, tube, hollow), block, replace)
+    _placeBlock(editor, cylinder(baseCenter, diameters, length, axis, tube, hollow), block, replace)
 
 
 def placeFittingCylinder(
@@ -126,4 +165,4 @@ def placeFittingCylinder(
     corner1 = editor.transform * corner1
     corner2 = editor.transform * corner2
     block = transformedBlockOrPalette(block, editor.transform.rotation, editor.transform.flip)
-    editor.placeBlockGlobal(fittingCylinder(corner1, corner2, axis, tube, hollow), block, replace)
+    _placeBlockGlobal(editor, fittingCylinder(corner1, corner2, axis, tube, hollow), block, replace)
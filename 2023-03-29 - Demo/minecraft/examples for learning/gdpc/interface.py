@@ -1,18 +1,27 @@
 """Provides wrappers for the endpoints of the GDMC HTTP interface.
 
 It is recommended to use the higher-level `editor.Editor` class instead.
+
+Every endpoint wrapper accepts an optional <session>. If given, the request is sent through that
+`requests.Session` (see `SessionPool`), reusing its kept-alive connections.
+
+The block and chunk read endpoints accept compressed ("gzip"/"deflate") responses by default, and
+placeBlocks() can compress its request body. See the <compressResponses> and <compression>
+parameters.
 """
 
 
-from typing import Sequence, Tuple, Optional, List, Dict, Any, Union
+from typing import Sequence, Tuple, Optional, List, Dict, Any, Union, Set
 from functools import partial
 import time
+import zlib
 from urllib.parse import urlparse
 import logging
-import json
+import threading
 
 from glm import ivec3
 import requests
+from requests.adapters import HTTPAdapter
 from requests.exceptions import ConnectionError as RequestConnectionError
 
 from . import __url__
@@ -23,6 +32,10 @@ from . import exceptions
 
 
 DEFAULT_HOST = "http://localhost:9000"
+DEFAULT_POOL_SIZE = 8
+PLACE_BLOCKS_BODY_PIECE_SIZE = 65536
+COMPRESSION_METHODS = ("gzip", "deflate")
+DEFAULT_COMPRESSION_THRESHOLD = 16384
 
 
 logger = logging.getLogger(__name__)
@@ -39,9 +52,98 @@ def _onRequestRetry(e: Exception, retriesLeft: int):
     time.sleep(3)
 
 
-def _request(method: str, url: str, *args, retries: int, **kwargs):
+class SessionPool:
+    """Hands out pooled, keep-alive `requests.Session` objects, one per thread.\n
+    Without a session, every request opens (and closes) its own TCP connection. A session keeps
+    up to <poolSize> connections per host alive and reuses them for later requests.\n
+    `requests.Session` is not guaranteed to be thread-safe, so each thread that uses the pool gets
+    its own session. close() closes all of them; new sessions are created on next use."""
+
+    def __init__(self, poolSize: int = DEFAULT_POOL_SIZE):
+        self._poolSize = poolSize
+        self._local    = threading.local()
+        self._sessions: List[requests.Session] = []
+        self._lock     = threading.Lock()
+
+    @property
+    def poolSize(self):
+        """The maximum amount of kept-alive connections per host, per thread\n
+        Changing the pool size closes all current sessions."""
+        return self._poolSize
+
+    @poolSize.setter
+    def poolSize(self, value: int):
+        if value != self._poolSize:
+            self.close()
+        self._poolSize = value
+
+    @property
+    def session(self) -> requests.Session:
+        """The session of the calling thread (created on first use)"""
+        session: Optional[requests.Session] = getattr(self._local, "session", None)
+        if session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self._poolSize)
+            session.mount("http://",  adapter)
+            session.mount("https://", adapter)
+            self._local.session = session
+            with self._lock:
+                self._sessions.append(session)
+        return session
+
+    def close(self):
+        """Closes all sessions of this pool, dropping their connections."""
+        with self._lock:
+            sessions = self._sessions
+            self._sessions = []
+            self._local = threading.local()
+        for session in sessions:
+            session.close()
+
+
+def _acceptEncodingHeaders(compressResponses: bool):
+    return {"Accept-Encoding": ", ".join(COMPRESSION_METHODS) if compressResponses else "identity"}
+
+
+# (host, compression method) pairs for which a compressed request body was rejected.
+_unsupportedCompressions: Set[Tuple[str, str]] = set()
+# The time at which a compression fallback was last logged, per (host, compression method) pair.
+_compressionWarningTimes: Dict[Tuple[str, str], float] = {}
+_unsupportedCompressionsLock = threading.Lock()
+
+# The minimum amount of seconds between two logged compression fallbacks for the same host and
+# compression method.
+COMPRESSION_WARNING_INTERVAL = 60.0
+
+
+def _markCompressionUnsupported(host: str, compression: str):
+    with _unsupportedCompressionsLock:
+        _unsupportedCompressions.add((host, compression))
+
+
+def _warnCompressionFallback(host: str, compression: str):
+    """Logs that a "<compression>"-compressed request body to <host> was retried without
+    compression, at most once per COMPRESSION_WARNING_INTERVAL seconds."""
+    now = time.monotonic()
+    with _unsupportedCompressionsLock:
+        lastTime = _compressionWarningTimes.get((host, compression))
+        if lastTime is not None and now - lastTime < COMPRESSION_WARNING_INTERVAL:
+            return
+        _compressionWarningTimes[(host, compression)] = now
+    logger.warning('The GDMC HTTP interface at %s did not accept a "%s"-compressed request body. Retrying without compression.', host, compression)
+
+
+def compressionSupported(host: str, compression: str):
+    """Returns whether compressed request bodies may be sent to <host> with method <compression>.\n
+    This is True unless the host has rejected such a body before (see placeBlocks())."""
+    with _unsupportedCompressionsLock:
+        return (host, compression) not in _unsupportedCompressions
+
+
+def _request(method: str, url: str, *args, retries: int, session: Optional[requests.Session] = None, **kwargs):
+    requestFunction = requests.request if session is None else session.request
     try:
-        response = withRetries(partial(requests.request, method, url, *args, **kwargs), RequestConnectionError, retries=retries, onRetry=_onRequestRetry)
+        response = withRetries(partial(requestFunction, method, url, *args, **kwargs), RequestConnectionError, retries=retries, onRetry=_onRequestRetry)
     except RequestConnectionError as e:
         u = urlparse(url)
         raise exceptions.InterfaceConnectionError(
@@ -57,11 +159,14 @@ def _request(method: str, url: str, *args, retries: int, **kwargs):
     return response
 
 
-def getBlocks(position: Vec3iLike, size: Optional[Vec3iLike] = None, dimension: Optional[str] = None, includeState=True, includeData=True, retries=0, timeout=None, host=DEFAULT_HOST):
+def getBlocks(position: Vec3iLike, size: Optional[Vec3iLike] = None, dimension: Optional[str] = None, includeState=True, includeData=True, compressResponses=True, retries=0, timeout=None, host=DEFAULT_HOST, session: Optional[requests.Session] = None):
     """Returns the blocks in the specified region.
 
     <dimension> can be one of {"overworld", "the_nether", "the_end"} (default "overworld").
 
+    If <compressResponses> is True, the server may send a compressed response (if it supports
+    that). Otherwise, it is asked to send an uncompressed one.
+
     Returns a list of (position, block)-tuples.
 
     If a set of coordinates is invalid, the returned block ID will be "minecraft:void_air".
@@ -80,16 +185,19 @@ def getBlocks(position: Vec3iLike, size: Optional[Vec3iLike] = None, dimension:
         'includeData':  True if includeData  else None,
         'dimension': dimension
     }
-    response = _request("GET", url, params=parameters, retries=retries, timeout=timeout)
+    response = _request("GET", url, params=parameters, headers=_acceptEncodingHeaders(compressResponses), retries=retries, timeout=timeout, session=session)
     blockDicts: List[Dict[str, Any]] = response.json()
     return [(ivec3(b["x"], b["y"], b["z"]), Block(b["id"], b.get("state", {}), b.get("data") if b.get("data") != "{}" else None)) for b in blockDicts]
 
 
-def getBiomes(position: Vec3iLike, size: Optional[Vec3iLike] = None, dimension: Optional[str] = None, retries=0, timeout=None, host=DEFAULT_HOST):
+def getBiomes(position: Vec3iLike, size: Optional[Vec3iLike] = None, dimension: Optional[str] = None, compressResponses=True, retries=0, timeout=None, host=DEFAULT_HOST, session: Optional[requests.Session] = None):
     """Returns the biomes in the specified region.
 
     <dimension> can be one of {"overworld", "the_nether", "the_end"} (default "overworld").
 
+    If <compressResponses> is True, the server may send a compressed response (if it supports
+    that). Otherwise, it is asked to send an uncompressed one.
+
     Returns a list of (position, biome id)-tuples.
 
     If a set of coordinates is invalid, the returned biome ID will be an empty string.
@@ -106,12 +214,72 @@ def getBiomes(position: Vec3iLike, size: Optional[Vec3iLike] = None, dimension:
         'dz': dz,
         'dimension': dimension
     }
-    response = _request("GET", url, params=parameters, retries=retries, timeout=timeout)
+    response = _request("GET", url, params=parameters, headers=_acceptEncodingHeaders(compressResponses), retries=retries, timeout=timeout, session=session)
     biomeDicts: List[Dict[str, Any]] = response.json()
     return [(ivec3(b["x"], b["y"], b["z"]), str(b["id"])) for b in biomeDicts]
 
 
-def placeBlocks(blocks: Sequence[Tuple[Vec3iLike, Block]], dimension: Optional[str] = None, doBlockUpdates=True, spawnDrops=False, customFlags: str = "", retries=0, timeout=None, host=DEFAULT_HOST):
+class _PlaceBlocksBody:
+    """Iterable request body for placeBlocks().\n
+    The body is generated in pieces of about PLACE_BLOCKS_BODY_PIECE_SIZE bytes while it is being
+    sent (using chunked transfer encoding), so it is never fully materialized in memory. Every
+    iteration generates the body anew, so the request can be retried."""
+
+    def __init__(self, blocks: Sequence[Tuple[Vec3iLike, Block]]):
+        self._blocks = blocks
+
+    def smallBody(self, sizeLimit: int) -> Optional[bytes]:
+        """Returns the complete body if it is smaller than <sizeLimit> bytes, or None otherwise."""
+        pieces: List[str] = []
+        pieceSize = 0
+        separator = ""
+        for pos, block in self._blocks:
+            entry = f'{separator}{{"x":{pos[0]},"y":{pos[1]},"z":{pos[2]},{block.jsonFragment()}}}'
+            separator = ","
+            pieces.append(entry)
+            pieceSize += len(entry)
+            if pieceSize + 2 >= sizeLimit:
+                return None
+        return ("[" + "".join(pieces) + "]").encode("utf-8")
+
+    def __iter__(self):
+        pieces = ["["]
+        pieceSize = 1
+        separator = ""
+        for pos, block in self._blocks:
+            entry = f'{separator}{{"x":{pos[0]},"y":{pos[1]},"z":{pos[2]},{block.jsonFragment()}}}'
+            separator = ","
+            pieces.append(entry)
+            pieceSize += len(entry)
+            if pieceSize >= PLACE_BLOCKS_BODY_PIECE_SIZE:
+                yield "".join(pieces).encode("utf-8")
+                pieces.clear()
+                pieceSize = 0
+        pieces.append("]")
+        yield "".join(pieces).encode("utf-8")
+
+
+class _CompressedBody:
+    """Iterable request body that compresses the pieces of another iterable body with method
+    <compression> (one of COMPRESSION_METHODS). Like the wrapped body, it can be iterated multiple
+    times."""
+
+    def __init__(self, body, compression: str):
+        self._body        = body
+        self._compression = compression
+
+    def __iter__(self):
+        # wbits=31 produces the gzip format; wbits=15 produces the zlib format, which is what HTTP
+        # calls "deflate".
+        compressor = zlib.compressobj(6, zlib.DEFLATED, 31 if self._compression == "gzip" else 15)
+        for piece in self._body:
+            compressedPiece = compressor.compress(piece)
+            if compressedPiece:
+                yield compressedPiece
+        yield compressor.flush()
+
+
+def placeBlocks(blocks: Sequence[Tuple[Vec3iLike, Block]], dimension: Optional[str] = None, doBlockUpdates=True, spawnDrops=False, customFlags: str = "", compression: Optional[str] = None, compressionThreshold=DEFAULT_COMPRESSION_THRESHOLD, retries=0, timeout=None, host=DEFAULT_HOST, session: Optional[requests.Session] = None):
     """Places blocks in the world.
 
     Each element of <blocks> should be a tuple (position, block). Empty blocks (blocks without an
@@ -122,6 +290,13 @@ def placeBlocks(blocks: Sequence[Tuple[Vec3iLike, Block]], dimension: Optional[s
     The <doBlockUpdates>, <spawnDrops> and <customFlags> parameters control block update
     behavior. See the GDMC HTTP API documentation for more info.
 
+    If <compression> is one of COMPRESSION_METHODS, request bodies of at least
+    <compressionThreshold> bytes are compressed with that method. If the server rejects a compressed
+    body, the request is repeated uncompressed. If the rejection was a 415 response, or a 400
+    response after which the uncompressed request succeeded, further bodies for <host> are no longer
+    compressed with that method. Other failures (e.g. a 500 response) only cause the one request to
+    be repeated.
+
     Returns a list of (success, result)-tuples, one for each block. If a block placement was
     successful, result will be 1 if the block changed, or 0 otherwise. If a block placement failed,
     result will be the error message.
@@ -136,26 +311,47 @@ def placeBlocks(blocks: Sequence[Tuple[Vec3iLike, Block]], dimension: Optional[s
     parameters = {"dimension": dimension}
     parameters.update(blockUpdateParams)
 
-    body = (
-        "[" +
-        ",".join(
-            '{' +
-            f'"x":{pos[0]},"y":{pos[1]},"z":{pos[2]},"id":"{block.id}"' +
-            (f',"state":{json.dumps(block.states, separators=(",",":"))}' if block.states else '') +
-            (f',"data":{repr(block.data)}' if block.data is not None else '') +
-            '}'
-            for pos, block in blocks
-        ) +
-        "]"
-    )
-
-    response = _request("PUT", url, data=bytes(body, "utf-8"), params=parameters, retries=retries, timeout=timeout)
+    body = _PlaceBlocksBody(blocks)
+
+    if compression is not None and compression not in COMPRESSION_METHODS:
+        raise ValueError(f'Unknown compression method "{compression}"')
+
+    data: Union[_PlaceBlocksBody, bytes] = body
+    compressed = False
+    if compression is not None and compressionSupported(host, compression):
+        smallBody = body.smallBody(compressionThreshold)
+        if smallBody is None:
+            compressed = True
+        else:
+            data = smallBody
+
+    response = None
+    compressedStatus = None
+    if compressed:
+        try:
+            response = _request("PUT", url, data=_CompressedBody(body, compression), params=parameters, headers={"Content-Encoding": compression}, retries=retries, timeout=timeout, session=session)
+            compressedStatus = response.status_code
+        except exceptions.InterfaceInternalError:
+            # This may be a transient error, so the compression method is not ruled out.
+            compressedStatus = 500
+        if compressedStatus in (400, 415, 500):
+            _warnCompressionFallback(host, compression)
+            if compressedStatus == 415:
+                _markCompressionUnsupported(host, compression)
+            response = None
+
+    if response is None:
+        response = _request("PUT", url, data=data, params=parameters, retries=retries, timeout=timeout, session=session)
+        # A server that cannot decompress the body typically fails to parse it, and reports a
+        # generic 400 error. If the same body is accepted uncompressed, that is what happened.
+        if compressedStatus == 400 and response.ok:
+            _markCompressionUnsupported(host, compression)
 
     result: List[Tuple[bool, Union[int, str]]] = [("message" not in entry, entry.get("message", int(entry["status"]))) for entry in response.json()]
     return result
 
 
-def runCommand(command: str, dimension: Optional[str] = None, retries=0, timeout=None, host=DEFAULT_HOST):
+def runCommand(command: str, dimension: Optional[str] = None, retries=0, timeout=None, host=DEFAULT_HOST, session: Optional[requests.Session] = None):
     """Executes one or multiple Minecraft commands (separated by newlines).
 
     The leading "/" must be omitted.
@@ -166,12 +362,12 @@ def runCommand(command: str, dimension: Optional[str] = None, retries=0, timeout
     result is its return value (if any). Otherwise, it is the error message.
     """
     url = f"{host}/command"
-    response = _request("POST", url, data=bytes(command, "utf-8"), params={'dimension': dimension}, retries=retries, timeout=timeout)
+    response = _request("POST", url, data=bytes(command, "utf-8"), params={'dimension': dimension}, retries=retries, timeout=timeout, session=session)
     result: List[Tuple[bool, Optional[str]]] = [(bool(entry["status"]), entry.get("message")) for entry in response.json()]
     return result
 
 
-def getBuildArea(retries=0, timeout=None, host=DEFAULT_HOST):
+def getBuildArea(retries=0, timeout=None, host=DEFAULT_HOST, session: Optional[requests.Session] = None):
     """Retrieves the build area that was specified with /setbuildarea in-game.
 
     Fails if the build area was not specified yet.
@@ -180,7 +376,7 @@ def getBuildArea(retries=0, timeout=None, host=DEFAULT_HOST):
     If a build area was specified, result is the box describing the build area.
     Otherwise, result is the error message string.
     """
-    response = _request("GET", f"{host}/buildarea", retries=retries, timeout=timeout)
+    response = _request("GET", f"{host}/buildarea", retries=retries, timeout=timeout, session=session)
 
     if not response.ok or response.json() == -1:
         raise exceptions.BuildAreaNotSetError(
@@ -203,7 +399,7 @@ def getBuildArea(retries=0, timeout=None, host=DEFAULT_HOST):
     return Box.between(fromPoint, toPoint)
 
 
-def getChunks(position: Vec2iLike, size: Optional[Vec2iLike] = None, dimension: Optional[str] = None, asBytes=False, retries=0, timeout=None, host=DEFAULT_HOST):
+def getChunks(position: Vec2iLike, size: Optional[Vec2iLike] = None, dimension: Optional[str] = None, asBytes=False, compressResponses=True, retries=0, timeout=None, host=DEFAULT_HOST, session: Optional[requests.Session] = None):
     """Returns raw chunk data.
 
     <position> specifies the position in chunk coordinates, and <size> specifies how many chunks
@@ -213,6 +409,9 @@ def getChunks(position: Vec2iLike, size: Optional[Vec2iLike] = None, dimension:
     If <asBytes> is True, returns raw binary data. Otherwise, returns a human-readable
     representation.
 
+    If <compressResponses> is True, the server may send a compressed response (if it supports
+    that). Otherwise, it is asked to send an uncompressed one.
+
     On error, returns the error message instead.
     """
     url = f"{host}/chunks"
@@ -226,10 +425,10 @@ def getChunks(position: Vec2iLike, size: Optional[Vec2iLike] = None, dimension:
         "dimension": dimension,
     }
     acceptType = "application/octet-stream" if asBytes else "text/plain"
-    response = _request("GET", url, params=parameters, headers={"Accept": acceptType}, retries=retries, timeout=timeout)
+    response = _request("GET", url, params=parameters, headers={"Accept": acceptType, **_acceptEncodingHeaders(compressResponses)}, retries=retries, timeout=timeout, session=session)
     return response.content if asBytes else response.text
 
 
-def getVersion(retries=0, timeout=None, host=DEFAULT_HOST):
+def getVersion(retries=0, timeout=None, host=DEFAULT_HOST, session: Optional[requests.Session] = None):
     """Returns the Minecraft version as a string."""
-    return _request("GET", f"{host}/version", retries=retries, timeout=timeout).text
+    return _request("GET", f"{host}/version", retries=retries, timeout=timeout, session=session).text
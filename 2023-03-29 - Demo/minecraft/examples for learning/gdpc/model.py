@@ -1,14 +1,16 @@
 """Provides the Model class"""
 
 
-from typing import Union, Optional, List, Dict
+from typing import Union, Optional, List, Dict, Tuple
 from copy import copy
 from glm import ivec3
+import numpy as np
 
-from .vector_tools import Vec3iLike, Box
+from .vector_tools import Vec3iLike
 from .transform import TransformLike
 from .editor import Editor
 from .block import Block
+from . import block_registry
 
 
 class Model:
@@ -16,18 +18,36 @@ class Model:
 
     Can be used to store a structure in memory, allowing it to be built under different
     transformations.
+
+    The blocks are stored as an array of state ids (see `gdpc.block_registry`), so a model can be
+    created from e.g. WorldSlice.getBlockStateIdsGlobal() with a plain array copy. Blocks with block
+    entity data have no state id; they are stored in a separate dict, and the array holds the state
+    id of the same block without its data.
     """
 
     def __init__(self, size: Vec3iLike, blocks: Optional[List[Optional[Block]]] = None):
         """Constructs a Model of size [size], optionally filled with [blocks]."""
         self._size = ivec3(*size)
+        volume = self._size.x * self._size.y * self._size.z
+        self._stateIds = np.full(tuple(self._size), block_registry.NOTHING_STATE_ID, dtype=block_registry.STATE_ID_DTYPE)
+        self._dataBlocks: Dict[Tuple[int, int, int], Block] = {}
         if blocks is not None:
-            volume = self._size.x * self._size.y * self._size.z
             if len(blocks) != volume:
                 raise ValueError("The number of blocks should be equal to size[0] * size[1] * size[2]")
-            self._blocks = copy(blocks)
-        else:
-            self._blocks = [None] * volume
+            if any(block is not None and block.data is not None for block in blocks):
+                for index, block in enumerate(blocks):
+                    self.setBlock(np.unravel_index(index, self._stateIds.shape), block)
+            else:
+                self._stateIds = block_registry.stateIds(blocks).reshape(tuple(self._size))
+
+
+    @staticmethod
+    def fromStateIds(stateIds: np.ndarray):
+        """Constructs a Model from a 3D array of state ids, indexed with [x, y, z].\n
+        Positions with block_registry.NOTHING_STATE_ID are empty."""
+        model = Model(stateIds.shape)
+        model._stateIds[...] = stateIds
+        return model
 
 
     @property
@@ -37,17 +57,43 @@ class Model:
 
     @property
     def blocks(self) -> List[Optional[Block]]:
-        """This Model's block list"""
-        return copy(self._blocks) # Allows block modification, but not resizing
+        """This Model's block list. Empty positions are None.\n
+        The blocks are mutable copies; use .setBlock() to change the model."""
+        registeredBlocks = block_registry.registeredBlocks()
+        blocks = [None if i == block_registry.NOTHING_STATE_ID else registeredBlocks[i].thaw() for i in self._stateIds.flatten().tolist()]
+        for position, block in self._dataBlocks.items():
+            blocks[np.ravel_multi_index(position, self._stateIds.shape)] = block.thaw()
+        return blocks
+
+    @property
+    def stateIds(self):
+        """The state id of every block of this Model, indexed with [x, y, z]. Blocks with block
+        entity data have the state id of the same block without data. The array is read-only; use
+        .setBlock() to change the model."""
+        view: np.ndarray = self._stateIds.view()
+        view.flags.writeable = False
+        return view
 
 
     def getBlock(self, position: Vec3iLike):
-        """Returns the block at [vec]"""
-        return self._blocks[(position[0] * self._size.y + position[1]) * self._size.z + position[2]]
+        """Returns the block at [vec]\n
+        The block is a mutable copy; use .setBlock() to change the model."""
+        index = (int(position[0]), int(position[1]), int(position[2]))
+        block = self._dataBlocks.get(index)
+        if block is not None:
+            return block.thaw()
+        i = self._stateIds[index]
+        return None if i == block_registry.NOTHING_STATE_ID else block_registry.blockOf(i).thaw()
 
     def setBlock(self, position: Vec3iLike, block: Optional[Block]):
         """Sets the block at [vec] to [block]"""
-        self._blocks[(position[0] * self._size.y + position[1]) * self._size.z + position[2]] = block
+        index = (int(position[0]), int(position[1]), int(position[2]))
+        if block is not None and block.data is not None:
+            self._stateIds[index] = block_registry.stateIds([Block(block.id, dict(block.states))])[0]
+            self._dataBlocks[index] = block.freeze()
+        else:
+            self._stateIds[index] = block_registry.stateIds([block])[0]
+            self._dataBlocks.pop(index, None)
 
 
     def build(
@@ -63,13 +109,22 @@ class Model:
         """
         if substitutions is None: substitutions = {}
 
+        # Substitute once per distinct block instead of once per position.
+        blocksToPlace: Dict[int, Block] = {}
+        for i in np.unique(self._stateIds).tolist():
+            block = block_registry.blockOf(i)
+            if block.id in substitutions:
+                block = Block(substitutions[block.id], dict(block.states), block.data)
+            blocksToPlace[i] = block
+
         with editor.pushTransform(transformLike):
-            for vec in Box(size=self._size).inner:
-                block = self.getBlock(vec)
-                if block is not None:
-                    blockToPlace = copy(block)
-                    blockToPlace.id = substitutions.get(block.id, block.id)
-                    editor.placeBlock(vec, blockToPlace, replace)
+            for vec in np.argwhere(self._stateIds != block_registry.NOTHING_STATE_ID).tolist():
+                block = self._dataBlocks.get(tuple(vec))
+                if block is None:
+                    block = blocksToPlace[self._stateIds[tuple(vec)]]
+                elif block.id in substitutions:
+                    block = Block(substitutions[block.id], dict(block.states), block.data)
+                editor.placeBlock(ivec3(*vec), block, replace)
 
     def __repr__(self):
         return f"Model(size={repr(self.size)}, blocks={repr(self.blocks)})"
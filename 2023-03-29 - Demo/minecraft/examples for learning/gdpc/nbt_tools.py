@@ -1,7 +1,11 @@
 """Utilities for working with Minecraft's NBT and SNBT formats"""
 
 
+from io import BytesIO
+import struct
+
 from nbt import nbt
+import numpy as np
 
 
 def nbtToSnbt(tag: nbt.TAG) -> str:
@@ -31,3 +35,135 @@ def nbtToSnbt(tag: nbt.TAG) -> str:
     if isinstance(tag, nbt.TAG_String):
         return repr(tag.value)
     raise TypeError(f"Unrecognized tag type: {type(tag)}")
+
+
+# NBT tag type ids
+TAG_END        = 0
+TAG_BYTE       = 1
+TAG_SHORT      = 2
+TAG_INT        = 3
+TAG_LONG       = 4
+TAG_FLOAT      = 5
+TAG_DOUBLE     = 6
+TAG_BYTE_ARRAY = 7
+TAG_STRING     = 8
+TAG_LIST       = 9
+TAG_COMPOUND   = 10
+TAG_INT_ARRAY  = 11
+TAG_LONG_ARRAY = 12
+
+_SCALAR_STRUCTS = {
+    TAG_BYTE:   struct.Struct(">b"),
+    TAG_SHORT:  struct.Struct(">h"),
+    TAG_INT:    struct.Struct(">i"),
+    TAG_LONG:   struct.Struct(">q"),
+    TAG_FLOAT:  struct.Struct(">f"),
+    TAG_DOUBLE: struct.Struct(">d"),
+}
+_ARRAY_DTYPES = {
+    TAG_BYTE_ARRAY: np.dtype(">i1"),
+    TAG_INT_ARRAY:  np.dtype(">i4"),
+    TAG_LONG_ARRAY: np.dtype(">i8"),
+}
+_INT   = struct.Struct(">i")
+_SHORT = struct.Struct(">H")
+
+
+class NbtView:
+    """Reads uncompressed binary NBT data from a buffer, without building `nbt.TAG` objects.\n
+    Payloads are read into plain Python values: compounds become dicts, lists become lists, strings
+    become str, numbers become int/float. Byte, int and long arrays become read-only big-endian NumPy
+    arrays that view the buffer instead of copying it.\n
+    The view keeps a read position (.pos). Payloads that are not needed can be skipped, which is
+    much cheaper than reading them."""
+
+    def __init__(self, buffer, pos: int = 0):
+        self.buffer = memoryview(buffer)
+        self.pos    = pos
+
+    def readInt(self) -> int:
+        """Reads a big-endian 32-bit integer."""
+        value = _INT.unpack_from(self.buffer, self.pos)[0]
+        self.pos += 4
+        return value
+
+    def readString(self) -> str:
+        """Reads a length-prefixed (modified) UTF-8 string."""
+        length = _SHORT.unpack_from(self.buffer, self.pos)[0]
+        begin = self.pos + 2
+        self.pos = begin + length
+        return str(self.buffer[begin:self.pos], "utf-8")
+
+    def readTagHeader(self):
+        """Reads the type and name of a named tag. Returns (tagType, name); the name of TAG_End is
+        an empty string."""
+        tagType = self.buffer[self.pos]
+        self.pos += 1
+        if tagType == TAG_END:
+            return tagType, ""
+        return tagType, self.readString()
+
+    def iterCompound(self):
+        """Iterates over the entries of the compound payload at the current position, yielding
+        (tagType, name) for each.\n
+        Each entry's payload must be read or skipped before advancing the iterator."""
+        while True:
+            tagType, name = self.readTagHeader()
+            if tagType == TAG_END:
+                return
+            yield tagType, name
+
+    def iterList(self):
+        """Iterates over the list payload at the current position, yielding the element tag type
+        once for every element.\n
+        Each element's payload must be read or skipped before advancing the iterator."""
+        elementType = self.buffer[self.pos]
+        self.pos += 1
+        length = self.readInt()
+        for _ in range(length):
+            yield elementType
+
+    def readPayload(self, tagType: int):
+        """Reads the payload of a tag of type <tagType>."""
+        scalarStruct = _SCALAR_STRUCTS.get(tagType)
+        if scalarStruct is not None:
+            value = scalarStruct.unpack_from(self.buffer, self.pos)[0]
+            self.pos += scalarStruct.size
+            return value
+        if tagType == TAG_STRING:
+            return self.readString()
+        dtype = _ARRAY_DTYPES.get(tagType)
+        if dtype is not None:
+            length = self.readInt()
+            array = np.frombuffer(self.buffer, dtype=dtype, count=length, offset=self.pos)
+            self.pos += length * dtype.itemsize
+            return array
+        if tagType == TAG_LIST:
+            return [self.readPayload(elementType) for elementType in self.iterList()]
+        if tagType == TAG_COMPOUND:
+            return {name: self.readPayload(entryType) for entryType, name in self.iterCompound()}
+        raise ValueError(f"Invalid NBT tag type {tagType} at position {self.pos}")
+
+    def skipPayload(self, tagType: int):
+        """Skips the payload of a tag of type <tagType>."""
+        scalarStruct = _SCALAR_STRUCTS.get(tagType)
+        if scalarStruct is not None:
+            self.pos += scalarStruct.size
+        elif tagType == TAG_STRING:
+            self.pos += 2 + _SHORT.unpack_from(self.buffer, self.pos)[0]
+        elif tagType in _ARRAY_DTYPES:
+            self.pos += 4 + self.readInt() * _ARRAY_DTYPES[tagType].itemsize
+        elif tagType == TAG_LIST:
+            for elementType in self.iterList():
+                self.skipPayload(elementType)
+        elif tagType == TAG_COMPOUND:
+            for entryType, _ in self.iterCompound():
+                self.skipPayload(entryType)
+        else:
+            raise ValueError(f"Invalid NBT tag type {tagType} at position {self.pos}")
+
+    def readCompoundTag(self) -> nbt.TAG_Compound:
+        """Parses the compound payload at the current position into an `nbt.TAG_Compound`."""
+        begin = self.pos
+        self.skipPayload(TAG_COMPOUND)
+        return nbt.TAG_Compound(buffer=BytesIO(self.buffer[begin:self.pos]))
@@ -3,12 +3,34 @@
 
 from typing import Union
 from dataclasses import dataclass
+from itertools import product
 
 from glm import ivec3, bvec3
+import numpy as np
 
 from .vector_tools import Vec3iLike, Vec3bLike, rotate3D, flipRotation3D, flipToScale3D, rotateSize3D, Box
 
 
+# ==================================================================================================
+# Transform matrices
+# ==================================================================================================
+
+
+def _rotationFlipMatrix(rotation: int, flip: Vec3bLike):
+    """Returns the 3x3 integer matrix that flips by <flip> first and rotates by <rotation> second."""
+    columns = [rotate3D(ivec3(*axis) * flipToScale3D(flip), rotation) for axis in ((1,0,0), (0,1,0), (0,0,1))]
+    matrix = np.array([tuple(column) for column in columns], dtype=np.int64).T
+    matrix.flags.writeable = False
+    return matrix
+
+
+# The matrices of all 32 combinations of rotation and flip, keyed by (rotation, flipX, flipY, flipZ).
+_ROTATION_FLIP_MATRICES = {
+    (rotation, *flip): _rotationFlipMatrix(rotation, flip)
+    for rotation in range(4) for flip in product((False, True), repeat=3)
+}
+
+
 # ==================================================================================================
 # Transform class
 # ==================================================================================================
@@ -78,6 +100,23 @@ class Transform:
         Faster version of ~[self] * [vec]."""
         return rotate3D(ivec3(*vec) - self._translation, (-self._rotation + 4) % 4) * flipToScale3D(self._flip)
 
+    @property
+    def matrix(self) -> np.ndarray:
+        """The read-only 3x3 integer matrix of the rotation and flip of this transform, such that
+        self.apply(vec) == matrix @ vec + self.translation"""
+        return _ROTATION_FLIP_MATRICES[(self._rotation % 4, self._flip.x, self._flip.y, self._flip.z)]
+
+    def applyArray(self, vecs: np.ndarray) -> np.ndarray:
+        """Applies this transform to every row of the (N, 3) integer array [vecs].\n
+        Vectorized version of [self].apply()."""
+        return np.asarray(vecs) @ self.matrix.T + np.array(self._translation, dtype=np.int64)
+
+    def invApplyArray(self, vecs: np.ndarray) -> np.ndarray:
+        """Applies the inverse of this transform to every row of the (N, 3) integer array [vecs].\n
+        Vectorized version of [self].invApply()."""
+        # The matrix is orthogonal, so its inverse is its transpose.
+        return (np.asarray(vecs) - np.array(self._translation, dtype=np.int64)) @ self.matrix
+
     def compose(self, other: 'Transform'):
         """Returns a transform that applies [self] after [other].\n
         Equivalent to [self] @ [other]. """
@@ -123,6 +123,11 @@ class OrderedByLookupDict(OrderedDict[KT, VT], Generic[KT, VT]):
         self.move_to_end(key)
         return value
 
+    def peek(self, key: KT, default=None):
+        """Returns the value of <key>, or <default> if it is not present, without counting as a
+        lookup."""
+        return super().get(key, default)
+
     def __setitem__(self, key: KT, value: VT):
         if key in self:
             self.move_to_end(key)
@@ -5,6 +5,7 @@ from typing import Sequence, Any, Iterable, List, Optional, Set, Tuple, Union
 from abc import ABC
 from numbers import Integral
 from dataclasses import dataclass
+import itertools
 import math
 
 from more_itertools import powerset
@@ -732,6 +733,86 @@ def setBoxSlice(array: np.ndarray, box: Box, value: Any):
     array[box.begin.x:box.end.x, box.begin.y:box.end.y, box.begin.z:box.end.z] = value
 
 
+def splitBox(box: Box, maxVolume: int) -> List[Box]:
+    """Splits [box] into boxes with a volume of at most [maxVolume].\n
+    The box is cut into Y-layers first, and into Z-rows and X-segments only if a single layer is
+    still too large."""
+    if box.volume <= maxVolume:
+        return [box]
+    size = box.size
+    partSize = ivec3(min(size.x, maxVolume), 1, 1)
+    partSize.z = min(size.z, max(1, maxVolume // partSize.x))
+    partSize.y = min(size.y, max(1, maxVolume // (partSize.x * partSize.z)))
+    return [
+        Box(box.offset + ivec3(x, y, z), glm.min(partSize, size - ivec3(x, y, z)))
+        for y in range(0, size.y, partSize.y)
+        for z in range(0, size.z, partSize.z)
+        for x in range(0, size.x, partSize.x)
+    ]
+
+
+def partitionIntoBoxes(points: Iterable[Vec3iLike], minVolume: int = 1) -> Tuple[List[Box], List[ivec3]]:
+    """Greedily partitions [points] into disjoint boxes that are entirely covered by [points].\n
+    Starting from the lowest remaining point, each box is grown along the X-axis first, then along
+    the Z-axis and finally along the Y-axis. Boxes with a volume smaller than [minVolume] are not
+    kept; their points are returned as the remainder instead.\n
+    Returns (boxes, remainder)."""
+    # A set is used instead of a dense array, so that sparse points far apart stay cheap.
+    remaining = {tuple(point) for point in points}
+    boxes:     List[Box]   = []
+    remainder: List[ivec3] = []
+    # Visit the points in YZX order, so that every box is found at its lowest corner.
+    for y, z, x in sorted((point[1], point[2], point[0]) for point in remaining):
+        if (x, y, z) not in remaining:
+            continue
+        x1 = x + 1
+        while (x1, y, z) in remaining:
+            x1 += 1
+        z1 = z + 1
+        while all((i, y, z1) in remaining for i in range(x, x1)):
+            z1 += 1
+        y1 = y + 1
+        while all((i, y1, k) in remaining for i in range(x, x1) for k in range(z, z1)):
+            y1 += 1
+        remaining.difference_update(itertools.product(range(x, x1), range(y, y1), range(z, z1)))
+        box = Box(ivec3(x, y, z), ivec3(x1 - x, y1 - y, z1 - z))
+        if box.volume >= minVolume:
+            boxes.append(box)
+        else:
+            remainder.extend(box.inner)
+    return boxes, remainder
+
+
+def partitionMaskIntoBoxes(mask: np.ndarray, minVolume: int = 1) -> Tuple[List[Box], np.ndarray]:
+    """Like partitionIntoBoxes(), but for the True positions of the 3D boolean array [mask], indexed
+    with [x, y, z].\n
+    Returns (boxes, remainder), where the boxes are in array index coordinates, and <remainder> is a
+    boolean array of the positions that are not covered by any of the boxes."""
+    remaining = np.array(mask, dtype=bool)
+    remainder = np.zeros_like(remaining)
+    boxes: List[Box] = []
+    sizeX, sizeY, sizeZ = remaining.shape
+    # Visit the points in YZX order, so that every box is found at its lowest corner.
+    for y, z, x in np.argwhere(remaining.transpose(1, 2, 0)).tolist():
+        if not remaining[x, y, z]:
+            continue
+        row = remaining[x:, y, z]
+        x1 = x + (int(np.argmin(row)) if not row.all() else len(row))
+        z1 = z + 1
+        while z1 < sizeZ and remaining[x:x1, y, z1].all():
+            z1 += 1
+        y1 = y + 1
+        while y1 < sizeY and remaining[x:x1, y1, z:z1].all():
+            y1 += 1
+        remaining[x:x1, y:y1, z:z1] = False
+        box = Box(ivec3(x, y, z), ivec3(x1 - x, y1 - y, z1 - z))
+        if box.volume >= minVolume:
+            boxes.append(box)
+        else:
+            remainder[x:x1, y:y1, z:z1] = True
+    return boxes, remainder
+
+
 # ==================================================================================================
 # Point generation
 # ==================================================================================================
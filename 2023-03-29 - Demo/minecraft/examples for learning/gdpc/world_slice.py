@@ -1,28 +1,58 @@
 """Provides the WorldSlice class"""
 
-from typing import Dict, Iterable, Optional
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Union
+from concurrent import futures
 from dataclasses import dataclass
 from io import BytesIO
 from math import floor, ceil, log2
+import zlib
 
+import glm
 from glm import ivec2, ivec3
 from nbt import nbt
 import numpy as np
+import requests
 
-from .vector_tools import Vec3iLike, addY, loop2D, loop3D, trueMod2D, Rect
+from .vector_tools import Vec3iLike, addY, dropY, loop3D, trueMod2D, Rect, Box
 from .block import Block
+from . import block_registry
+from .nbt_tools import NbtView, TAG_COMPOUND
+from .chunk_cache import ChunkCache, splitChunks, joinChunks
 from . import interface
 
 
+# The default maximum width and length (in chunks) of the tiles that a WorldSlice requests its
+# chunks in, and the default amount of tiles that are requested concurrently.
+DEFAULT_TILE_SIZE     = 16
+DEFAULT_FETCH_WORKERS = 4
+
+
 # Chunk format information:
 # https://minecraft.fandom.com/wiki/Chunk_format
 
 
+def _unpackBitArray(bitsPerEntry: int, logicalArraySize: int, data) -> np.ndarray:
+    """Unpacks a Minecraft packed long array into a uint16 array of <logicalArraySize> entries.\n
+    Since Minecraft 1.16, entries do not span across longs: each long holds
+    64 // <bitsPerEntry> entries, starting at its least significant bit, and any remaining high bits
+    are padding.\n
+    If <data> is None or empty, the corresponding palette only contains a single value, and an array
+    of zeros is returned."""
+    if data is None or len(data) == 0:
+        return np.zeros(logicalArraySize, dtype=np.uint16)
+    longs = np.asarray(data, dtype=np.int64).view(np.uint64)
+    entriesPerLong = 64 // bitsPerEntry
+    shifts = np.arange(entriesPerLong, dtype=np.uint64) * np.uint64(bitsPerEntry)
+    mask   = np.uint64((1 << bitsPerEntry) - 1)
+    entries = (longs[:, np.newaxis] >> shifts[np.newaxis, :]) & mask
+    return entries.reshape(-1)[:logicalArraySize].astype(np.uint16)
+
+
 class _BitArray:
     """Store an array of binary values and its metrics.
 
     Minecraft stores block and heightmap data in compacted arrays of longs (bitarrays).
-    This class performs index mapping and bit shifting to access the data.
+    This class unpacks the data into a NumPy array of indices on construction.
     """
 
     def __init__(self, bitsPerEntry: int, logicalArraySize: int, data):
@@ -37,7 +67,8 @@ class _BitArray:
             expectedLongCount = floor((logicalArraySize + self._entriesPerLong - 1) / self._entriesPerLong)
             if len(data) != expectedLongCount:
                 raise ValueError(f"Invalid data length: got {len(data)} but expected {expectedLongCount}")
-            self.longArray = data
+            self.longArray = np.array(data) # A copy, so that no response buffer is kept alive.
+        self.array = _unpackBitArray(bitsPerEntry, logicalArraySize, data)
 
     def __repr__(self):
         """Represents the BitArray as a constructor."""
@@ -45,41 +76,108 @@ class _BitArray:
 
     def __getitem__(self, index: int):
         """Returns the binary value stored at <index>."""
-        # If longArray size is 0, this is because the corresponding palette
-        # only contains a single value.
-        if len(self.longArray) == 0:
-            return 0
-        longIndex = index // self._entriesPerLong
-        long = self.longArray[longIndex]
-        k = (index - longIndex * self._entriesPerLong) * self._bitsPerEntry
-        return long >> k & self._maxEntryValue
+        return int(self.array[index])
 
     def __len__(self):
         """Returns the logical array size."""
         return self._logicalArraySize
 
 
+def _blockStateKey(blockState: Dict[str, Any]):
+    """Returns a hashable key that identifies the block state described by the palette entry
+    <blockState>."""
+    return (blockState["Name"], tuple(sorted(blockState.get("Properties", {}).items())))
+
+
+def _blockStateTag(blockState: Dict[str, Any]):
+    """Builds the block state compound tag for the palette entry <blockState>."""
+    tag = nbt.TAG_Compound()
+    tag.tags.append(nbt.TAG_String(name="Name", value=blockState["Name"]))
+    if "Properties" in blockState:
+        propertiesTag = nbt.TAG_Compound(name="Properties")
+        for key, value in blockState["Properties"].items():
+            propertiesTag.tags.append(nbt.TAG_String(name=key, value=value))
+        tag.tags.append(propertiesTag)
+    return tag
+
+
+def _readChunks(view: NbtView):
+    """Reads the chunk list of a /chunks response, keeping only what a WorldSlice needs.\n
+    Returns a list with, for every chunk, a dict with its "yPos", its "Heightmaps" (packed long
+    arrays), its "sections" (each with "Y", "block_states" and "biomes") and its "block_entities"
+    (as ((x, y, z), begin, end) tuples, where [begin, end) is the range of the entity's compound
+    payload in the buffer). Everything else, such as light data, is skipped.\n
+    Packed long arrays are returned as views into the buffer."""
+    chunks = []
+    rootType, _ = view.readTagHeader()
+    if rootType != TAG_COMPOUND:
+        raise ValueError("Invalid chunk data: the root tag is not a compound")
+    for tagType, name in view.iterCompound():
+        if name != "Chunks":
+            view.skipPayload(tagType)
+            continue
+        for _ in view.iterList():
+            chunk: Dict[str, Any] = {"sections": [], "block_entities": []}
+            for chunkTagType, chunkTagName in view.iterCompound():
+                if chunkTagName in ("yPos", "Heightmaps"):
+                    chunk[chunkTagName] = view.readPayload(chunkTagType)
+                elif chunkTagName == "sections":
+                    for _ in view.iterList():
+                        section = {}
+                        for sectionTagType, sectionTagName in view.iterCompound():
+                            if sectionTagName in ("Y", "block_states", "biomes"):
+                                section[sectionTagName] = view.readPayload(sectionTagType)
+                            else:
+                                view.skipPayload(sectionTagType)
+                        chunk["sections"].append(section)
+                elif chunkTagName == "block_entities":
+                    for _ in view.iterList():
+                        begin = view.pos
+                        blockEntity = view.readPayload(TAG_COMPOUND)
+                        chunk["block_entities"].append(((blockEntity["x"], blockEntity["y"], blockEntity["z"]), begin, view.pos))
+                else:
+                    view.skipPayload(chunkTagType)
+            chunks.append(chunk)
+    return chunks
+
+
 @dataclass
 class _ChunkSection:
     """Represents a chunk section or sub-chunk (16x16x16)."""
 
-    blockPalette:        nbt.TAG_List
+    blockPalette:        List[Dict[str, Any]]
     blockStatesBitArray: _BitArray
-    biomesPalette:       nbt.TAG_List
+    biomesPalette:       List[str]
     biomesBitArray:      _BitArray
 
-    def getBlockStateTagAtIndex(self, index) -> nbt.TAG_Compound:
+    def getBlockStateAtIndex(self, index) -> Dict[str, Any]:
         return self.blockPalette[self.blockStatesBitArray[index]]
 
-    def getBiomeAtIndex(self, index) -> nbt.TAG_String:
+    def getBiomeAtIndex(self, index) -> str:
         return self.biomesPalette[self.biomesBitArray[index]]
 
 
 class WorldSlice:
     """Contains information on a slice of the world."""
 
-    def __init__(self, rect: Rect, dimension: Optional[str] = None, heightmapTypes: Optional[Iterable[str]] = None, retries=0, timeout=None, host=interface.DEFAULT_HOST):
-        """Initialise WorldSlice with region and heightmap."""
+    def __init__(self, rect: Rect, dimension: Optional[str] = None, heightmapTypes: Optional[Iterable[str]] = None, retries=0, timeout=None, host=interface.DEFAULT_HOST, session: Optional[requests.Session] = None, lazy=False, yRange: Optional[Tuple[int, int]] = None, surfaceBand: Optional[Tuple[int, int]] = None, chunkCache: Optional[ChunkCache] = None, minecraftVersion: Optional[str] = None, sessionPool: Optional[interface.SessionPool] = None, tileSize=DEFAULT_TILE_SIZE, fetchWorkers=DEFAULT_FETCH_WORKERS, compressResponses=True):
+        """Initialise WorldSlice with region and heightmap.\n
+        If <lazy> is True, chunk sections are only decoded when they are first accessed (or when
+        they are explicitly preloaded with .preload()). This saves time and memory if only a part of
+        the slice (e.g. a band around the surface) is queried.\n
+        By default, the slice covers the full build height of the world. If <yRange>=(begin, end) is
+        given, only the chunk sections overlapping the global Y-range [begin, end) are kept.
+        Alternatively, <surfaceBand>=(below, above) keeps the sections from <below> blocks under the
+        lowest heightmap value up to <above> blocks over the highest one. The resulting range is
+        rounded outwards to whole sections and is reflected by .yBegin, .yEnd and .box. Blocks
+        outside of it read as void air, like blocks outside of the rect.\n
+        If <chunkCache> is given, the chunks are read from it if they are all cached, and stored in
+        it otherwise. Cached chunks are keyed by <minecraftVersion>, which is retrieved from the
+        GDMC HTTP interface if not given.\n
+        Rects wider or longer than <tileSize> chunks are requested in tiles of at most
+        <tileSize>x<tileSize> chunks, up to <fetchWorkers> at a time. If <sessionPool> is given, each
+        fetch thread uses its own session from it; otherwise, they all share <session>.\n
+        If <compressResponses> is True, the chunks may be sent compressed (see interface.getChunks())."""
 
         # To protect from calling this with a Box, which can lead to very confusing bugs.
         if not isinstance(rect, Rect):
@@ -99,80 +197,230 @@ class WorldSlice:
             ((self._rect.last) >> 4) - (self._rect.offset >> 4) + 1
         )
 
-        chunkBytes = interface.getChunks(self._chunkRect.offset, self._chunkRect.size, dimension=dimension, asBytes=True, retries=retries, timeout=timeout, host=host)
-        chunkBuffer = BytesIO(chunkBytes)
-
-        self._nbt = nbt.NBTFile(buffer=chunkBuffer)
-
         self._heightmaps: Dict[str, np.ndarray] = {}
         for hmName in heightmapTypes:
             self._heightmaps[hmName] = np.zeros(self._rect.size, dtype=int)
 
-        self._sections: Dict[ivec3, _ChunkSection] = {}
-
-        self._blockEntities: Dict[ivec3, nbt.TAG_Compound] = {}
-
-        inChunkRectOffset = trueMod2D(self._rect.offset, 16)
+        # Decoded chunk sections, and the tags of the sections that have not been decoded yet.
+        self._sections:       Dict[ivec3, _ChunkSection]   = {}
+        self._sectionTags:    Dict[ivec3, Dict[str, Any]]  = {}
+
+        # Block entities are only parsed when a block with one is retrieved. Until then, this stores
+        # a copy of their compound payload.
+        self._blockEntities: Dict[ivec3, Union[bytes, nbt.TAG_Compound]] = {}
+
+        self._inChunkRectOffset = trueMod2D(self._rect.offset, 16)
+
+        # The NBT data is read directly from the response buffers, which are released once they
+        # have been read. Only a zlib-compressed copy of every tile response is kept, as
+        # (tile chunk rect, compressed bytes) pairs, from which the full `nbt` tag tree is built if
+        # .nbt is accessed.
+        self._compressedTiles: List[Tuple[Rect, bytes]] = []
+        self._nbt: Optional[nbt.NBTFile] = None
+
+        if chunkCache is not None and minecraftVersion is None:
+            minecraftVersion = interface.getVersion(retries=retries, timeout=timeout, host=host, session=session)
+
+        def loadTile(tileRect: Rect, fetchPool: Optional[interface.SessionPool] = sessionPool):
+            def fetchChunks(chunkRect: Rect):
+                # Each fetch thread uses its own session from the pool, if there is one.
+                fetchSession = session if fetchPool is None else fetchPool.session
+                return interface.getChunks(chunkRect.offset, chunkRect.size, dimension=dimension, asBytes=True, compressResponses=compressResponses, retries=retries, timeout=timeout, host=host, session=fetchSession)
+            if chunkCache is None:
+                return tileRect, fetchChunks(tileRect)
+            return tileRect, chunkCache.getChunks(minecraftVersion, dimension, tileRect, fetchChunks)
+
+        # Large rects are requested as tiles of at most <tileSize>x<tileSize> chunks. The tiles are
+        # fetched concurrently and each one is read as soon as it arrives, with at most
+        # <fetchWorkers> responses in flight.
+        tileRects = [
+            Rect(
+                self._chunkRect.offset + ivec2(x, z),
+                glm.min(ivec2(tileSize, tileSize), self._chunkRect.size - ivec2(x, z))
+            )
+            for z in range(0, self._chunkRect.size.y, tileSize)
+            for x in range(0, self._chunkRect.size.x, tileSize)
+        ]
+        if len(tileRects) == 1 or fetchWorkers <= 1:
+            for tileRect in tileRects:
+                worldYBegin, worldYEnd = self._readTile(*loadTile(tileRect), heightmapTypes)
+        else:
+            # The fetch threads only live for this load, so their sessions come from a separate pool
+            # that is closed afterwards.
+            fetchPool = None if sessionPool is None else interface.SessionPool(sessionPool.poolSize)
+            try:
+                with futures.ThreadPoolExecutor(min(fetchWorkers, len(tileRects))) as executor:
+                    pending = set()
+                    for tileRect in tileRects:
+                        if len(pending) >= fetchWorkers:
+                            done, pending = futures.wait(pending, return_when=futures.FIRST_COMPLETED)
+                            for future in done:
+                                worldYBegin, worldYEnd = self._readTile(*future.result(), heightmapTypes)
+                        pending.add(executor.submit(loadTile, tileRect, fetchPool))
+                    for future in futures.as_completed(pending):
+                        worldYBegin, worldYEnd = self._readTile(*future.result(), heightmapTypes)
+            finally:
+                if fetchPool is not None:
+                    fetchPool.close()
+
+        # Determine the vertical band to keep, and drop the sections outside of it.
+        if yRange is None and surfaceBand is not None and self._heightmaps:
+            yRange = (
+                min(int(hm.min()) for hm in self._heightmaps.values()) - surfaceBand[0],
+                max(int(hm.max()) for hm in self._heightmaps.values()) + surfaceBand[1],
+            )
+        if yRange is None:
+            self._yBegin = worldYBegin
+            yEnd         = worldYEnd
+        else:
+            self._yBegin = min(max((yRange[0] >> 4) << 4,            worldYBegin), worldYEnd)
+            yEnd         = min(max(((yRange[1] + 15) >> 4) << 4, self._yBegin), worldYEnd)
+            self._sectionTags = {
+                sectionPos: sectionTag for sectionPos, sectionTag in self._sectionTags.items()
+                if self._yBegin <= sectionPos.y * 16 < yEnd
+            }
+        self._ySize = yEnd - self._yBegin
+
+        # Slice-global block palette. Entry 0 stands for positions without block data, which read
+        # as void air.
+        self._blockPaletteStates: List[Optional[Dict[str, Any]]]    = [None]
+        self._blockPaletteTags:   List[Optional[nbt.TAG_Compound]] = [None] # Built on demand
+        self._blockPalette:       List[Block]                      = [Block("minecraft:void_air")]
+        self._blockPaletteIndex:  Dict[tuple, int]                 = {}
+        # The state id (see block_registry) of each palette entry, extended on demand.
+        self._blockPaletteStateIds = np.zeros(0, dtype=block_registry.STATE_ID_DTYPE)
+
+        # The palette id of every block in the slice, in XYZ order.
+        self._blockIds = np.zeros((self._rect.size.x, self._ySize, self._rect.size.y), dtype=np.uint16)
+
+        if not lazy:
+            self._decodeAllSections()
+
+
+    def _readTile(self, tileRect: Rect, chunkBytes: bytes, heightmapTypes: Iterable[str]):
+        """Reads the /chunks response <chunkBytes> for the chunks in <tileRect>: fills in their part
+        of the heightmaps and collects their sections and block entities.\n
+        Returns the (begin, end) Y-range of the world, as stored in the chunks.\n
+        Nothing that is kept refers to <chunkBytes>, so the buffer can be freed afterwards."""
+        # Chunk data compresses well; the fastest level keeps this cheap compared to parsing.
+        self._compressedTiles.append((tileRect, zlib.compress(chunkBytes, 1)))
+        chunks = _readChunks(NbtView(chunkBytes))
 
         # This assumes that the build bounds are the same for every chunk.
-        self._yBegin = 16 * int(self._nbt["Chunks"][0]["yPos"].value)
-        self._ySize  = 16 * len(self._nbt["Chunks"][0]["sections"])
+        worldYBegin = 16 * int(chunks[0]["yPos"])
+        worldYEnd   = worldYBegin + 16 * len(chunks[0]["sections"])
 
-        # Loop through chunks
-        for chunkPos in loop2D(self._chunkRect.size):
-            chunkID = chunkPos.x + chunkPos.y * self._chunkRect.size.x
-            chunkTag = self._nbt['Chunks'][chunkID]
+        # Loop through chunks. The /chunks endpoint lists them in ZX order.
+        for chunkID, chunkTag in enumerate(chunks):
+            chunkPos = tileRect.offset - self._chunkRect.offset + ivec2(chunkID % tileRect.size.x, chunkID // tileRect.size.x)
 
             # Read heightmaps
+            localBegin, localEnd, inChunkBegin, inChunkEnd = self._chunkOverlap(chunkPos)
             heightmapsTag = chunkTag['Heightmaps']
             for hmName in heightmapTypes:
                 hmRaw = heightmapsTag[hmName]
-                hmBitArray = _BitArray(9, 16*16, hmRaw)
-                heightmap = self._heightmaps[hmName]
-                for inChunkPos in loop2D(ivec2(16,16)):
-                    try:
-                        # In the heightmap data, the lowest point is encoded as 0, while since
-                        # Minecraft 1.18 the actual lowest y position is below zero. We subtract
-                        # yBegin from the heightmap value to compensate for this difference.
-                        hmPos = -inChunkRectOffset + chunkPos * 16 + inChunkPos # pylint: disable=invalid-unary-operand-type
-                        heightmap[hmPos.x, hmPos.y] = hmBitArray[inChunkPos.y * 16 + inChunkPos.x] + self._yBegin
-                    except IndexError:
-                        pass
-
-            # Read chunk sections
+                # Entries are stored in ZX order; transpose to XZ.
+                hmChunk = _unpackBitArray(9, 16*16, hmRaw).reshape(16, 16).T
+                # In the heightmap data, the lowest point is encoded as 0, while since
+                # Minecraft 1.18 the actual lowest y position is below zero. We subtract
+                # yBegin from the heightmap value to compensate for this difference.
+                self._heightmaps[hmName][localBegin.x:localEnd.x, localBegin.y:localEnd.y] = (
+                    hmChunk[inChunkBegin.x:inChunkEnd.x, inChunkBegin.y:inChunkEnd.y].astype(int) + worldYBegin
+                )
+
+            # Collect chunk sections
             for sectionTag in chunkTag['sections']:
-                y = int(sectionTag['Y'].value)
+                y = int(sectionTag['Y'])
 
                 if (not ('block_states' in sectionTag) or len(sectionTag['block_states']) == 0):
                     continue
 
-                blockPalette = sectionTag['block_states']['palette']
-                blockData = None
-                if 'data' in sectionTag['block_states']:
-                    blockData = sectionTag['block_states']['data']
-                blockPaletteBitsPerEntry = max(4, ceil(log2(len(blockPalette))))
-                blockDataBitArray = _BitArray(blockPaletteBitsPerEntry, 16*16*16, blockData)
-
-                biomesPalette = sectionTag['biomes']['palette']
-                biomesData = None
-                if 'data' in sectionTag['biomes']:
-                    biomesData = sectionTag['biomes']['data']
-                biomesBitsPerEntry = max(1, ceil(log2(len(biomesPalette))))
-                biomesDataBitArray = _BitArray(biomesBitsPerEntry, 64, biomesData)
-
-                self._sections[addY(chunkPos, y)] = _ChunkSection(
-                    blockPalette, blockDataBitArray, biomesPalette, biomesDataBitArray
-                )
+                # The packed data arrays are views into the buffer; copy them.
+                for containerName in ('block_states', 'biomes'):
+                    container = sectionTag.get(containerName)
+                    if container is not None and 'data' in container:
+                        container['data'] = np.array(container['data'])
+                self._sectionTags[addY(chunkPos, y)] = sectionTag
 
             # Read block entities
-            if 'block_entities' in chunkTag:
-                for blockEntityTag in chunkTag['block_entities']:
-                    blockEntityPos = ivec3(
-                        blockEntityTag['x'].value,
-                        blockEntityTag['y'].value,
-                        blockEntityTag['z'].value
-                    )
-                    self._blockEntities[blockEntityPos] = blockEntityTag
+            for blockEntityPos, begin, end in chunkTag['block_entities']:
+                self._blockEntities[ivec3(*blockEntityPos)] = bytes(chunkBytes[begin:end])
+
+        return worldYBegin, worldYEnd
+
+
+    def _chunkOverlap(self, chunkPos: ivec2):
+        """Returns the part of the chunk at local chunk position <chunkPos> that lies inside this
+        slice's rect, as (localBegin, localEnd, inChunkBegin, inChunkEnd): the XZ bounds in
+        slice-local coordinates and in chunk-local coordinates."""
+        chunkBegin = chunkPos * 16 - self._inChunkRectOffset # pylint: disable=invalid-unary-operand-type
+        localBegin = glm.max(chunkBegin, ivec2(0, 0))
+        localEnd   = glm.min(chunkBegin + 16, self._rect.size)
+        return localBegin, localEnd, localBegin - chunkBegin, localEnd - chunkBegin
+
+
+    def _decodeSection(self, sectionPos: ivec3):
+        """Decodes the not yet decoded chunk section at <sectionPos> (local chunk XZ, absolute section
+        Y) and writes its blocks into the block id array."""
+        sectionTag = self._sectionTags.pop(sectionPos)
+
+        blockPalette = sectionTag['block_states']['palette']
+        blockData = None
+        if 'data' in sectionTag['block_states']:
+            blockData = sectionTag['block_states']['data']
+        blockPaletteBitsPerEntry = max(4, ceil(log2(len(blockPalette))))
+        blockDataBitArray = _BitArray(blockPaletteBitsPerEntry, 16*16*16, blockData)
+
+        biomesPalette = sectionTag['biomes']['palette']
+        biomesData = None
+        if 'data' in sectionTag['biomes']:
+            biomesData = sectionTag['biomes']['data']
+        biomesBitsPerEntry = max(1, ceil(log2(len(biomesPalette))))
+        biomesDataBitArray = _BitArray(biomesBitsPerEntry, 64, biomesData)
+
+        self._sections[sectionPos] = _ChunkSection(
+            blockPalette, blockDataBitArray, biomesPalette, biomesDataBitArray
+        )
+
+        # Map the section palette to the slice palette and write the section's part of the dense
+        # block id array.
+        sectionToSliceId = np.empty(len(blockPalette), dtype=np.uint16)
+        for i, blockState in enumerate(blockPalette):
+            key = _blockStateKey(blockState)
+            sliceId = self._blockPaletteIndex.get(key)
+            if sliceId is None:
+                sliceId = len(self._blockPalette)
+                self._blockPaletteIndex[key] = sliceId
+                self._blockPaletteStates.append(blockState)
+                self._blockPaletteTags.append(None)
+                self._blockPalette.append(Block(key[0], dict(key[1])))
+            sectionToSliceId[i] = sliceId
+        # Section data is stored in YZX order; transpose to XYZ.
+        sectionIds = sectionToSliceId[blockDataBitArray.array].reshape(16, 16, 16).transpose(2, 0, 1)
+        localBegin, localEnd, inChunkBegin, inChunkEnd = self._chunkOverlap(dropY(sectionPos))
+        yLocal = sectionPos.y * 16 - self._yBegin
+        self._blockIds[localBegin.x:localEnd.x, yLocal:yLocal+16, localBegin.y:localEnd.y] = (
+            sectionIds[inChunkBegin.x:inChunkEnd.x, :, inChunkBegin.y:inChunkEnd.y]
+        )
+
+
+    def _decodeAllSections(self):
+        """Decodes all chunk sections that have not been decoded yet."""
+        for sectionPos in list(self._sectionTags):
+            self._decodeSection(sectionPos)
+
+
+    def preload(self, box: Box):
+        """Decodes all chunk sections that overlap the global <box>.\n
+        Only has an effect if this WorldSlice was loaded with lazy=True. Preloading the region that
+        will be queried keeps the decoding work out of later block lookups."""
+        if not self._sectionTags or box.size.x <= 0 or box.size.y <= 0 or box.size.z <= 0:
+            return
+        sectionBegin = (box.offset >> 4) - addY(self._chunkRect.offset)
+        sectionLast  = (box.last   >> 4) - addY(self._chunkRect.offset)
+        for sectionPos in list(self._sectionTags):
+            if glm.all(glm.greaterThanEqual(sectionPos, sectionBegin)) and glm.all(glm.lessThanEqual(sectionPos, sectionLast)):
+                self._decodeSection(sectionPos)
 
 
     def __repr__(self):
@@ -191,12 +439,13 @@ class WorldSlice:
 
     @property
     def yBegin(self):
-        """The minimum block y coordinate."""
+        """The minimum block y coordinate (of the loaded band, if any)."""
         return self._yBegin
 
     @property
     def yEnd(self):
-        """The maximum block y coordinate (exclusive); the "build height" plus one."""
+        """The maximum block y coordinate (exclusive); the "build height" plus one, or the end of the
+        loaded band."""
         return self._yBegin + self._ySize
 
     @property
@@ -212,7 +461,27 @@ class WorldSlice:
     @property
     def nbt(self):
         """The parsed NBT data for the chunks of this WorldSlice.\n
-        Its structure is described in the GDMC HTTP interface API."""
+        Its structure is described in the GDMC HTTP interface API.\n
+        The tag tree is built on first access, from compressed copies of the chunk data that was
+        loaded; WorldSlice itself does not need it."""
+        if self._nbt is None:
+            tiles = [(tileRect, zlib.decompress(tileBytes)) for tileRect, tileBytes in self._compressedTiles]
+            if len(tiles) == 1:
+                chunkBytes = tiles[0][1]
+            else:
+                # Stitch the tiles back together into a single response, in ZX order.
+                chunkPayloads: Dict[Tuple[int, int], bytes] = {}
+                for tileRect, tileBytes in tiles:
+                    for chunkID, chunkPayload in enumerate(splitChunks(tileBytes)):
+                        chunkPayloads[(
+                            tileRect.offset.x + chunkID % tileRect.size.x,
+                            tileRect.offset.y + chunkID // tileRect.size.x
+                        )] = chunkPayload
+                chunkBytes = joinChunks(
+                    chunkPayloads[(self._chunkRect.offset.x + x, self._chunkRect.offset.y + z)]
+                    for z in range(self._chunkRect.size.y) for x in range(self._chunkRect.size.x)
+                )
+            self._nbt = nbt.NBTFile(buffer=BytesIO(chunkBytes))
         return self._nbt
 
     @property
@@ -220,6 +489,71 @@ class WorldSlice:
         """The heightmaps of this WorldSlice."""
         return self._heightmaps
 
+    @property
+    def blockIds(self):
+        """3D array with the slice palette id of every block in this WorldSlice.\n
+        Indexed with local [x, y, z] coordinates, where the lowest Y-layer is at [:,0,:]. The ids
+        index into .blockPalette. The array is read-only.\n
+        If this WorldSlice is lazy, accessing this decodes all remaining chunk sections. Use
+        .preload() and the block getters to only decode a part of the slice."""
+        self._decodeAllSections()
+        view: np.ndarray = self._blockIds.view()
+        view.flags.writeable = False
+        return view
+
+    @property
+    def blockPalette(self):
+        """The blocks that the ids in .blockIds refer to. Id 0 is "minecraft:void_air", which is used
+        for positions without block data.\n
+        The palette blocks do not contain block entity data. Do not modify them."""
+        return self._blockPalette
+
+    def getBlockPaletteIds(self, blockId: str):
+        """Returns a list of the palette ids of all block states with block id <blockId> (for example
+        "minecraft:water") in this WorldSlice.\n
+        Useful in combination with np.isin(worldSlice.blockIds, ids)."""
+        if ":" not in blockId:
+            blockId = "minecraft:" + blockId
+        return [i for i, block in enumerate(self._blockPalette) if block.id == blockId]
+
+
+    def getBlockIdsGlobal(self, box: Box) -> np.ndarray:
+        """Returns the slice palette ids of the blocks in the global <box>, as an array of shape
+        <box>.size that is indexed with [x, y, z] relative to <box>.offset.\n
+        Positions that are not contained in this WorldSlice get id 0 (void air). If this WorldSlice
+        is lazy, only the chunk sections that overlap <box> are decoded."""
+        ids = np.zeros(tuple(box.size), dtype=np.uint16)
+        sliceBox = self.box
+        begin = glm.max(box.begin, sliceBox.begin)
+        end   = glm.min(box.end,   sliceBox.end)
+        if glm.any(glm.greaterThanEqual(begin, end)):
+            return ids
+        self.preload(Box(begin, end - begin))
+        sliceBegin, sliceEnd = begin - sliceBox.offset, end - sliceBox.offset
+        boxBegin,   boxEnd   = begin - box.offset,      end - box.offset
+        ids[boxBegin.x:boxEnd.x, boxBegin.y:boxEnd.y, boxBegin.z:boxEnd.z] = (
+            self._blockIds[sliceBegin.x:sliceEnd.x, sliceBegin.y:sliceEnd.y, sliceBegin.z:sliceEnd.z]
+        )
+        return ids
+
+    def getBlockStateIdsGlobal(self, box: Box) -> np.ndarray:
+        """Like .getBlockIdsGlobal(), but returns state ids (see `gdpc.block_registry`) instead of
+        slice palette ids. Block entity data is not included, since blocks with data have no
+        state id; use .getBlockGlobal() to retrieve it.\n
+        State ids are the same for every WorldSlice, Model and Editor cache, so the result can be
+        combined with theirs directly."""
+        sliceIds = self.getBlockIdsGlobal(box)
+        known = len(self._blockPaletteStateIds)
+        if known < len(self._blockPalette):
+            self._blockPaletteStateIds = np.concatenate([
+                self._blockPaletteStateIds, block_registry.stateIds(self._blockPalette[known:])
+            ])
+        return self._blockPaletteStateIds[sliceIds]
+
+    def getBlockEntityPositionsGlobal(self, box: Box) -> List[ivec3]:
+        """Returns the global positions of all block entities in the global <box>."""
+        return [position for position in self._blockEntities if box.contains(position)]
+
 
     def getChunkSectionPositionGlobal(self, blockPosition: Vec3iLike) -> ivec3:
         """Returns the local position of the chunk section that contains the global <blockPosition>."""
@@ -232,21 +566,51 @@ class WorldSlice:
 
     def _getChunkSectionGlobal(self, blockPosition: Vec3iLike):
         """Returns the chunk section that contains the global <blockPosition>."""
-        return self._sections.get(self.getChunkSectionPositionGlobal(blockPosition))
+        sectionPos = self.getChunkSectionPositionGlobal(blockPosition)
+        if sectionPos in self._sectionTags:
+            self._decodeSection(sectionPos)
+        return self._sections.get(sectionPos)
+
+
+    def _getBlockPaletteIdGlobal(self, position: Vec3iLike) -> int:
+        """Returns the slice palette id of the block at global <position>.\n
+        If <position> is not contained in this WorldSlice, returns 0 (void air)."""
+        x = position[0] - self._rect.offset.x
+        y = position[1] - self._yBegin
+        z = position[2] - self._rect.offset.y
+        if not (0 <= x < self._rect.size.x and 0 <= y < self._ySize and 0 <= z < self._rect.size.y):
+            return 0
+        if self._sectionTags:
+            sectionPos = self.getChunkSectionPositionGlobal(position)
+            if sectionPos in self._sectionTags:
+                self._decodeSection(sectionPos)
+        return int(self._blockIds[x, y, z])
+
+
+    def _getBlockStateTagOfPaletteId(self, paletteId: int):
+        """Returns the block state compound tag of slice palette entry <paletteId> (None for 0)."""
+        if paletteId == 0:
+            return None
+        tag = self._blockPaletteTags[paletteId]
+        if tag is None:
+            tag = _blockStateTag(self._blockPaletteStates[paletteId])
+            self._blockPaletteTags[paletteId] = tag
+        return tag
+
+
+    def _getBlockEntityTagGlobal(self, position: ivec3):
+        """Returns the block entity compound tag at global <position>, or None if there is none."""
+        blockEntityTag = self._blockEntities.get(position)
+        if isinstance(blockEntityTag, bytes):
+            blockEntityTag = NbtView(blockEntityTag).readCompoundTag()
+            self._blockEntities[position] = blockEntityTag
+        return blockEntityTag
 
 
     def getBlockStateTagGlobal(self, position: Vec3iLike):
         """Returns the block state compound tag at global <position>.\n
         If <position> is not contained in this WorldSlice, returns None."""
-        chunkSection = self._getChunkSectionGlobal(position)
-        if chunkSection is None:
-            return None
-        blockIndex = (
-            (position[1] % 16) * 16 * 16 +
-            (position[2] % 16) * 16 +
-            (position[0] % 16)
-        )
-        return chunkSection.getBlockStateTagAtIndex(blockIndex)
+        return self._getBlockStateTagOfPaletteId(self._getBlockPaletteIdGlobal(position))
 
     def getBlockStateTag(self, position: Vec3iLike):
         """Returns the block state compound tag at local <position>.\n
@@ -257,11 +621,13 @@ class WorldSlice:
     def getBlockGlobal(self, position: Vec3iLike):
         """Returns the block at global <position>.\n
         If <position> is not contained in this WorldSlice, returns Block("minecraft:void_air")."""
-        blockStateTag = self.getBlockStateTagGlobal(position)
-        if blockStateTag is None:
-            return Block("minecraft:void_air")
-        blockEntityTag = self._blockEntities.get(ivec3(*position))
-        return Block.fromBlockStateTag(blockStateTag, blockEntityTag)
+        paletteId = self._getBlockPaletteIdGlobal(position)
+        if paletteId != 0:
+            blockEntityTag = self._getBlockEntityTagGlobal(ivec3(*position))
+            if blockEntityTag is not None:
+                return Block.fromBlockStateTag(self._getBlockStateTagOfPaletteId(paletteId), blockEntityTag)
+        block = self._blockPalette[paletteId]
+        return Block(block.id, dict(block.states))
 
     def getBlock(self, position: Vec3iLike):
         """Returns the block at local <position>.\n
@@ -285,7 +651,7 @@ class WorldSlice:
             (position[2] % 16) >> 2
         )
         biomeIndex = (biomePos.y << 4) | (biomePos.z << 2) | biomePos.x # pylint: disable=unsupported-binary-operation
-        return str(chunkSection.getBiomeAtIndex(biomeIndex).value)
+        return chunkSection.getBiomeAtIndex(biomeIndex)
 
     def getBiome(self, position: Vec3iLike):
         """Returns the namespaced id of the biome at local <position>.\n
@@ -306,7 +672,7 @@ class WorldSlice:
         biomeCounts: Dict[str, int] = dict()
         for biomePos in loop3D(ivec3(4,4,4)):
             biomeIndex = (biomePos.y << 4) | (biomePos.z << 2) | biomePos.x
-            biome = str(chunkSection.getBiomeAtIndex(biomeIndex).value)
+            biome = chunkSection.getBiomeAtIndex(biomeIndex)
             biomeCounts[biome] = biomeCounts.get(biome, 0) + 1
         return biomeCounts
 
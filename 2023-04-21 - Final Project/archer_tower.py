@@ -1,95 +1,11 @@
 
-"""
-Load and use a world slice.
-"""
-
 import random
-import sys
 import time
 import numpy as np
 
-from gdpc import __url__, Editor, Block, geometry
-from gdpc.exceptions import InterfaceConnectionError, BuildAreaNotSetError
-from gdpc.vector_tools import addY
-
-
-# Create an editor object.
-# The Editor class provides a high-level interface to interact with the Minecraft world.
-editor = Editor()
-
-
-# Check if the editor can connect to the GDMC HTTP interface.
-try:
-    editor.checkConnection()
-except InterfaceConnectionError:
-    print(
-        f"Error: Could not connect to the GDMC HTTP interface at {editor.host}!\n"
-        "To use GDPC, you need to use a \"backend\" that provides the GDMC HTTP interface.\n"
-        "For example, by running Minecraft with the GDMC HTTP mod installed.\n"
-        f"See {__url__}/README.md for more information."
-    )
-    sys.exit(1)
-
-
-# Get the build area.
-try:
-    buildArea = editor.getBuildArea()
-except BuildAreaNotSetError:
-    print(
-        "Error: failed to get the build area!\n"
-        "Make sure to set the build area with the /setbuildarea command in-game.\n"
-        "For example: /setbuildarea ~0 0 ~0 ~64 200 ~64"
-        #~0 0 ~0 is the center of the build area.
-        #~64 200 ~64 is the size of the build area. With 200 being the height. With ~ being the player.
-    )
-    sys.exit(1)
-
-
-# Get a world slice.
-#
-# A world slice contains all kinds of information about a slice of the world, like blocks, biomes
-# and heightmaps. All of its data is extracted directly from Minecraft's chunk format:
-# https://minecraft.fandom.com/wiki/Chunk_format. World slices take a while to load, but accessing
-# data from them is very fast.
-#
-# To get a world slice, you need to specify a rectangular XZ-area using a Rect object (the 2D
-# equivalent of a Box). Box.toRect() is a convenience function that converts a Box to its XZ-rect.
-#
-# Note that a world slice is a "snapshot" of the world: any changes you make to the world after
-# loading a world slice are not reflected by it.
-
-print("Loading world slice...")
-buildRect = buildArea.toRect()
-worldSlice = editor.loadWorldSlice(buildRect)
-print("World slice loaded!")
-
-
-# Most of worldSlice's functions have a "local" and a "global" variant. The local variant expects
-# coordinates relatve to the rect with which it was constructed, while the global variant expects
-# absolute coorndates.
-
-
-vec = addY(buildRect.center, 0)
-print(f"Block at {vec}: {worldSlice.getBlock(vec - buildArea.offset)}")
-print(f"Block at {vec}: {worldSlice.getBlockGlobal(vec)}")
-
-
-# Heightmaps are an easy way to get the uppermost block at any coordinate. They are very useful for
-# writing terrain-adaptive generator algorithms.
-# World slices provide access to the heightmaps that Minecraft stores in its chunk format, so you
-# get their computation for free.
-#
-# By default, world slices load the following four heightmaps:
-# - "WORLD_SURFACE":             The top non-air blocks.
-# - "MOTION_BLOCKING":           The top blocks with a hitbox or fluid.
-# - "MOTION_BLOCKING_NO_LEAVES": Like MOTION_BLOCKING, but ignoring leaves.
-# - "OCEAN_FLOOR":               The top non-air solid blocks.
-#
-# Heightmaps are loaded into 2D numpy arrays of Y coordinates.
-
-print(f"Available heightmaps: {worldSlice.heightmaps.keys()}")
-
-heightmap = worldSlice.heightmaps["MOTION_BLOCKING_NO_LEAVES"]
+from gdpc import Block, geometry
+
+
 
 
 """ def make_archerTower(editor, starting_pos, wall_block_type, roof_block_type, floor_block_type, window_block_type, staircase_block_type):
@@ -250,7 +166,7 @@ def build_floor(editor, starting_pos, block_type, floor_width,local_pos, floor_h
             position = starting_pos + np.array([i, floor_height, j])
             editor.placeBlock(position, Block(block_type))
 
-def build_stage_floor(editor, starting_pos, block_type, floor_width,local_pos, floor_height,grid):
+def build_stage_floor(editor, starting_pos, block_type, floor_width,local_pos, floor_height,grid,heightmap):
     min=heightmap.min()
     for y in range(min,0,-1):
         for i in range(-floor_width, floor_width + 1):
@@ -320,29 +236,32 @@ def add_windows(editor, starting_pos, window_type, height, building_h, interval,
 
 # In the archerTowerpy() function, call add_windows() after add_torches()
 
-def get_archer_tower_dimensions():
+def get_archer_tower_dimensions(rng=random):
     building_height = 20
-    size = random.choice([4, 6])
+    size = rng.choice([4, 6])
     
     return (building_height, size)
 
 
-def archer_tower(editor, starting_pos,biome,size,grid,local_pos):
+def archer_tower(ctx, starting_pos,biome,size,local_pos):
+    editor = ctx.editor
+    grid = ctx.grid
+    rng = ctx.rng
     block_type = 'stone_bricks'
-    rotation_angle=random.choice([0,90,180,270])
-    building_h = get_archer_tower_dimensions()[0]
-    size = get_archer_tower_dimensions()[1]
+    rotation_angle=rng.choice([0,90,180,270])
+    building_h = get_archer_tower_dimensions(rng)[0]
+    size = get_archer_tower_dimensions(rng)[1]
 
     floor_height = building_h
 
-    build_stage_floor(editor, starting_pos, block_type, size, local_pos,floor_height=0,grid=grid)
+    build_stage_floor(editor, starting_pos, block_type, size, local_pos,floor_height=0,grid=grid,heightmap=ctx.heightmap)
     # Build the pyramid
     if biome == "plains" or biome == "forest":
-        roof_block_type = random.choice([])
+        roof_block_type = rng.choice([])
     if biome == "snow_biome":
-        roof_block_type = random.choice(["blue_ice", "quartz_block", "bricks"])
+        roof_block_type = rng.choice(["blue_ice", "quartz_block", "bricks"])
     if biome == "desert":
-        roof_block_type = random.choice(["sandstone", "red_sandstone", "crying_obsidian"])
+        roof_block_type = rng.choice(["sandstone", "red_sandstone", "crying_obsidian"])
         
     for y in range(floor_height):
         for i in range(size):
@@ -350,7 +269,7 @@ def archer_tower(editor, starting_pos,biome,size,grid,local_pos):
                 if j == -size + i + 1 or j == size - i - 1:
                     position = starting_pos + np.array([j, y, i])
                     # editor.placeBlock(position, Block(block_type))
-                    editor.placeBlock(position, Block(random.choice(["mossy_stone_bricks", "stone_bricks", "cracked_stone_bricks"])))
+                    editor.placeBlock(position, Block(rng.choice(["mossy_stone_bricks", "stone_bricks", "cracked_stone_bricks"])))
                 # elif (y==0 or y==floor_height//2):
                 #     position = starting_pos + np.array([j, y, i])
                 #     editor.placeBlock(position, Block(block_type))
@@ -364,7 +283,7 @@ def archer_tower(editor, starting_pos,biome,size,grid,local_pos):
                 if j == -size + i + 1 or j == size - i - 1:
                     position = starting_pos + np.array([j, y, -i])
                     # editor.placeBlock(position, Block(block_type)) 
-                    editor.placeBlock(position, Block(random.choice(["mossy_stone_bricks", "stone_bricks", "cracked_stone_bricks"])))
+                    editor.placeBlock(position, Block(rng.choice(["mossy_stone_bricks", "stone_bricks", "cracked_stone_bricks"])))
                 else:
                     position = starting_pos + np.array([j, y, i])
                     editor.placeBlock(position, Block("air"))
@@ -404,11 +323,11 @@ def archer_tower(editor, starting_pos,biome,size,grid,local_pos):
 
     # Build the roof
     if biome == "plain_biome" or biome == "jungle_biome":
-        roof_block_type = random.choice(["minecraft:acacia_planks", "minecraft:dark_oak_planks"])
+        roof_block_type = rng.choice(["minecraft:acacia_planks", "minecraft:dark_oak_planks"])
     if biome == "snow_biome":
-        roof_block_type = random.choice(["blue_ice", "quartz_block", "bricks"])
+        roof_block_type = rng.choice(["blue_ice", "quartz_block", "bricks"])
     if biome == "desert_biome":
-        roof_block_type = random.choice(["sandstone", "red_sandstone", "crying_obsidian"])
+        roof_block_type = rng.choice(["sandstone", "red_sandstone", "crying_obsidian"])
     
     roof_size=size+1
     for y in range(10):
@@ -425,15 +344,15 @@ def archer_tower(editor, starting_pos,biome,size,grid,local_pos):
                     position = roof_pos + np.array([j, y, -i])
                     editor.placeBlock(position, Block(roof_block_type))
 
-starting_pos = buildArea.begin
-wall_block_type = 'stone_bricks'
-roof_block_type = 'stone'
-floor_block_type = 'oak_planks'
-window_block_type = 'glass_pane'
-staircase_block_type = 'oak_stairs'
+# starting_pos = buildArea.begin
+# wall_block_type = 'stone_bricks'
+# roof_block_type = 'stone'
+# floor_block_type = 'oak_planks'
+# window_block_type = 'glass_pane'
+# staircase_block_type = 'oak_stairs'
 # make_archerTower(editor, starting_pos, wall_block_type, roof_block_type, floor_block_type, window_block_type, staircase_block_type)
 
-roof_starting_pos = buildArea.begin + np.array([0, 0, 0])
+# roof_starting_pos = buildArea.begin + np.array([0, 0, 0])
 # editor.placeBlock(roof_starting_pos, Block("minecraft:cobblestone"))
     # Set the height of the pyramid
 # height = 4
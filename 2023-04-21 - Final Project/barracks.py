@@ -1,98 +1,13 @@
 #!/usr/bin/env python3
 
-"""
-Load and use a world slice.
-"""
 
-import sys
 import random
 
 import numpy as np
 
-from gdpc import __url__, Editor, Block, geometry
-from gdpc.exceptions import InterfaceConnectionError, BuildAreaNotSetError
-from gdpc.vector_tools import addY
+from gdpc import Block, geometry
 from Grid import Grid
 
-# Create an editor object.
-# The Editor class provides a high-level interface to interact with the Minecraft world.
-editor = Editor()
-
-
-# Check if the editor can connect to the GDMC HTTP interface.
-try:
-    editor.checkConnection()
-except InterfaceConnectionError:
-    print(
-        f"Error: Could not connect to the GDMC HTTP interface at {editor.host}!\n"
-        "To use GDPC, you need to use a \"backend\" that provides the GDMC HTTP interface.\n"
-        "For example, by running Minecraft with the GDMC HTTP mod installed.\n"
-        f"See {__url__}/README.md for more information."
-    )
-    sys.exit(1)
-
-
-# Get the build area.
-try:
-    buildArea = editor.getBuildArea()
-except BuildAreaNotSetError:
-    print(
-        "Error: failed to get the build area!\n"
-        "Make sure to set the build area with the /setbuildarea command in-game.\n"
-        "For example: /setbuildarea ~0 0 ~0 ~64 200 ~64"
-        #~0 0 ~0 is the center of the build area.
-        #~64 200 ~64 is the size of the build area. With 200 being the height. With ~ being the player.
-    )
-    sys.exit(1)
-
-
-# Get a world slice.
-#
-# A world slice contains all kinds of information about a slice of the world, like blocks, biomes
-# and heightmaps. All of its data is extracted directly from Minecraft's chunk format:
-# https://minecraft.fandom.com/wiki/Chunk_format. World slices take a while to load, but accessing
-# data from them is very fast.
-#
-# To get a world slice, you need to specify a rectangular XZ-area using a Rect object (the 2D
-# equivalent of a Box). Box.toRect() is a convenience function that converts a Box to its XZ-rect.
-#
-# Note that a world slice is a "snapshot" of the world: any changes you make to the world after
-# loading a world slice are not reflected by it.
-
-print("Loading world slice...")
-buildRect = buildArea.toRect()
-worldSlice = editor.loadWorldSlice(buildRect)
-print("World slice loaded!")
-
-
-# Most of worldSlice's functions have a "local" and a "global" variant. The local variant expects
-# coordinates relatve to the rect with which it was constructed, while the global variant expects
-# absolute coorndates.
-
-
-vec = addY(buildRect.center, 0)
-print(f"Block at {vec}: {worldSlice.getBlock(vec - buildArea.offset)}")
-print(f"Block at {vec}: {worldSlice.getBlockGlobal(vec)}")
-
-
-# Heightmaps are an easy way to get the uppermost block at any coordinate. They are very useful for
-# writing terrain-adaptive generator algorithms.
-# World slices provide access to the heightmaps that Minecraft stores in its chunk format, so you
-# get their computation for free.
-#
-# By default, world slices load the following four heightmaps:
-# - "WORLD_SURFACE":             The top non-air blocks.
-# - "MOTION_BLOCKING":           The top blocks with a hitbox or fluid.
-# - "MOTION_BLOCKING_NO_LEAVES": Like MOTION_BLOCKING, but ignoring leaves.
-# - "OCEAN_FLOOR":               The top non-air solid blocks.
-#
-# Heightmaps are loaded into 2D numpy arrays of Y coordinates.
-
-print(f"Available heightmaps: {worldSlice.heightmaps.keys()}")
-
-heightmap = worldSlice.heightmaps["MOTION_BLOCKING_NO_LEAVES"]
-
-print(f"Heightmap shape: {heightmap.shape}")
 
 # def add(vec1, vec2):
 #     return tuple(a + b for a, b in zip(vec1, vec2))
@@ -116,17 +31,17 @@ def rotate_direction(original_direction, rotation_angle):
     return directions[new_index]
 
 
-desert_roof_blocks = random.choice(["minecraft:nether_bricks", "minecraft:deepslate_bricks"])
-plains_jungles_roof_blocks = random.choice(["minecraft:stone_bricks", "minecraft:dark_oak_planks"])
-snow_roof_blocks = random.choice(["minecraft:oak_log", "minecraft:black_stained_glass"])
+def blocks_for_this_biome(ctx, part, biome):
+    # The materials are picked once per run, so every barracks of a settlement matches.
+    desert_roof_blocks = ctx.material("barracks_desert_roof", ["minecraft:nether_bricks", "minecraft:deepslate_bricks"])
+    plains_jungles_roof_blocks = ctx.material("barracks_plains_jungles_roof", ["minecraft:stone_bricks", "minecraft:dark_oak_planks"])
+    snow_roof_blocks = ctx.material("barracks_snow_roof", ["minecraft:oak_log", "minecraft:black_stained_glass"])
 
-desert_wall_blocks = random.choice(["minecraft:sandstone", "minecraft:chiseled_red_sandstone"])
-plains_jungles_wall_blocks =  random.choice(["minecraft:mud_bricks", "minecraft:infested_chiseled_stone_bricks"])
-snow_wall_blocks = random.choice(["minecraft:bricks", "minecraft:stripped_oak_log"])
-floor_blocks= random.choice(["minecraft:polished_andesite", "minecraft:oak_planks"])
-block_selection = random.randint(0,1)
+    desert_wall_blocks = ctx.material("barracks_desert_wall", ["minecraft:sandstone", "minecraft:chiseled_red_sandstone"])
+    plains_jungles_wall_blocks = ctx.material("barracks_plains_jungles_wall", ["minecraft:mud_bricks", "minecraft:infested_chiseled_stone_bricks"])
+    snow_wall_blocks = ctx.material("barracks_snow_wall", ["minecraft:bricks", "minecraft:stripped_oak_log"])
+    floor_blocks = ctx.material("barracks_floor", ["minecraft:polished_andesite", "minecraft:oak_planks"])
 
-def blocks_for_this_biome(part, biome):
     block = None
     if biome == "desert_biome":
         if "roof" in part:
@@ -173,15 +88,15 @@ def get_barracks_dimensions():
    
     return house_width
 
-def barracks(editor, center,biome=None,grid=None,width=None,grid_start_pos=0):
+def barracks(ctx, center,biome=None,width=None,grid_start_pos=0):
     """
     Build a tiny house at the specified center position.
     """
+    editor = ctx.editor
+    grid = ctx.grid
+    heightmap = ctx.heightmap
+    rng = ctx.rng
     #choose randome even number between 6 and 8
-    if grid is None:
-        print("grid is none ")
-        return
-    
     if width is None:
         print("width is none ")
         return
@@ -193,11 +108,11 @@ def barracks(editor, center,biome=None,grid=None,width=None,grid_start_pos=0):
         biome = "plains"
     else:
 
-        wall_block=blocks_for_this_biome("walls", biome)
-        roof_block=blocks_for_this_biome("roof", biome)
-        floor_block=blocks_for_this_biome("floor", biome)
+        wall_block=blocks_for_this_biome(ctx, "walls", biome)
+        roof_block=blocks_for_this_biome(ctx, "roof", biome)
+        floor_block=blocks_for_this_biome(ctx, "floor", biome)
 
-    rotation_angle=random.choice([0, 90, 180, 270])
+    rotation_angle=rng.choice([0, 90, 180, 270])
     base_level=0
     # roof_starting_pos=center+rotate_point_around_origin(np.array([0, house_height-1, 0]), rotation_angle)
     # roof_starting_pos=roof_starting_pos.astype(int)
@@ -276,7 +191,7 @@ def barracks(editor, center,biome=None,grid=None,width=None,grid_start_pos=0):
 
     # Build windows
     for z in range(-house_width // 2, house_width // 2):
-        rand= random.randint(2,house_width-2)
+        rand= rng.randint(2,house_width-2)
         position=center+rotate_point_around_origin(np.array([-house_width // 2, base_level +rand, z]), rotation_angle)
         position=position.astype(int)
         editor.placeBlock(position, Block("minecraft:glass_pane"))
@@ -286,15 +201,15 @@ def barracks(editor, center,biome=None,grid=None,width=None,grid_start_pos=0):
         editor.placeBlock(position, Block("minecraft:glass_pane"))
         # editor.placeBlock(add(center, (house_width // 2, base_level + 1,-z)), Block("minecraft:glass_pane"))
         
-        position=center+rotate_point_around_origin(np.array([z, base_level + random.randint(3,house_width-2), -house_width // 2]), rotation_angle)
+        position=center+rotate_point_around_origin(np.array([z, base_level + rng.randint(3,house_width-2), -house_width // 2]), rotation_angle)
         position=position.astype(int)
         editor.placeBlock(position, Block("minecraft:glass_pane"))
-        # editor.placeBlock(add(center, (z, base_level + random.randint(3,house_width-2), -house_width // 2)), Block("minecraft:glass_pane"))
+        # editor.placeBlock(add(center, (z, base_level + rng.randint(3,house_width-2), -house_width // 2)), Block("minecraft:glass_pane"))
         
-        position=center+rotate_point_around_origin(np.array([z, base_level + random.randint(3,house_width-2), house_width // 2]), rotation_angle)
+        position=center+rotate_point_around_origin(np.array([z, base_level + rng.randint(3,house_width-2), house_width // 2]), rotation_angle)
         position=position.astype(int)
         editor.placeBlock(position, Block("minecraft:glass_pane"))
-        # editor.placeBlock(add(center, (z, base_level + random.randint(3,house_width-2), house_width // 2)), Block("minecraft:glass_pane"))
+        # editor.placeBlock(add(center, (z, base_level + rng.randint(3,house_width-2), house_width // 2)), Block("minecraft:glass_pane"))
 
     position=center+rotate_point_around_origin(np.array([-house_width // 2, base_level +1, 0]), rotation_angle)
     position=position.astype(int)
@@ -309,7 +224,7 @@ def barracks(editor, center,biome=None,grid=None,width=None,grid_start_pos=0):
     # Place the bed
     position=center+rotate_point_around_origin(np.array([-house_width // 2+2, base_level, house_width // 2-2]), rotation_angle)
     position=position.astype(int)
-    bedtype=random.choice(["red_bed","white_bed","black_bed","blue_bed","brown_bed","cyan_bed","gray_bed","green_bed","light_blue_bed","light_gray_bed","lime_bed","magenta_bed","orange_bed","pink_bed","purple_bed","yellow_bed"])
+    bedtype=rng.choice(["red_bed","white_bed","black_bed","blue_bed","brown_bed","cyan_bed","gray_bed","green_bed","light_blue_bed","light_gray_bed","lime_bed","magenta_bed","orange_bed","pink_bed","purple_bed","yellow_bed"])
     bed_dir=rotate_direction("south", rotation_angle)
     editor.placeBlock(position, Block(f'{bedtype}[facing={bed_dir}]'))
     # editor.placeBlock(add(center, (-house_width//2+2, base_level, house_width//2-2)), Block("minecraft:red_bed[part=foot, facing=south]"))
@@ -368,7 +283,7 @@ def barracks(editor, center,biome=None,grid=None,width=None,grid_start_pos=0):
     trapdoor_dir=rotate_direction("east", rotation_angle)
     editor.placeBlock(position, Block(f'minecraft:spruce_trapdoor[facing={trapdoor_dir}, half=top, open=false]'))
     position=position+np.array([0,+1,0])
-    pot_type="potted_"+random.choice(["dandelion", "poppy", "blue_orchid", "allium", "azure_bluet", "red_tulip", "orange_tulip", "white_tulip", "pink_tulip", "oxeye_daisy", "cornflower", "lily_of_the_valley"])
+    pot_type="potted_"+rng.choice(["dandelion", "poppy", "blue_orchid", "allium", "azure_bluet", "red_tulip", "orange_tulip", "white_tulip", "pink_tulip", "oxeye_daisy", "cornflower", "lily_of_the_valley"])
     editor.placeBlock(position, Block(f'minecraft:{pot_type}'))
     # editor.placeBlock(add(center, (-house_width//2+1, base_level+1,-house_width // 2+1)), Block("minecraft:spruce_trapdoor[facing=east, half=top, open=false]"))
     # editor.placeBlock(add(center, (-house_width//2+1, base_level+2,-house_width // 2+1)), Block("minecraft:potted_oak_sapling"))
@@ -413,23 +328,3 @@ def barracks(editor, center,biome=None,grid=None,width=None,grid_start_pos=0):
         # editor.placeBlock(add(center, (-house_width//2+2, house_width, house_width//2-3)), Block("minecraft:lantern[hanging=true]"))
         # editor.placeBlock(add(center, (house_width//2-2, house_width, -house_width//2+3)), Block("minecraft:lantern[hanging=true]"))
         # editor.placeBlock(add(center, (house_width//2-2, house_width, house_width//2-3)), Block("minecraft:lantern[hanging=true]"))
-    
-
-""" biome=editor.getBiome(buildArea.begin)
-print(biome)
-barracks(buildArea.begin, editor,biome=biome)
-
-
-
-for i in range(3):
-    x = random.randint(0, buildArea.size.x)
-    z = random.randint(0,  buildArea.size.z)
-    barracks(buildArea.begin + [x, 0, z], editor) """
-
-
-# grid=Grid(buildArea.size.x,buildArea.size.z)
-# center=buildArea.begin
-# biome="plain_biome"
-# width=6
-# grid_start=[0,0,0]
-# barracks(editor,center,biome,grid,width,grid_start) 
\ No newline at end of file
@@ -0,0 +1,142 @@
+"""
+Batched block placement for a whole generation run.
+
+A bare Editor sends every placeBlock() as its own blocking request to the GDMC HTTP interface. A
+BuildSession turns on the editor's block buffer, block cache, background buffer flushing and `fill`
+commands (for geometry shapes and for boxes of identical blocks in the buffer) for the duration of a
+`with` block, and flushes everything on exit. Blocks that the cached world slice shows are already in
+place are not sent at all. Block reads that miss the world slice fetch the surrounding chunk section
+into the cache, instead of sending a request per block.
+"""
+
+import time
+
+from gdpc import Editor
+
+
+def flush_barrier(editor: Editor):
+    """Sends all buffered blocks and commands of <editor> and waits until they have been placed.\n
+    Use this wherever later steps depend on earlier blocks actually being in the world."""
+    editor.flushBuffer()
+    editor.awaitBufferFlushes()
+
+
+class BuildSession:
+    """Context manager that enables buffering, caching, multithreaded flushing and `fill` commands
+    on an editor.\n
+    The editor's previous settings are restored on exit, after all pending blocks have been placed.
+    A summary of the session (blocks sent and skipped, flushes, barriers, elapsed time) is printed on
+    exit."""
+
+    def __init__(
+        self,
+        editor: Editor,
+        bufferLimit           = 4096,
+        cacheLimit            = 65536,
+        multithreadingWorkers = 4,
+        fillCommands          = True,
+        skipUnchangedBlocks   = True,
+        readCoalescing        = True,
+        verbose               = True,
+    ):
+        # The editor partitions flushes by chunk, so several workers keep placement order (see
+        # Editor.multithreading) while sending different chunks in parallel.
+        self.editor                = editor
+        self.bufferLimit           = bufferLimit
+        self.cacheLimit            = cacheLimit
+        self.multithreadingWorkers = multithreadingWorkers
+        self.fillCommands          = fillCommands
+        self.skipUnchangedBlocks   = skipUnchangedBlocks
+        self.readCoalescing        = readCoalescing
+        self.verbose               = verbose
+
+        self.blocksSent    = 0
+        self.blocksSkipped = 0
+        self.flushes       = 0
+        self.barriers      = 0
+        self.elapsed       = 0.0
+
+        self._savedSettings  = None
+        self._skippedAtStart = 0
+        self._flushedAtStart = 0
+        self._flushesAtStart = 0
+        self._startTime      = None
+
+
+    def __enter__(self):
+        editor = self.editor
+        self._savedSettings = (
+            editor.buffering,
+            editor.bufferLimit,
+            editor.caching,
+            editor.cacheLimit,
+            editor.multithreading,
+            editor.multithreadingWorkers,
+            editor.fillCommands,
+            editor.bufferFillCommands,
+            editor.skipUnchangedBlocks,
+            editor.readCoalescing,
+        )
+        self._skippedAtStart = editor.skippedBlocks
+        self._flushedAtStart = editor.flushedBlocks
+        self._flushesAtStart = editor.bufferFlushes
+
+        editor.multithreadingWorkers = self.multithreadingWorkers
+        editor.multithreading        = True
+        editor.bufferLimit           = self.bufferLimit
+        editor.buffering             = True
+        editor.cacheLimit            = self.cacheLimit
+        editor.caching               = True
+        editor.fillCommands          = self.fillCommands
+        editor.bufferFillCommands    = self.fillCommands
+        editor.skipUnchangedBlocks   = self.skipUnchangedBlocks
+        editor.readCoalescing        = self.readCoalescing
+
+        self._startTime = time.perf_counter()
+        return self
+
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        editor = self.editor
+        try:
+            flush_barrier(editor)
+        finally:
+            self._restoreSettings()
+
+        self.blocksSent    = editor.flushedBlocks - self._flushedAtStart
+        self.flushes       = editor.bufferFlushes - self._flushesAtStart
+        self.blocksSkipped = editor.skippedBlocks - self._skippedAtStart
+        self.elapsed       = time.perf_counter() - self._startTime
+        if self.verbose:
+            print(self.summary())
+        return False
+
+
+    def _restoreSettings(self):
+        editor = self.editor
+        buffering, bufferLimit, caching, cacheLimit, multithreading, multithreadingWorkers, fillCommands, bufferFillCommands, skipUnchangedBlocks, readCoalescing = self._savedSettings
+        editor.buffering             = buffering
+        editor.bufferLimit           = bufferLimit
+        editor.caching               = caching
+        editor.cacheLimit            = cacheLimit
+        editor.multithreading        = multithreading
+        editor.multithreadingWorkers = multithreadingWorkers
+        editor.fillCommands          = fillCommands
+        editor.bufferFillCommands    = bufferFillCommands
+        editor.skipUnchangedBlocks   = skipUnchangedBlocks
+        editor.readCoalescing        = readCoalescing
+
+
+    def barrier(self):
+        """Flushes the buffer and waits until every block sent so far has been placed."""
+        flush_barrier(self.editor)
+        self.barriers += 1
+
+
+    def summary(self):
+        """Returns a one-line report of the session's totals."""
+        return (
+            f"Build session: {self.blocksSent} blocks sent in {self.flushes} flushes, "
+            f"{self.blocksSkipped} unchanged blocks skipped, "
+            f"{self.barriers} barriers, {self.elapsed:.1f}s"
+        )
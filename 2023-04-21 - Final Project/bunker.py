@@ -1,108 +1,24 @@
 
-"""
-Load and use a world slice.
-"""
-
 import random
-import sys
 import time
 import numpy as np
 
-from gdpc import __url__, Editor, Block, geometry
-from gdpc.exceptions import InterfaceConnectionError, BuildAreaNotSetError
-from gdpc.vector_tools import addY
-
-
-# Create an editor object.
-# The Editor class provides a high-level interface to interact with the Minecraft world.
-editor = Editor()
-
-
-# Check if the editor can connect to the GDMC HTTP interface.
-try:
-    editor.checkConnection()
-except InterfaceConnectionError:
-    print(
-        f"Error: Could not connect to the GDMC HTTP interface at {editor.host}!\n"
-        "To use GDPC, you need to use a \"backend\" that provides the GDMC HTTP interface.\n"
-        "For example, by running Minecraft with the GDMC HTTP mod installed.\n"
-        f"See {__url__}/README.md for more information."
-    )
-    sys.exit(1)
-
-
-# Get the build area.
-try:
-    buildArea = editor.getBuildArea()
-except BuildAreaNotSetError:
-    print(
-        "Error: failed to get the build area!\n"
-        "Make sure to set the build area with the /setbuildarea command in-game.\n"
-        "For example: /setbuildarea ~0 0 ~0 ~64 200 ~64"
-        #~0 0 ~0 is the center of the build area.
-        #~64 200 ~64 is the size of the build area. With 200 being the height. With ~ being the player.
-    )
-    sys.exit(1)
-
-
-# Get a world slice.
-#
-# A world slice contains all kinds of information about a slice of the world, like blocks, biomes
-# and heightmaps. All of its data is extracted directly from Minecraft's chunk format:
-# https://minecraft.fandom.com/wiki/Chunk_format. World slices take a while to load, but accessing
-# data from them is very fast.
-#
-# To get a world slice, you need to specify a rectangular XZ-area using a Rect object (the 2D
-# equivalent of a Box). Box.toRect() is a convenience function that converts a Box to its XZ-rect.
-#
-# Note that a world slice is a "snapshot" of the world: any changes you make to the world after
-# loading a world slice are not reflected by it.
-
-print("Loading world slice...")
-buildRect = buildArea.toRect()
-worldSlice = editor.loadWorldSlice(buildRect)
-print("World slice loaded!")
-
-
-# Most of worldSlice's functions have a "local" and a "global" variant. The local variant expects
-# coordinates relatve to the rect with which it was constructed, while the global variant expects
-# absolute coorndates.
-
-
-vec = addY(buildRect.center, 0)
-print(f"Block at {vec}: {worldSlice.getBlock(vec - buildArea.offset)}")
-print(f"Block at {vec}: {worldSlice.getBlockGlobal(vec)}")
-
-
-# Heightmaps are an easy way to get the uppermost block at any coordinate. They are very useful for
-# writing terrain-adaptive generator algorithms.
-# World slices provide access to the heightmaps that Minecraft stores in its chunk format, so you
-# get their computation for free.
-#
-# By default, world slices load the following four heightmaps:
-# - "WORLD_SURFACE":             The top non-air blocks.
-# - "MOTION_BLOCKING":           The top blocks with a hitbox or fluid.
-# - "MOTION_BLOCKING_NO_LEAVES": Like MOTION_BLOCKING, but ignoring leaves.
-# - "OCEAN_FLOOR":               The top non-air solid blocks.
-#
-# Heightmaps are loaded into 2D numpy arrays of Y coordinates.
-
-print(f"Available heightmaps: {worldSlice.heightmaps.keys()}")
-
-heightmap = worldSlice.heightmaps["MOTION_BLOCKING_NO_LEAVES"]
-
-print(f"Heightmap shape: {heightmap.shape}")
-
-
-desert_roof_blocks = random.choice(["minecraft:nether_bricks", "minecraft:deepslate_bricks"])
-plains_jungles_roof_blocks = random.choice(["minecraft:stone_bricks", "minecraft:dark_oak_planks"])
-snow_roof_blocks = random.choice(["minecraft:oak_log", "minecraft:black_stained_glass"])
-
-desert_wall_blocks = random.choice(["minecraft:sandstone", "minecraft:chiseled_red_sandstone"])
-plains_jungles_wall_blocks =  random.choice(["minecraft:mud_bricks", "minecraft:infested_chiseled_stone_bricks"])
-snow_wall_blocks = random.choice(["minecraft:bricks", "minecraft:stripped_oak_log"])
-floor_blocks= random.choice(["minecraft:polished_andesite", "minecraft:oak_planks"])
-def blocks_for_this_biome(part, biome):
+from gdpc import Block, geometry
+
+
+
+
+def blocks_for_this_biome(ctx, part, biome):
+    # The materials are picked once per run, so every bunker of a settlement matches.
+    desert_roof_blocks = ctx.material("bunker_desert_roof", ["minecraft:nether_bricks", "minecraft:deepslate_bricks"])
+    plains_jungles_roof_blocks = ctx.material("bunker_plains_jungles_roof", ["minecraft:stone_bricks", "minecraft:dark_oak_planks"])
+    snow_roof_blocks = ctx.material("bunker_snow_roof", ["minecraft:oak_log", "minecraft:black_stained_glass"])
+
+    desert_wall_blocks = ctx.material("bunker_desert_wall", ["minecraft:sandstone", "minecraft:chiseled_red_sandstone"])
+    plains_jungles_wall_blocks = ctx.material("bunker_plains_jungles_wall", ["minecraft:mud_bricks", "minecraft:infested_chiseled_stone_bricks"])
+    snow_wall_blocks = ctx.material("bunker_snow_wall", ["minecraft:bricks", "minecraft:stripped_oak_log"])
+    floor_blocks = ctx.material("bunker_floor", ["minecraft:polished_andesite", "minecraft:oak_planks"])
+
     block = None
     if biome == "desert_biome":
         if "roof" in part:
@@ -158,12 +74,15 @@ def get_bunker_dimensions(underground_height):
     return width
 
 
-def bunker(editor, starting_pos, biome,underground_height, grid, grid_local=0):
+def bunker(ctx, starting_pos, biome,underground_height, grid_local=0):
+    editor = ctx.editor
+    grid = ctx.grid
+    rng = ctx.rng
     #add randome angle out of 90,180,270
-    wall_block_type = blocks_for_this_biome("walls", biome)
-    roof_block_type = blocks_for_this_biome("roof", biome)
-    floor_block_type = blocks_for_this_biome("floor", biome)
-    rotation_angle = random.choice([0,90,180,270])
+    wall_block_type = blocks_for_this_biome(ctx, "walls", biome)
+    roof_block_type = blocks_for_this_biome(ctx, "roof", biome)
+    floor_block_type = blocks_for_this_biome(ctx, "floor", biome)
+    rotation_angle = rng.choice([0,90,180,270])
     width=underground_height+5
     length = width 
     
@@ -281,7 +200,7 @@ def bunker(editor, starting_pos, biome,underground_height, grid, grid_local=0):
     # position=starting_pos+np.array([1,2,width-2])
     position=starting_pos+rotate_point_around_origin(np.array([1,2,width-2]), rotation_angle)
     position = position.astype(int)
-    pot_type="potted_"+random.choice(["dandelion", "poppy", "blue_orchid", "allium", "azure_bluet", "red_tulip", "orange_tulip", "white_tulip", "pink_tulip", "oxeye_daisy", "cornflower", "lily_of_the_valley"])
+    pot_type="potted_"+rng.choice(["dandelion", "poppy", "blue_orchid", "allium", "azure_bluet", "red_tulip", "orange_tulip", "white_tulip", "pink_tulip", "oxeye_daisy", "cornflower", "lily_of_the_valley"])
     editor.placeBlock(position, Block(f'{pot_type}'))
 
     #place a bed
@@ -290,7 +209,7 @@ def bunker(editor, starting_pos, biome,underground_height, grid, grid_local=0):
         position=starting_pos+rotate_point_around_origin(np.array([length-3,1,z]), rotation_angle)
         position = position.astype(int)
         bed_direction = rotate_direction('east', rotation_angle)
-        bed_type=random.choice(["red_bed","white_bed","black_bed","blue_bed","brown_bed","cyan_bed","gray_bed","green_bed","light_blue_bed","light_gray_bed","lime_bed","magenta_bed","orange_bed","pink_bed","purple_bed","yellow_bed"])
+        bed_type=rng.choice(["red_bed","white_bed","black_bed","blue_bed","brown_bed","cyan_bed","gray_bed","green_bed","light_blue_bed","light_gray_bed","lime_bed","magenta_bed","orange_bed","pink_bed","purple_bed","yellow_bed"])
         editor.placeBlock(position, Block(f'{bed_type}[facing={bed_direction},part=foot]'))
 
     return length
@@ -316,4 +235,4 @@ def bunker(editor, starting_pos, biome,underground_height, grid, grid_local=0):
 
 # underground_height=5
 # grid_local=[0,0,0]
-# bunker(editor,starting_pos,biome,underground_height,grid,grid_local)
\ No newline at end of file
+# bunker(ctx,starting_pos,biome,underground_height,grid_local)
\ No newline at end of file
@@ -0,0 +1,131 @@
+"""
+Shared state for a single settlement generation run.
+
+Everything that used to be set up separately by every structure module at import time (the editor,
+the build area, the world slice and its heightmaps) is created once here and handed to the biome
+and structure entry points.
+"""
+
+import random
+import sys
+from dataclasses import dataclass, field
+from typing import Dict, Optional, Sequence
+
+from gdpc import __url__, Editor
+try:
+    from gdpc.chunk_cache import ChunkCache
+except ImportError as e:
+    raise ImportError(
+        "The installed gdpc is missing features that the generators need.\n"
+        "Install the modified gdpc of this repository by running `pip install -r requirements.txt` in "
+        "the \"2023-04-21 - Final Project\" directory."
+    ) from e
+from gdpc.exceptions import InterfaceConnectionError, BuildAreaNotSetError
+from gdpc.vector_tools import Box
+from gdpc.world_slice import WorldSlice
+
+from Grid import Grid
+from build_session import BuildSession, flush_barrier
+
+
+@dataclass
+class GenerationContext:
+    """Editor, build area, cached world slice, grid and RNG shared by one generation run.\n
+    <session> is the BuildSession that the run is placed in, if any."""
+
+    editor: Editor
+    buildArea: Box
+    worldSlice: WorldSlice
+    grid: Grid
+    rng: random.Random
+    materials: Dict[str, str] = field(default_factory=dict)
+    session: Optional[BuildSession] = None
+
+    @property
+    def buildRect(self):
+        """The XZ-rectangle of the build area."""
+        return self.buildArea.toRect()
+
+    @property
+    def heightmaps(self):
+        """All heightmaps of the cached world slice."""
+        return self.worldSlice.heightmaps
+
+    @property
+    def heightmap(self):
+        """The MOTION_BLOCKING_NO_LEAVES heightmap, which most structures build on."""
+        return self.worldSlice.heightmaps["MOTION_BLOCKING_NO_LEAVES"]
+
+    def getlocal(self, point):
+        """Converts a global (x, y, z) position to a grid-local [x, 0, z] position."""
+        offset = self.buildRect.offset
+        return [point[0] - offset[0], 0, point[2] - offset[1]]
+
+    def barrier(self):
+        """Waits until every block sent so far has actually been placed.\n
+        Goes through the build session if there is one, so that it counts the barrier."""
+        if self.session is not None:
+            self.session.barrier()
+        else:
+            flush_barrier(self.editor)
+
+    def material(self, key: str, options: Sequence[str]):
+        """Returns the material chosen for <key>, picking one from <options> on first use.\n
+        This keeps e.g. every barracks of a run in the same wall block."""
+        if key not in self.materials:
+            self.materials[key] = self.rng.choice(options)
+        return self.materials[key]
+
+
+def create_context(editor: Optional[Editor] = None, seed=None, chunk_cache_dir: Optional[str] = None):
+    """Connects to the GDMC HTTP interface and loads everything a generation run needs.\n
+    The world slice is loaded once and cached in the editor. If <chunk_cache_dir> is given, the
+    chunks are also cached on disk there, so repeated runs on the same area load much faster.
+    Exits with an error message if the interface cannot be reached or no build area is set."""
+    if editor is None:
+        editor = Editor()
+    if chunk_cache_dir is not None:
+        editor.chunkCache = ChunkCache(chunk_cache_dir)
+
+    # Check if the editor can connect to the GDMC HTTP interface.
+    try:
+        editor.checkConnection()
+    except InterfaceConnectionError:
+        print(
+            f"Error: Could not connect to the GDMC HTTP interface at {editor.host}!\n"
+            "To use GDPC, you need to use a \"backend\" that provides the GDMC HTTP interface.\n"
+            "For example, by running Minecraft with the GDMC HTTP mod installed.\n"
+            f"See {__url__}/README.md for more information."
+        )
+        sys.exit(1)
+
+    # Get the build area.
+    try:
+        buildArea = editor.getBuildArea()
+    except BuildAreaNotSetError:
+        print(
+            "Error: failed to get the build area!\n"
+            "Make sure to set the build area with the /setbuildarea command in-game.\n"
+            "For example: /setbuildarea ~0 0 ~0 ~64 200 ~64"
+            #~0 0 ~0 is the center of the build area.
+            #~64 200 ~64 is the size of the build area. With 200 being the height. With ~ being the player.
+        )
+        sys.exit(1)
+
+    # Blocks in the build area are cached in a dense array instead of one dict entry per block, which
+    # keeps cache-heavy passes (such as terrain analysis) fast while caching is enabled.
+    editor.cacheRegion = buildArea
+
+    # Structures are built on the surface, so only the band around it is kept in memory. Reads
+    # outside of the band go through the editor as usual.
+    print("Loading world slice...")
+    worldSlice = editor.loadWorldSlice(buildArea.toRect(), cache=True, surfaceBand=(16, 64))
+    print("World slice loaded!")
+
+    return GenerationContext(
+        editor     = editor,
+        buildArea  = buildArea,
+        worldSlice = worldSlice,
+        grid       = Grid(buildArea.size.x, buildArea.size.z),
+        rng        = random.Random(seed),
+    )
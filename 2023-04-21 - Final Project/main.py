@@ -3,69 +3,26 @@
 Load and use a world slice.
 """
 
-import sys
-
 import numpy as np
 
-from gdpc import __url__, Editor, Block, geometry
-from gdpc.exceptions import InterfaceConnectionError, BuildAreaNotSetError
+from gdpc import Block, geometry
 from gdpc.vector_tools import addY
 
+from generation_context import create_context
+from build_session import BuildSession
 from plains_biome import main as plains_biome
 from desert_biome import main as desert_biome
 
 from snow_biome import main as snow_biome
 from jungle_biome import main as jungle_biome
 
-# Create an editor object.
-# The Editor class provides a high-level interface to interact with the Minecraft world.
-editor = Editor()
-
-
-# Check if the editor can connect to the GDMC HTTP interface.
-try:
-    editor.checkConnection()
-except InterfaceConnectionError:
-    print(
-        f"Error: Could not connect to the GDMC HTTP interface at {editor.host}!\n"
-        "To use GDPC, you need to use a \"backend\" that provides the GDMC HTTP interface.\n"
-        "For example, by running Minecraft with the GDMC HTTP mod installed.\n"
-        f"See {__url__}/README.md for more information."
-    )
-    sys.exit(1)
-
-
-# Get the build area.
-try:
-    buildArea = editor.getBuildArea()
-except BuildAreaNotSetError:
-    print(
-        "Error: failed to get the build area!\n"
-        "Make sure to set the build area with the /setbuildarea command in-game.\n"
-        "For example: /setbuildarea ~0 0 ~0 ~64 200 ~64"
-        #~0 0 ~0 is the center of the build area.
-        #~64 200 ~64 is the size of the build area. With 200 being the height. With ~ being the player.
-    )
-    sys.exit(1)
-
-
-# Get a world slice.
-#
-# A world slice contains all kinds of information about a slice of the world, like blocks, biomes
-# and heightmaps. All of its data is extracted directly from Minecraft's chunk format:
-# https://minecraft.fandom.com/wiki/Chunk_format. World slices take a while to load, but accessing
-# data from them is very fast.
-#
-# To get a world slice, you need to specify a rectangular XZ-area using a Rect object (the 2D
-# equivalent of a Box). Box.toRect() is a convenience function that converts a Box to its XZ-rect.
-#
-# Note that a world slice is a "snapshot" of the world: any changes you make to the world after
-# loading a world slice are not reflected by it.
-
-print("Loading world slice...")
-buildRect = buildArea.toRect()
-worldSlice = editor.loadWorldSlice(buildRect)
-print("World slice loaded!")
+# Connect to the GDMC HTTP interface, get the build area and load the world slice once. Every biome
+# and structure shares this context instead of setting up its own editor.
+ctx = create_context()
+editor = ctx.editor
+buildArea = ctx.buildArea
+buildRect = ctx.buildRect
+worldSlice = ctx.worldSlice
 
 
 # Most of worldSlice's functions have a "local" and a "global" variant. The local variant expects
@@ -93,7 +50,7 @@ print(f"Block at {vec}: {worldSlice.getBlockGlobal(vec)}")
 
 print(f"Available heightmaps: {worldSlice.heightmaps.keys()}")
 
-heightmap = worldSlice.heightmaps["MOTION_BLOCKING_NO_LEAVES"]
+heightmap = ctx.heightmap
 
 print(f"Heightmap shape: {heightmap.shape}")
 
@@ -163,22 +120,25 @@ biome=editor.getBiome(addY(buildRect.center, 0))
 
 print(f"Biome at {vec}: {biome}")
 
-if "plains" in biome:
-    #run plains code
-    print("Plains biome detected")
-    plains_biome()
-
-if "desert" in biome:
-    #run desert code
-    print("Desert biome detected")
-    desert_biome()
-
-if "jungle" in biome:
-    #run jungle code
-    print("Jungle biome detected")
-    jungle_biome()
-
-if "snow" in biome:
-    #run snow code
-    print("Snow biome detected")
-    snow_biome()
\ No newline at end of file
+# Buffer, cache and flush blocks in the background for the whole settlement.
+with BuildSession(editor) as session:
+    ctx.session = session
+    if "plains" in biome:
+        #run plains code
+        print("Plains biome detected")
+        plains_biome(ctx)
+
+    if "desert" in biome:
+        #run desert code
+        print("Desert biome detected")
+        desert_biome(ctx)
+
+    if "jungle" in biome:
+        #run jungle code
+        print("Jungle biome detected")
+        jungle_biome(ctx)
+
+    if "snow" in biome:
+        #run snow code
+        print("Snow biome detected")
+        snow_biome(ctx)
@@ -1,99 +1,12 @@
 #!/usr/bin/env python3
 
-"""
-Load and use a world slice.
-"""
-
-import sys
 
 import numpy as np
 
-from gdpc import __url__, Editor, Block, geometry
-from gdpc.exceptions import InterfaceConnectionError, BuildAreaNotSetError
-from gdpc.vector_tools import addY,Rect
-
-
-# Create an editor object.
-# The Editor class provides a high-level interface to interact with the Minecraft world.
-editor = Editor()
-
-
-# Check if the editor can connect to the GDMC HTTP interface.
-try:
-    editor.checkConnection()
-except InterfaceConnectionError:
-    print(
-        f"Error: Could not connect to the GDMC HTTP interface at {editor.host}!\n"
-        "To use GDPC, you need to use a \"backend\" that provides the GDMC HTTP interface.\n"
-        "For example, by running Minecraft with the GDMC HTTP mod installed.\n"
-        f"See {__url__}/README.md for more information."
-    )
-    sys.exit(1)
-
-
-# Get the build area.
-try:
-    buildArea = editor.getBuildArea()
-except BuildAreaNotSetError:
-    print(
-        "Error: failed to get the build area!\n"
-        "Make sure to set the build area with the /setbuildarea command in-game.\n"
-        "For example: /setbuildarea ~0 0 ~0 ~64 200 ~64"
-        #~0 0 ~0 is the center of the build area.
-        #~64 200 ~64 is the size of the build area. With 200 being the height. With ~ being the player.
-    )
-    sys.exit(1)
-
-
-# Get a world slice.
-#
-# A world slice contains all kinds of information about a slice of the world, like blocks, biomes
-# and heightmaps. All of its data is extracted directly from Minecraft's chunk format:
-# https://minecraft.fandom.com/wiki/Chunk_format. World slices take a while to load, but accessing
-# data from them is very fast.
-#
-# To get a world slice, you need to specify a rectangular XZ-area using a Rect object (the 2D
-# equivalent of a Box). Box.toRect() is a convenience function that converts a Box to its XZ-rect.
-#
-# Note that a world slice is a "snapshot" of the world: any changes you make to the world after
-# loading a world slice are not reflected by it.
-
-print("Loading world slice...")
-buildRect = buildArea.toRect()
-worldSlice = editor.loadWorldSlice(buildRect)
-print("World slice loaded!")
-
-
-
-
-# Most of worldSlice's functions have a "local" and a "global" variant. The local variant expects
-# coordinates relatve to the rect with which it was constructed, while the global variant expects
-# absolute coorndates.
-
-
-vec = addY(buildRect.center, 0)
-print(f"Block at {vec}: {worldSlice.getBlock(vec - buildArea.offset)}")
-print(f"Block at {vec}: {worldSlice.getBlockGlobal(vec)}")
-
-
-# Heightmaps are an easy way to get the uppermost block at any coordinate. They are very useful for
-# writing terrain-adaptive generator algorithms.
-# World slices provide access to the heightmaps that Minecraft stores in its chunk format, so you
-# get their computation for free.
-#
-# By default, world slices load the following four heightmaps:
-# - "WORLD_SURFACE":             The top non-air blocks.
-# - "MOTION_BLOCKING":           The top blocks with a hitbox or fluid.
-# - "MOTION_BLOCKING_NO_LEAVES": Like MOTION_BLOCKING, but ignoring leaves.
-# - "OCEAN_FLOOR":               The top non-air solid blocks.
-#
-# Heightmaps are loaded into 2D numpy arrays of Y coordinates.
-
-print(f"Available heightmaps: {worldSlice.heightmaps.keys()}")
+from gdpc import Block, geometry
+from gdpc.vector_tools import Rect
 
-heightmap = worldSlice.heightmaps["MOTION_BLOCKING_NO_LEAVES"]
 
-print(f"Heightmap shape: {heightmap.shape}")
 
 
 
@@ -120,7 +33,7 @@ print(f"Heightmap shape: {heightmap.shape}")
 #create a pyramid shape
 # gemoetry.placeCylinder(editor: Editor,block: Union[Block, Sequence[Block]],axis=1, tube=False, hollow=False,replace: Optional[Union[str, List[str]]] = None):
 # placeRect(editor: Editor, rect: Rect, y: int, block: Union[Block, Sequence[Block]], replace: Optional[Union[str, List[str]]] = None):
-height = heightmap[tuple(buildRect.center - buildRect.offset)]
+# height = heightmap[tuple(buildRect.center - buildRect.offset)]
 # geometry.placeCylinder(editor,addY(buildRect.center, height), 30 , 10, Block("dark_oak_planks"), tube=True)
 # geometry.placeRect(editor, buildRect, height-1, Block("sandstone"))
 
@@ -170,8 +83,8 @@ block_array1=["chiseled_red_sandstone","chiseled_sandstone"]
 
 
 
-def create_initial_floor(width, height, block_array):
-    return [[random.choice(block_array) for _ in range(width)] for _ in range(height)]
+def create_initial_floor(width, height, block_array, rng=random):
+    return [[rng.choice(block_array) for _ in range(width)] for _ in range(height)]
 
 #add Celluar Automata to the floor
 def count_neighbors(x, y, floor, block_type):
@@ -229,12 +142,12 @@ def update_floor_rule_90(floor, block_array):
     return new_floor
 
 #inner pyramid
-def build_inner_pyramid(editor, size, block_type, pyramid_starting_pos, bl_array=block_array):
+def build_inner_pyramid(editor, size, block_type, pyramid_starting_pos, bl_array=block_array, rng=random):
     for y in range(size):
         for x in range(-size + y + 1, size - y):
             for z in range(-size + y + 1, size - y):
                 position = pyramid_starting_pos + np.array([x, y, z])
-                rand=random.randint(0,100)
+                rand=rng.randint(0,100)
                 if rand<50:
                     editor.placeBlock(position, block_type)
                 else:
@@ -243,14 +156,14 @@ def build_inner_pyramid(editor, size, block_type, pyramid_starting_pos, bl_array
                     editor.placeBlock(position+np.array([0,1,0]), Block("torch"))
 
 #outer pyramid       
-def build_inverted_pyramid(editor, size,pyramid_starting_pos,grid,grid_local):
+def build_inverted_pyramid(editor, size,pyramid_starting_pos,grid,grid_local,rng=random):
     bl_array=block_array
     birth_limit = 2
     death_limit = 1
     door_size = 3
     # floor= create_initial_floor(size, size,bl_array)
-    floor= create_initial_floor(size, size,bl_array)
-    wall=create_initial_floor(size, size,block_array1)
+    floor= create_initial_floor(size, size,bl_array,rng)
+    wall=create_initial_floor(size, size,block_array1,rng)
     for y in range(size, -1, -1):
         floor = update_floor_rule_90(floor, bl_array)
         wall=update_floor(wall, block_array1, birth_limit, death_limit)
@@ -293,24 +206,26 @@ def build_inverted_pyramid(editor, size,pyramid_starting_pos,grid,grid_local):
 
 
 
-def main(editor,size,starting_position,grid,grid_local):
+def main(ctx,size,starting_position,grid_local):
+    editor = ctx.editor
+    rng = ctx.rng
     pyramid_size = size
     print(pyramid_size)
     starting_pos = starting_position
     pyramid_block_type = Block("sandstone")
-    rand1=random.randint(0, 4)
+    rand1=rng.randint(0, 4)
     while True:
-        rand2=random.randint(0, 4)
+        rand2=rng.randint(0, 4)
         if rand1!=rand2:
             break
     print(rand1,rand2)
 
     # random_block_array=[block_array[rand1],block_array[rand2]]
-    build_inverted_pyramid(editor,pyramid_size, starting_pos,grid,grid_local)
+    build_inverted_pyramid(editor,pyramid_size, starting_pos,ctx.grid,grid_local,rng)
     pyramid_size = pyramid_size - pyramid_size//2 - pyramid_size//4
     pyramid_block_type = Block("chiseled_sandstone")
 
-    build_inner_pyramid(editor, pyramid_size, pyramid_block_type, starting_pos+np.array([0,pyramid_size//2-1,0]))
+    build_inner_pyramid(editor, pyramid_size, pyramid_block_type, starting_pos+np.array([0,pyramid_size//2-1,0]), rng=rng)
   
 
 
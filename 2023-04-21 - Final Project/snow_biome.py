@@ -1,114 +1,29 @@
-import random
 from barracks import *
 from archer_tower import *
 from bunker import *
 from igloo import *
 from farm import *
 
-import sys
 
 import numpy as np
 
-from gdpc import __url__, Editor, Block, geometry
-from gdpc.exceptions import InterfaceConnectionError, BuildAreaNotSetError
+from gdpc import Block, geometry
 from gdpc.vector_tools import addY
 
 
-def main():
-        #!/usr/bin/env python3
 
+def main(ctx):
     """
-    Load and use a world slice.
+    Builds the snow settlement using the shared generation context <ctx>.
     """
 
-    
-
-
-    # Create an editor object.
-    # The Editor class provides a high-level interface to interact with the Minecraft world.
-    editor = Editor()
-
-
-    # Check if the editor can connect to the GDMC HTTP interface.
-    try:
-        editor.checkConnection()
-    except InterfaceConnectionError:
-        print(
-            f"Error: Could not connect to the GDMC HTTP interface at {editor.host}!\n"
-            "To use GDPC, you need to use a \"backend\" that provides the GDMC HTTP interface.\n"
-            "For example, by running Minecraft with the GDMC HTTP mod installed.\n"
-            f"See {__url__}/README.md for more information."
-        )
-        sys.exit(1)
-
-
-    # Get the build area.
-    try:
-        buildArea = editor.getBuildArea()
-    except BuildAreaNotSetError:
-        print(
-            "Error: failed to get the build area!\n"
-            "Make sure to set the build area with the /setbuildarea command in-game.\n"
-            "For example: /setbuildarea ~0 0 ~0 ~64 200 ~64"
-            #~0 0 ~0 is the center of the build area.
-            #~64 200 ~64 is the size of the build area. With 200 being the height. With ~ being the player.
-        )
-        sys.exit(1)
-
-
-    # Get a world slice.
-    #
-    # A world slice contains all kinds of information about a slice of the world, like blocks, biomes
-    # and heightmaps. All of its data is extracted directly from Minecraft's chunk format:
-    # https://minecraft.fandom.com/wiki/Chunk_format. World slices take a while to load, but accessing
-    # data from them is very fast.
-    #
-    # To get a world slice, you need to specify a rectangular XZ-area using a Rect object (the 2D
-    # equivalent of a Box). Box.toRect() is a convenience function that converts a Box to its XZ-rect.
-    #
-    # Note that a world slice is a "snapshot" of the world: any changes you make to the world after
-    # loading a world slice are not reflected by it.
-
-    print("Loading world slice...")
-    buildRect = buildArea.toRect()
-    worldSlice = editor.loadWorldSlice(buildRect)
-    print("World slice loaded!")
-
-
-    # Most of worldSlice's functions have a "local" and a "global" variant. The local variant expects
-    # coordinates relatve to the rect with which it was constructed, while the global variant expects
-    # absolute coorndates.
-
-
-    vec = addY(buildRect.center, 0)
-    print(f"Block at {vec}: {worldSlice.getBlock(vec - buildArea.offset)}")
-    print(f"Block at {vec}: {worldSlice.getBlockGlobal(vec)}")
-
-
-    # Heightmaps are an easy way to get the uppermost block at any coordinate. They are very useful for
-    # writing terrain-adaptive generator algorithms.
-    # World slices provide access to the heightmaps that Minecraft stores in its chunk format, so you
-    # get their computation for free.
-    #
-    # By default, world slices load the following four heightmaps:
-    # - "WORLD_SURFACE":             The top non-air blocks.
-    # - "MOTION_BLOCKING":           The top blocks with a hitbox or fluid.
-    # - "MOTION_BLOCKING_NO_LEAVES": Like MOTION_BLOCKING, but ignoring leaves.
-    # - "OCEAN_FLOOR":               The top non-air solid blocks.
-    #
-    # Heightmaps are loaded into 2D numpy arrays of Y coordinates.
-
-    print(f"Available heightmaps: {worldSlice.heightmaps.keys()}")
-
-    heightmap = worldSlice.heightmaps["MOTION_BLOCKING_NO_LEAVES"]
-
-    print(f"Heightmap shape: {heightmap.shape}")
-
-    from Grid import Grid
-
-
-    # Create a grid object.
-    grid = Grid(buildArea.size.x, buildArea.size.z)
+    editor = ctx.editor
+    buildArea = ctx.buildArea
+    buildRect = ctx.buildRect
+    worldSlice = ctx.worldSlice
+    heightmap = ctx.heightmap
+    grid = ctx.grid
+    rng = ctx.rng
     grid.print_grid()
 
     def getlocal(point):
@@ -152,22 +67,22 @@ def main():
     # Other code here
     def get_barracks_dimensions():
         
-        house_width = random.choice([6,8])
+        house_width = rng.choice([6,8])
     
         return house_width
 
     def get_archer_tower_dimensions():
-        size = random.choice([4, 6])
+        size = rng.choice([4, 6])
         
         return size
 
     def get_bunker_dimensions():
-        width = random.randint(3, 5)
+        width = rng.randint(3, 5)
         
         return width
 
     def get_farm_dimensions():
-        width = random.randint(4, 8)
+        width = rng.randint(4, 8)
         
         return width
 
@@ -187,10 +102,10 @@ def main():
     igloo_structure_width = get_igloo_dimensions()
 
     # Set the number of structures to place
-    num_barracks_structures = random.randint(1,3)
-    num_archer_tower_structures = random.randint(1,3)
-    num_bunker_structures = random.randint(1,2)
-    num_farm_structures = random.choice([1,2])
+    num_barracks_structures = rng.randint(1,3)
+    num_archer_tower_structures = rng.randint(1,3)
+    num_bunker_structures = rng.randint(1,2)
+    num_farm_structures = rng.choice([1,2])
     num_igloo_structures = 1
     buffer_distance = 10
 
@@ -231,13 +146,13 @@ def main():
 
     # Function to generate a random position for the structure
     def generate_random_position(structure_width):
-                random_x = random.randint(buildRect._offset[0]+buffer_distance, buildRect._offset[0] + buildRect.size[0] - structure_width-buffer_distance)
-                random_z = random.randint(buildRect._offset[1]+buffer_distance, buildRect._offset[1] + buildRect.size[1] - structure_width-buffer_distance)
+                random_x = rng.randint(buildRect._offset[0]+buffer_distance, buildRect._offset[0] + buildRect.size[0] - structure_width-buffer_distance)
+                random_z = rng.randint(buildRect._offset[1]+buffer_distance, buildRect._offset[1] + buildRect.size[1] - structure_width-buffer_distance)
                 #check if the position is within the build area
                 while (random_x < buildRect._offset[0] or random_x > buildRect._offset[0] + buildRect.size[0] - structure_width or
                     random_z < buildRect._offset[1] or random_z > buildRect._offset[1] + buildRect.size[1] - structure_width):
-                    random_x = random.randint(buildRect._offset[0]+buffer_distance, buildRect._offset[0] + buildRect.size[0] - structure_width-buffer_distance)
-                    random_z = random.randint(buildRect._offset[1]+buffer_distance, buildRect._offset[1] + buildRect.size[1] - structure_width-buffer_distance)
+                    random_x = rng.randint(buildRect._offset[0]+buffer_distance, buildRect._offset[0] + buildRect.size[0] - structure_width-buffer_distance)
+                    random_z = rng.randint(buildRect._offset[1]+buffer_distance, buildRect._offset[1] + buildRect.size[1] - structure_width-buffer_distance)
         
                 height = worldSlice.heightmaps["MOTION_BLOCKING_NO_LEAVES"][(random_x - buildRect._offset[0], random_z - buildRect._offset[1])]    
 
@@ -269,7 +184,7 @@ def main():
             if grid.get_grid(local_pos[0],local_pos[2])==4 or grid.get_grid(local_pos[0],local_pos[2])==1 or grid.get_grid(local_pos[0],local_pos[2])==2:
                 break
         #townhall(editor,random_center,wall_block_type, roof_block_type, floor_block_type, window_block_type,grid,local_pos) 
-        igloo(editor, random_center, "blue_ice", igloo_structure_width,grid, local_pos,0)
+        igloo(ctx, random_center, "blue_ice", igloo_structure_width, local_pos,0)
 
     for _ in range(num_bunker_structures):
         random_center = generate_random_position(bunker_underground_height)
@@ -286,7 +201,7 @@ def main():
             print(is_overlap)
             if grid.get_grid(local_pos[0],local_pos[2])==4 or grid.get_grid(local_pos[0],local_pos[2])==1 or grid.get_grid(local_pos[0],local_pos[2])==2 or grid.get_grid(local_pos[0],local_pos[2])==3:
                 is_overlap=True
-        bunker(editor, random_center, biome, bunker_underground_height, grid, local_pos)
+        bunker(ctx, random_center, biome, bunker_underground_height, local_pos)
 
     for _ in range(num_barracks_structures):
         random_center = generate_random_position(house_structure_width)
@@ -303,7 +218,7 @@ def main():
             print(is_overlap)
             if grid.get_grid(local_pos[0],local_pos[2])==4 or grid.get_grid(local_pos[0],local_pos[2])==1 or grid.get_grid(local_pos[0],local_pos[2])==2 or grid.get_grid(local_pos[0],local_pos[2])==3:
                 is_overlap=True
-        barracks(editor,random_center,biome,grid,house_structure_width,local_pos)
+        barracks(ctx,random_center,biome,house_structure_width,local_pos)
 
 
     for _ in range(num_archer_tower_structures):
@@ -321,7 +236,7 @@ def main():
             print(is_overlap)
             if grid.get_grid(local_pos[0],local_pos[2])==4 or grid.get_grid(local_pos[0],local_pos[2])==1 or grid.get_grid(local_pos[0],local_pos[2])==2 or grid.get_grid(local_pos[0],local_pos[2])==3:
                 is_overlap=True
-        archer_tower(editor,random_center,biome,archer_tower_size,grid,local_pos)
+        archer_tower(ctx,random_center,biome,archer_tower_size,local_pos)
 
 
 
@@ -355,7 +270,8 @@ def main():
             previus_goal=goal
         else:
             print("No path found")
-    time.sleep(5)
+    # Wait until every structure is actually placed before the paths are laid around them.
+    ctx.barrier()
     grid.print_grid()
 
     build_paths_from_grid(editor, grid,Block("spruce_planks"),[STARTX,-1,ENDX],heigtmap=heightmap)